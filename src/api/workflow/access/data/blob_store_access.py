@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.error_pool.error import NotExistedData
+from common.conf_system import getBlobStoreConfig
+from typing import Dict, Union
+import threading
+import uuid
+import os
+
+
+class BlobRef:
+    """ handle of a large value kept in the blob store, stored in the data pool instead of the value """
+    def __init__(self, blob_id, size, is_text, namespace):
+        self.blob_id = blob_id
+        self.size = size
+        self.is_text = is_text
+        self.namespace = namespace
+
+    def to_dict(self) -> Dict:
+        """ reference forwarded to services that fetch the blob themselves: GET /workflow/blobs/{blob_id} """
+        return {'$blob': self.blob_id, 'size': self.size, 'type': 'text' if self.is_text else 'bytes'}
+
+    def __repr__(self):
+        return f"BlobRef({self.blob_id}, {self.size} bytes)"
+
+
+class BlobStoreAccess:
+    """ large values of the runs, kept in memory up to max_memory and spilled to files beyond it
+
+        blobs live in the namespace of their run and are dropped with it
+        entry = (data, path), data is None once spilled to path
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_blob_pool'):
+            return
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        blob_store_conf = getBlobStoreConfig()
+        self._threshold = blob_store_conf.get('threshold')
+        self._max_memory = blob_store_conf.get('max_memory')
+        self._spill_dir = blob_store_conf.get('spill_dir')
+        self._blob_pool = {}
+        self._blob_namespaces = {}
+        self._memory_bytes = 0
+        self._spilled_bytes = 0
+
+    def is_blob_value(self, value) -> bool:
+        if not self._threshold:
+            return False
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return len(value) >= self._threshold
+        if isinstance(value, str):
+            return len(value) >= self._threshold
+        return False
+
+    def _spill(self, blob_id: str, data: bytes) -> str:
+        os.makedirs(self._spill_dir, exist_ok=True)
+        path = os.path.join(self._spill_dir, blob_id)
+        with open(path, 'wb') as blob_file:
+            blob_file.write(data)
+        return path
+
+    def put_blob(self, value: Union[bytes, str], namespace: str) -> BlobRef:
+        is_text = isinstance(value, str)
+        data = value.encode('utf-8') if is_text else bytes(value)
+        blob_id = uuid.uuid4().hex
+        size = len(data)
+        with self._thread_lock:
+            is_spilled = bool(self._max_memory) and self._memory_bytes + size > self._max_memory
+            if not is_spilled:
+                self._memory_bytes += size
+        path = self._spill(blob_id, data) if is_spilled else None
+        with self._thread_lock:
+            if is_spilled:
+                self._spilled_bytes += size
+            self._blob_pool.setdefault(namespace, {})[blob_id] = (None if is_spilled else data, path)
+            self._blob_namespaces[blob_id] = namespace
+        return BlobRef(blob_id, size, is_text, namespace)
+
+    def get_blob(self, blob_ref: BlobRef) -> Union[bytes, str]:
+        data = self.get_blob_bytes(blob_ref.blob_id)
+        if blob_ref.is_text:
+            return data.decode('utf-8')
+        return data
+
+    def get_blob_bytes(self, blob_id: str) -> bytes:
+        with self._thread_lock:
+            namespace = self._blob_namespaces.get(blob_id)
+            entry = self._blob_pool.get(namespace, {}).get(blob_id)
+        if entry is None:
+            raise NotExistedData
+        data, path = entry
+        if data is None:
+            with open(path, 'rb') as blob_file:
+                data = blob_file.read()
+        return data
+
+    def _remove_entry(self, blob_id: str, entry) -> None:
+        data, path = entry
+        self._blob_namespaces.pop(blob_id, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+            return
+        try:
+            self._spilled_bytes -= os.path.getsize(path)
+            os.remove(path)
+        except OSError as e:
+            self._logger.error(f"# Not removed spilled blob: {path}, {e}")
+
+    def delete_blob(self, blob_ref: BlobRef) -> None:
+        with self._thread_lock:
+            entry = self._blob_pool.get(blob_ref.namespace, {}).pop(blob_ref.blob_id, None)
+            if entry is not None:
+                self._remove_entry(blob_ref.blob_id, entry)
+
+    def drop_namespace(self, namespace: str) -> None:
+        with self._thread_lock:
+            namespace_blobs = self._blob_pool.pop(namespace, None) or {}
+            for blob_id, entry in namespace_blobs.items():
+                self._remove_entry(blob_id, entry)
+
+    def get_stats(self) -> Dict:
+        with self._thread_lock:
+            stats = {
+                'blobs': len(self._blob_namespaces),
+                'memory_bytes': self._memory_bytes,
+                'spilled_bytes': self._spilled_bytes,
+                'threshold': self._threshold,
+                'max_memory': self._max_memory
+            }
+        return stats
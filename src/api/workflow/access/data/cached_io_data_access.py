@@ -1,65 +1,220 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from api.workflow.error_pool.error import NotExistedData
+from api.workflow.error_pool.error import NotExistedData, ExceededDataPoolMemory
+from common.conf_system import getDataPoolConfig
 from copy import deepcopy
+from typing import Any, Dict
 import traceback
 import threading
+import time
+
+BASE_NAMESPACE = "__BASE__"
+
+
+def estimate_size(value: Any, depth: int = 0) -> int:
+    """ approximate payload bytes of a value, not the interpreter overhead """
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if depth > 32:
+        return 0
+    if isinstance(value, dict):
+        return sum(estimate_size(key, depth + 1) + estimate_size(item, depth + 1) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(estimate_size(item, depth + 1) for item in value)
+    return 64
+
 
 class CachedIODataAccess:
+    """ values of the runs, one namespace per request_id
+
+        every value is size-accounted, a run namespace is dropped in O(1) on close
+        namespaces not read or written for run_ttl (abandoned runs) are expired by a sweep
+        at most every sweep_interval, a write that would exceed max_memory after expiry is refused
+    """
     def __init__(self, logger):
         self._logger = logger
 
         self._thread_lock = threading.Lock()
-        # self._service_data_pool = {}
-        self._data_pool = {}
+        data_pool_conf = getDataPoolConfig()
+        self._max_memory = data_pool_conf.get('max_memory')
+        self._run_ttl = data_pool_conf.get('run_ttl')
+        self._sweep_interval = data_pool_conf.get('sweep_interval')
+        self._next_sweep_ts = 0
+        self._data_pool = {BASE_NAMESPACE: {}}
+        self._value_sizes = {BASE_NAMESPACE: {}}
+        self._namespace_bytes = {BASE_NAMESPACE: 0}
+        self._accessed_ts = {}
+        self._expired_namespaces = []
+        self._pool_bytes = 0
+        self._stats = {'expirations': 0, 'rejections': 0}
+
+    def _get_namespace_pool(self, namespace):
+        if namespace is None:
+            namespace = BASE_NAMESPACE
+        namespace_pool = self._data_pool.get(namespace)
+        if namespace_pool is None:
+            raise NotExistedData
+        return namespace_pool
+
+    def _drop_namespace(self, namespace):
+        self._accessed_ts.pop(namespace, None)
+        if self._data_pool.pop(namespace, None) is None:
+            return False
+        self._value_sizes.pop(namespace, None)
+        self._pool_bytes -= self._namespace_bytes.pop(namespace, 0)
+        return True
+
+    def _touch_namespace(self, namespace):
+        # lock-free on the read path, a touch racing a drop leaves a stale entry for the next sweep
+        if namespace in self._accessed_ts:
+            self._accessed_ts[namespace] = time.monotonic()
+
+    def _expire_namespaces(self):
+        """ O(open runs), amortized: skipped until sweep_interval passed since the last sweep """
+        if not self._run_ttl:
+            return
+        now_ts = time.monotonic()
+        if now_ts < self._next_sweep_ts:
+            return
+        self._next_sweep_ts = now_ts + self._sweep_interval
+        expire_ts = now_ts - self._run_ttl
+        expired_namespaces = [namespace for namespace, accessed_ts in self._accessed_ts.items() if accessed_ts < expire_ts]
+        for namespace in expired_namespaces:
+            if not self._drop_namespace(namespace):
+                continue
+            self._expired_namespaces.append(namespace)
+            self._stats['expirations'] += 1
+            self._logger.warn(f"# Expired data of abandoned run: {namespace}")
+
+    def open_namespace(self, namespace):
+        with self._thread_lock:
+            self._expire_namespaces()
+            if namespace not in self._data_pool:
+                self._data_pool[namespace] = {}
+                self._value_sizes[namespace] = {}
+                self._namespace_bytes[namespace] = 0
+                self._accessed_ts[namespace] = time.monotonic()
+
+    def pop_expired_namespaces(self):
+        """ namespaces expired since the last call, to release what other stores keep for those runs """
+        with self._thread_lock:
+            expired_namespaces = self._expired_namespaces
+            self._expired_namespaces = []
+        return expired_namespaces
 
-    def get_data(self, key):
+    def drop_namespace(self, namespace):
+        if namespace is None or namespace == BASE_NAMESPACE:
+            return
+        with self._thread_lock:
+            self._drop_namespace(namespace)
+
+    def get_data(self, key, namespace=None):
+        """ recipe defaults are folded into the compiled plan, a run reads its own namespace only """
         value = None
         try:
-            self._thread_lock.acquire()
-            value = self._data_pool[key]
+            namespace_pool = self._get_namespace_pool(namespace)
+            self._touch_namespace(namespace)
+            value = namespace_pool[key]
         except KeyError as e:
             self._logger.error(e)
             raise NotExistedData
+        except NotExistedData as e:
+            self._logger.error(f"not opened namespace: {namespace}")
+            raise e
         except Exception as e:
             self._logger.error(e)
-        finally:
-            self._thread_lock.release()
         return value
 
     def get_all(self):
-        self._thread_lock.acquire()
-        data = deepcopy(self._data_pool)
-        self._thread_lock.release()
+        with self._thread_lock:
+            namespace_pools = {namespace: dict(namespace_pool) for namespace, namespace_pool in self._data_pool.items()}
+        data = deepcopy(namespace_pools)
+        return data
+
+    def get_namespace_data(self, namespace):
+        """ copy of one run namespace, the other runs are not touched """
+        with self._thread_lock:
+            namespace_pool = dict(self._data_pool.get(namespace) or {})
+        data = deepcopy(namespace_pool)
         return data
 
-    def set_data(self, value_id, data):
-        self._thread_lock.acquire()
-        self._data_pool[value_id] = data
-        self._thread_lock.release()
+    def _remove_value(self, namespace, value_id):
+        namespace_pool = self._data_pool.get(namespace)
+        if namespace_pool is None or value_id not in namespace_pool:
+            return None
+        value = namespace_pool.pop(value_id)
+        size = self._value_sizes[namespace].pop(value_id, 0)
+        self._namespace_bytes[namespace] -= size
+        self._pool_bytes -= size
+        return value
+
+    def set_data(self, value_id, data, namespace=None):
+        if namespace is None:
+            namespace = BASE_NAMESPACE
+        size = estimate_size(data)
+        with self._thread_lock:
+            if namespace not in self._data_pool:
+                raise NotExistedData
+            old_size = self._value_sizes[namespace].get(value_id, 0)
+            if self._max_memory and self._pool_bytes - old_size + size > self._max_memory:
+                self._expire_namespaces()
+                if namespace not in self._data_pool:
+                    raise NotExistedData
+                if self._pool_bytes - old_size + size > self._max_memory:
+                    self._stats['rejections'] += 1
+                    raise ExceededDataPoolMemory(value_id, self._max_memory)
+            self._remove_value(namespace, value_id)
+            self._data_pool[namespace][value_id] = data
+            self._touch_namespace(namespace)
+            self._value_sizes[namespace][value_id] = size
+            self._namespace_bytes[namespace] += size
+            self._pool_bytes += size
+
+    def delete_data(self, value_id, namespace=None):
+        """ drops one value of the run namespace and returns it, the base namespace is not touched """
+        if namespace is None or namespace == BASE_NAMESPACE:
+            return None
+        with self._thread_lock:
+            value = self._remove_value(namespace, value_id)
+        return value
 
-    def delete(self, service_id):
+    def delete(self, service_id, namespace=None):
         try:
-            self._thread_lock.acquire()
-            target_keys = [key for key, _ in self._data_pool.items() if key.find(service_id) == 0]
-            for key in target_keys:
-                del self._data_pool[key]
-        except KeyError as e:
+            if namespace is None:
+                namespace = BASE_NAMESPACE
+            with self._thread_lock:
+                namespace_pool = self._get_namespace_pool(namespace)
+                target_keys = [key for key, _ in namespace_pool.items() if key.find(service_id) == 0]
+                for key in target_keys:
+                    self._remove_value(namespace, key)
+        except (KeyError, NotExistedData) as e:
             pass
         except Exception as e:
             self._logger.error(e)
             traceback.print_exc()
-        finally:
-            self._thread_lock.release()
 
     def clean(self):
-        try:
-            self._thread_lock.acquire()
-            self._data_pool.clear()
-        except AttributeError as e:
-            self._data_pool = {}
-        except Exception as e:
-            self._logger.error(e)
-        finally:
-            self._thread_lock.release()
\ No newline at end of file
+        with self._thread_lock:
+            self._data_pool = {BASE_NAMESPACE: {}}
+            self._value_sizes = {BASE_NAMESPACE: {}}
+            self._namespace_bytes = {BASE_NAMESPACE: 0}
+            self._accessed_ts = {}
+            self._pool_bytes = 0
+
+    def get_stats(self) -> Dict:
+        with self._thread_lock:
+            stats = dict(self._stats,
+                         bytes=self._pool_bytes,
+                         max_memory=self._max_memory,
+                         entries=sum(len(namespace_pool) for namespace_pool in self._data_pool.values()),
+                         runs=len(self._data_pool) - 1)
+        return stats
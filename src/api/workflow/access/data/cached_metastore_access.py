@@ -1,98 +1,125 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from typing import Dict, List, Any
-from copy import deepcopy
+from api.workflow.access.data.meta_snapshot import MetaSnapshot
+from typing import Dict, List, Any, Mapping
 import threading
 
 class CachedMetastoreAccess:
+    """ readers get the frozen metas of the current snapshot without copy,
+        writers build the next snapshot and swap the reference under the lock """
     def __init__(self, logger):
         self._logger = logger
         self._thread_lock = threading.Lock()
-        self._dag_meta = {}
-        self._edge_map = {}
-
-        self._wf_comm_meta = {}
-        self._wf_nodes_meta = {}
-        self._wf_node_service_pool = {}
-        self._wf_edges_meta = []
-        self._wf_forward_edge_graph = {}
-        self._wf_forward_graph = {}
-        self._wf_backward_graph = {}
-        self._wf_resources_meta = {}
-        self._start_nodes = []
-        self._end_nodes = []
-        self._edges_param_map = {}
+        self._snapshot = MetaSnapshot(0, {
+            'dag_meta': {},
+            'comm_meta': {},
+            'nodes_info': {},
+            'service_pool': {},
+            'edges_info': {},
+            'forward_edge_graph': {},
+            'forward_graph': {},
+            'backward_graph': {},
+            'resources': {},
+            'start_nodes': (),
+            'end_nodes': (),
+            'edges_param_map': {},
+            'compiled_workflow': None
+        })
+
+    def _publish_metas(self, **metas) -> None:
+        with self._thread_lock:
+            self._snapshot = self._snapshot.replace(**metas)
+
+    def publish_snapshot_access(self, **metas) -> MetaSnapshot:
+        """ swaps in every given meta at once, readers see either the old or the new version """
+        with self._thread_lock:
+            next_snapshot = self._snapshot.replace(**metas)
+            self._snapshot = next_snapshot
+        self._logger.debug(f"# published meta snapshot v{next_snapshot.get_version()}")
+        return next_snapshot
+
+    def get_snapshot_access(self) -> MetaSnapshot:
+        return self._snapshot
 
     def set_comm_meta_access(self, wf_comm_meta: Dict) -> None:
-        self._wf_comm_meta = wf_comm_meta
+        self._publish_metas(comm_meta=wf_comm_meta)
 
     def set_nodes_meta_access(self, wf_nodes_meta: Dict) -> None:
-        self._wf_nodes_meta = wf_nodes_meta
+        self._publish_metas(nodes_info=wf_nodes_meta)
 
     def set_node_service_pool_access(self, wf_service_pool: Dict) -> None:
-        self._wf_node_service_pool = wf_service_pool
+        self._publish_metas(service_pool=wf_service_pool)
 
     def set_edges_meta_access(self, wf_edges_meta: Dict) -> None:
-        self._wf_edges_meta = wf_edges_meta
+        self._publish_metas(edges_info=wf_edges_meta)
 
-    def get_edges_meta_access(self) -> List:
-        return deepcopy(self._wf_edges_meta)
+    def get_edges_meta_access(self) -> Mapping:
+        return self._snapshot.get('edges_info')
 
     def set_forward_edge_graph_meta_access(self, wf_forward_edge_graph: Dict) -> None:
-        self._wf_forward_edge_graph = wf_forward_edge_graph
+        self._publish_metas(forward_edge_graph=wf_forward_edge_graph)
 
-    def get_forward_edge_graph_meta_access(self) -> Dict:
-        return deepcopy(self._wf_forward_edge_graph)
+    def get_forward_edge_graph_meta_access(self) -> Mapping:
+        return self._snapshot.get('forward_edge_graph')
 
     def set_forward_graph_meta_access(self, wf_forward_graph: Dict) -> None:
-        self._wf_forward_graph = wf_forward_graph
+        self._publish_metas(forward_graph=wf_forward_graph)
 
-    def get_forward_graph_meta_access(self) -> Dict:
-        return deepcopy(self._wf_forward_graph)
+    def get_forward_graph_meta_access(self) -> Mapping:
+        return self._snapshot.get('forward_graph')
 
     def set_backward_graph_meta_access(self, wf_backward_graph: Dict) -> None:
-        self._wf_backward_graph = wf_backward_graph
+        self._publish_metas(backward_graph=wf_backward_graph)
 
-    def get_backward_graph_meta_access(self) -> Dict:
-        return deepcopy(self._wf_backward_graph)
+    def get_backward_graph_meta_access(self) -> Mapping:
+        return self._snapshot.get('backward_graph')
 
     def set_resources_meta_access(self, wf_resources_meta: Dict) -> None:
-        self._wf_resources_meta = wf_resources_meta
+        self._publish_metas(resources=wf_resources_meta)
 
     def set_start_nodes_meta_access(self, start_nodes: list) -> None:
-        self._start_nodes = start_nodes
+        self._publish_metas(start_nodes=start_nodes)
 
     def set_end_nodes_meta_access(self, end_nodes: list) -> None:
-        self._end_nodes = end_nodes
+        self._publish_metas(end_nodes=end_nodes)
 
     def set_edges_param_map_access(self, edge_params_map: dict) -> None:
-        self._edges_param_map = edge_params_map
+        self._publish_metas(edges_param_map=edge_params_map)
 
-    def get_edges_param_map_access(self) -> Dict:
-        return deepcopy(self._edges_param_map)
+    def get_edges_param_map_access(self) -> Mapping:
+        return self._snapshot.get('edges_param_map')
 
-    def get_dag_access(self) -> Dict:
-        return deepcopy(self._dag_meta)
+    def set_compiled_workflow_access(self, compiled_workflow) -> None:
+        self._publish_metas(compiled_workflow=compiled_workflow)
 
-    def get_comm_meta_access(self) -> Dict:
-        return deepcopy(self._wf_comm_meta)
+    def get_compiled_workflow_access(self):
+        # read-only plan, shared without copy
+        return self._snapshot.get('compiled_workflow')
 
-    def get_node_service_pool_access(self) -> Dict:
-        return deepcopy(self._wf_node_service_pool)
+    def get_dag_access(self) -> Mapping:
+        return self._snapshot.get('dag_meta')
 
-    def get_nodes_meta_access(self) -> Dict:
-        return deepcopy(self._wf_nodes_meta)
+    def get_comm_meta_access(self) -> Mapping:
+        return self._snapshot.get('comm_meta')
 
-    def get_forward_edges_graph_meta_access(self) -> Dict:
-        return deepcopy(self._wf_forward_edge_graph)
+    def get_node_service_pool_access(self) -> Mapping:
+        return self._snapshot.get('service_pool')
 
-    def get_resources_meta_access(self) -> Dict:
-        return deepcopy(self._wf_resources_meta)
+    def get_nodes_meta_access(self) -> Mapping:
+        return self._snapshot.get('nodes_info')
 
-    def get_start_nodes_meta_access(self) -> List:
-        return deepcopy(self._start_nodes)
+    def get_forward_edges_graph_meta_access(self) -> Mapping:
+        return self._snapshot.get('forward_edge_graph')
 
-    def get_end_nodes_meta_access(self) -> List:
-        return deepcopy(self._end_nodes)
+    def get_resources_meta_access(self) -> Mapping:
+        return self._snapshot.get('resources')
 
+    def get_start_nodes_meta_access(self) -> tuple:
+        return self._snapshot.get('start_nodes')
+
+    def get_end_nodes_meta_access(self) -> tuple:
+        return self._snapshot.get('end_nodes')
+
+    def get_metas_access(self) -> Mapping:
+        return self._snapshot.get_metas()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from typing import Any
+import threading
+
+
+class CachedPlanAccess:
+    def __init__(self, logger, max_size=256):
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        self._max_size = max_size
+        self._plan_pool = OrderedDict()
+
+    def get_plan_access(self, plan_key) -> Any:
+        with self._thread_lock:
+            act_plan = self._plan_pool.get(plan_key)
+            if act_plan is not None:
+                self._plan_pool.move_to_end(plan_key)
+        return act_plan
+
+    def set_plan_access(self, plan_key, act_plan) -> None:
+        with self._thread_lock:
+            self._plan_pool[plan_key] = act_plan
+            self._plan_pool.move_to_end(plan_key)
+            while len(self._plan_pool) > self._max_size:
+                self._plan_pool.popitem(last=False)
+
+    def clear_plan_access(self) -> None:
+        with self._thread_lock:
+            self._plan_pool.clear()
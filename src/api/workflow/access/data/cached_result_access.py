@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from typing import Any, Dict
+import threading
+import time
+
+
+class CachedResultAccess:
+    """ per-service LRU of service results, entry = (expire_ts, size, result) """
+    def __init__(self, logger):
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        self._result_pool = {}
+        self._pool_bytes = {}
+        self._stats = {}
+
+    def _get_stats(self, service_id) -> Dict:
+        stats = self._stats.get(service_id)
+        if stats is None:
+            stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+            self._stats[service_id] = stats
+        return stats
+
+    def _remove_entry(self, service_id, result_pool, cache_key) -> None:
+        expire_ts, size, result = result_pool.pop(cache_key)
+        self._pool_bytes[service_id] -= size
+
+    def get_result_access(self, service_id: str, cache_key: str) -> Any:
+        with self._thread_lock:
+            stats = self._get_stats(service_id)
+            result_pool = self._result_pool.get(service_id)
+            entry = result_pool.get(cache_key) if result_pool else None
+            if entry is None:
+                stats['misses'] += 1
+                return None
+
+            expire_ts, size, result = entry
+            if expire_ts and expire_ts < time.monotonic():
+                self._remove_entry(service_id, result_pool, cache_key)
+                stats['expirations'] += 1
+                stats['misses'] += 1
+                return None
+
+            result_pool.move_to_end(cache_key)
+            stats['hits'] += 1
+        return result
+
+    def set_result_access(self, service_id: str, cache_key: str, result: Any, size: int,
+                          max_size: int, ttl: float, max_memory: int) -> bool:
+        if max_memory and size > max_memory:
+            return False
+
+        expire_ts = time.monotonic() + ttl if ttl else 0
+        with self._thread_lock:
+            stats = self._get_stats(service_id)
+            result_pool = self._result_pool.setdefault(service_id, OrderedDict())
+            self._pool_bytes.setdefault(service_id, 0)
+            if cache_key in result_pool:
+                self._remove_entry(service_id, result_pool, cache_key)
+
+            result_pool[cache_key] = (expire_ts, size, result)
+            self._pool_bytes[service_id] += size
+            while result_pool and ((max_size and len(result_pool) > max_size)
+                                   or (max_memory and self._pool_bytes[service_id] > max_memory)):
+                oldest_key = next(iter(result_pool))
+                self._remove_entry(service_id, result_pool, oldest_key)
+                stats['evictions'] += 1
+        return True
+
+    def clear_result_access(self) -> None:
+        with self._thread_lock:
+            self._result_pool.clear()
+            self._pool_bytes.clear()
+
+    def get_stats_access(self) -> Dict:
+        with self._thread_lock:
+            pool_stats = {}
+            for service_id, stats in self._stats.items():
+                result_pool = self._result_pool.get(service_id) or {}
+                pool_stats[service_id] = dict(stats,
+                                              entries=len(result_pool),
+                                              bytes=self._pool_bytes.get(service_id, 0))
+        return pool_stats
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from types import MappingProxyType
+from typing import Any, Mapping
+
+
+def freeze_meta(meta: Any) -> Any:
+    """ read-only copy of a meta tree: dict -> mappingproxy, list -> tuple, set -> frozenset """
+    if isinstance(meta, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze_meta(value) for key, value in meta.items()})
+    elif isinstance(meta, (list, tuple)):
+        return tuple(freeze_meta(value) for value in meta)
+    elif isinstance(meta, (set, frozenset)):
+        return frozenset(meta)
+    return meta
+
+
+class MetaSnapshot:
+    """ versioned, read-only view of the metastore, shared by readers without copy """
+    def __init__(self, version: int = 0, metas: Mapping = None):
+        self._version = version
+        if metas is None:
+            metas = {}
+        self._metas = MappingProxyType(dict(metas))
+
+    def get_version(self) -> int:
+        return self._version
+
+    def get(self, meta_name: str, default: Any = None) -> Any:
+        return self._metas.get(meta_name, default)
+
+    def get_metas(self) -> Mapping:
+        return self._metas
+
+    def replace(self, **metas) -> 'MetaSnapshot':
+        """ next version with the given metas frozen and swapped in, the others shared """
+        updated_metas = dict(self._metas)
+        for meta_name, meta in metas.items():
+            updated_metas[meta_name] = freeze_meta(meta)
+        return MetaSnapshot(self._version + 1, updated_metas)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.execute.api_executor import ApiExecutor
+from api.workflow.access.execute.kserve_v2_codec import gen_batch_key, merge_batch, split_batch
+from typing import Any, Dict, List
+import threading
+import asyncio
+
+
+class ApiBatcher:
+    """ collects concurrent calls of one service across runs and sends them as one request
+
+        batch_format "kserve_v2": v2 json /infer requests with the same inputs (names, datatypes, shape[1:])
+            are concatenated along the first dimension into one request to {batch_url}, default {url},
+            every output is split back by the batch size of each request
+        batch_format "list": POST {batch_url} with a json list of params, the service answers a json list
+            of results in the same order, batch_url is required as the contract is not the one of {url}
+        a window that closes with a single call, or a request that cannot be merged, is sent as the plain request to {url}
+        the batch request is bounded by the longest timeout of its calls, failures raise ApiCallFailed to every call
+    """
+    def __init__(self, logger, url, batch_url=None, max_batch_size=16, max_wait_ms=5.0, batch_format='list'):
+        self._logger = logger
+        self._url = url
+        self._batch_url = batch_url or url
+        self._batch_format = batch_format
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, params: Dict, timeout=None) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((params, timeout, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._pending
+        self._pending = []
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        for calls in self._group_calls(batch):
+            loop.create_task(self._send_calls(calls))
+
+    def _group_calls(self, batch: List) -> List[List]:
+        if self._batch_format != 'kserve_v2':
+            return [batch]
+        call_groups = {}
+        single_calls = []
+        for call in batch:
+            batch_key = gen_batch_key(call[0])
+            if batch_key is None:
+                single_calls.append([call])
+            else:
+                call_groups.setdefault(batch_key, []).append(call)
+        return list(call_groups.values()) + single_calls
+
+    def _get_batch_timeout(self, timeouts: List):
+        """ None when a call has no limit, the batch must not end before any of its calls does """
+        if not timeouts or None in timeouts:
+            return None
+        return max(timeouts)
+
+    async def _request_api(self, url: str, params: Any, timeout) -> Any:
+        executor = ApiExecutor(self._logger)
+        executor.set_api(url=url)
+        executor.set_timeout(timeout)
+        result = await executor.run_async(params)
+        return result
+
+    async def _request_batch(self, params_list: List, timeout) -> List:
+        if self._batch_format == 'kserve_v2':
+            batch_params, batch_sizes = merge_batch(params_list)
+            results = split_batch(await self._request_api(self._batch_url, batch_params, timeout), batch_sizes)
+            for params, result in zip(params_list, results):
+                if 'id' in params:
+                    result['id'] = params.get('id')
+            return results
+        results = await self._request_api(self._batch_url, params_list, timeout)
+        if not isinstance(results, list) or len(results) != len(params_list):
+            raise ValueError(f"Batch API returned {type(results).__name__} for {len(params_list)} items: {self._batch_url}")
+        return results
+
+    async def _send_calls(self, calls: List) -> None:
+        params_list = [params for params, timeout, future in calls]
+        timeout = self._get_batch_timeout([timeout for params, timeout, future in calls])
+        futures = [future for params, timeout, future in calls]
+        try:
+            if len(calls) == 1:
+                results = [await self._request_api(self._url, params_list[0], timeout)]
+            else:
+                self._logger.debug(f"[ApiBatcher] send {len(calls)} items: {self._batch_url}")
+                results = await self._request_batch(params_list, timeout)
+        except Exception as e:
+            self._logger.error(f"[ApiBatcher] {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class ApiBatcherPool:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_batchers'):
+            return
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        self._batchers = {}
+        self._loop = None
+
+    def get_batcher(self, url: str, batch_policy: Dict) -> ApiBatcher:
+        """ returns the shared batcher of the service endpoint, or None when called outside the bound event loop """
+        loop = asyncio.get_running_loop()
+        batcher_key = (url, batch_policy.get('batch_url'), batch_policy.get('batch_format'),
+                       batch_policy.get('max_batch_size'), batch_policy.get('max_wait_ms'))
+        with self._thread_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = loop
+                self._batchers = {}
+            if loop is not self._loop:
+                return None
+
+            batcher = self._batchers.get(batcher_key)
+            if batcher is None:
+                self._logger.debug(f"[ApiBatcherPool] open batcher: {batcher_key}")
+                batcher = ApiBatcher(self._logger, url, **batch_policy)
+                self._batchers[batcher_key] = batcher
+        return batcher
@@ -1,6 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from api.workflow.access.execute.http_session_pool import HttpSessionPool
+from api.workflow.access.execute.kserve_v2_codec import KServeV2Codec, INFERENCE_HEADER
+from api.workflow.error_pool.error import ApiCallFailed
+from common.json_codec import encode_body, decode_body, MSGPACK_ACCEPT
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Any
 import traceback
 import asyncio
@@ -15,6 +21,11 @@ class ApiExecutor:
         self._header = None
         self._body = None
         self._params = None
+        self._timeout = None
+        self._call_loop = None
+        self._call_job = None
+        self._kserve_codec = None
+        self._use_msgpack = False
 
     def set_api(self, url=None, method=None, header=None, body=None, params=None):
         if url:
@@ -54,25 +65,125 @@ class ApiExecutor:
     def get_header(self):
         return self._header
 
-    async def _call_api(self) -> Dict:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.get_url(), json=self.get_params()) as response:
-                try:
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        self._logger.error(error_text)
-                        raise Exception(f"API call failed with status {response}")
-                    result = {"status": "success", "result": await response.json()}
-                    self._logger.debug(f" - task completed successfully: {result}")
-                except Exception as e:
-                    self._logger.error(f"Workflow execution error_pool: {str(e)}\n{traceback.format_exc()}")
-                    result = {"status": "error_pool", "error_pool": str(e)}
-                    raise Exception
-                return result
+    def set_timeout(self, timeout):
+        """ remaining budget of the call in seconds, None: no limit """
+        self._timeout = timeout
+
+    def get_timeout(self):
+        return self._timeout
+
+    def set_kserve_binary_policy(self, kserve_binary_policy):
+        """ sends and receives tensors with the KServe v2 binary data extension """
+        self._kserve_codec = KServeV2Codec(self._logger, kserve_binary_policy.get('binary_outputs'))
+
+    def set_use_msgpack(self, use_msgpack):
+        """ sends msgpack bodies and accepts msgpack responses, for services that speak it """
+        self._use_msgpack = use_msgpack
+
+    def _gen_request_body(self):
+        if self._kserve_codec is not None:
+            return self._kserve_codec.encode_request(self.get_params())
+        body, content_type = encode_body(self.get_params(), self._use_msgpack)
+        headers = {'Content-Type': content_type}
+        if self._use_msgpack:
+            headers['Accept'] = MSGPACK_ACCEPT
+        return body, headers
+
+    async def _parse_response(self, response):
+        if self._kserve_codec is not None:
+            body = await response.read()
+            return self._kserve_codec.decode_response(body, response.headers.get(INFERENCE_HEADER),
+                                                      is_flattened='inputs' not in self.get_params())
+        body = await response.read()
+        return decode_body(body, response.headers.get('Content-Type'))
+
+    def _gen_request_options(self):
+        if not self._timeout:
+            return {}
+        request_options = {
+            'timeout': aiohttp.ClientTimeout(total=self._timeout),
+            'headers': {'X-Request-Timeout-Ms': str(int(self._timeout * 1000))}
+        }
+        return request_options
+
+    def _parse_retry_after(self, retry_after):
+        """ Retry-After header in seconds, either delta-seconds or an HTTP-date """
+        if not retry_after:
+            return None
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    async def _request_api(self, session, url) -> Dict:
+        body, headers = self._gen_request_body()
+        request_options = self._gen_request_options()
+        headers.update(request_options.pop('headers', {}))
+        async with session.post(url, data=body, headers=headers, **request_options) as response:
+            if response.status >= 400:
+                error_text = await response.text()
+                self._logger.error(error_text)
+                retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+                raise ApiCallFailed(url, response.status, retry_after)
+            try:
+                result = {"status": "success", "result": await self._parse_response(response)}
+                self._logger.debug(f" - task completed successfully: {result}")
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                self._logger.error(f"Workflow execution error_pool: {str(e)}\n{traceback.format_exc()}")
+                result = {"status": "error_pool", "error_pool": str(e)}
+                raise Exception
+            return result
+
+    async def _call_api(self, pooled=False, url=None) -> Dict:
+        if not url:
+            url = self.get_url()
+        session = None
+        if pooled:
+            session = HttpSessionPool(self._logger).get_session(url)
+        try:
+            if session is not None:
+                return await self._request_api(session, url)
+            async with aiohttp.ClientSession() as session:
+                return await self._request_api(session, url)
+        except aiohttp.ClientConnectionError as e:
+            self._logger.error(f"{url}: {e}")
+            raise ApiCallFailed(url)
+
+    async def _call_api_cancellable(self) -> Dict:
+        self._call_loop = asyncio.get_running_loop()
+        self._call_job = asyncio.current_task()
+        try:
+            return await self._call_api()
+        finally:
+            self._call_loop = self._call_job = None
+
+    def cancel(self):
+        """ aborts the in-flight call of run() from another thread, coroutines of run_async are cancelled by the caller """
+        call_loop, call_job = self._call_loop, self._call_job
+        if call_loop is None or call_job is None:
+            return
+        try:
+            call_loop.call_soon_threadsafe(call_job.cancel)
+        except RuntimeError:
+            pass
 
     def run(self, params):
         self._logger.info(f"[Executor] Call API: {params}")
         self.set_params(params)
-        result = asyncio.run(self._call_api())
+        result = asyncio.run(self._call_api_cancellable())
+        result_map = result.get('result')
+        return result_map
+
+    async def run_async(self, params):
+        self._logger.info(f"[Executor] Call API(async): {params}")
+        self.set_params(params)
+        result = await self._call_api(pooled=True)
         result_map = result.get('result')
         return result_map
\ No newline at end of file
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.execute.api_executor import ApiExecutor
+from api.workflow.access.execute.api_batcher import ApiBatcherPool
+
+
+class BatchApiExecutor(ApiExecutor):
+    def __init__(self, logger, batch_policy):
+        super().__init__(logger)
+        self._batch_policy = batch_policy
+
+    async def run_async(self, params):
+        batcher = ApiBatcherPool(self._logger).get_batcher(self.get_url(), self._batch_policy)
+        if batcher is None:
+            return await super().run_async(params)
+        self._logger.info(f"[Executor] Call API(batch): {params}")
+        self.set_params(params)
+        result_map = await batcher.submit(params, self.get_timeout())
+        return result_map
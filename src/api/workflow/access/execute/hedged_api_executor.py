@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.execute.api_executor import ApiExecutor
+from api.workflow.access.execute.latency_tracker import LatencyTracker
+import asyncio
+import random
+import time
+
+
+class HedgedApiExecutor(ApiExecutor):
+    """ sends a duplicate call when the first has not returned by the percentile latency of the service,
+        the first successful response wins and the other call is cancelled, async orchestration only """
+    def __init__(self, logger, service_id, hedge_policy):
+        super().__init__(logger)
+        self._service_id = service_id
+        self._hedge_policy = hedge_policy
+        self._latency_tracker = LatencyTracker(logger)
+
+    def _get_hedge_url(self):
+        alternate_urls = self._hedge_policy.get('alternate_urls')
+        if alternate_urls:
+            return random.choice(alternate_urls)
+        return self.get_url()
+
+    def _get_hedge_delay(self):
+        latency = self._latency_tracker.get_percentile(
+            self._service_id, self._hedge_policy.get('percentile'), self._hedge_policy.get('min_samples'))
+        if latency is None:
+            return None
+        return max(latency, self._hedge_policy.get('min_delay_ms') / 1000)
+
+    async def _call_api_timed(self, url):
+        start_ts = time.monotonic()
+        try:
+            result = await self._call_api(pooled=True, url=url)
+        except asyncio.CancelledError:
+            # the loser of a hedge, its elapsed time (past the hedge delay) is a lower bound of its latency,
+            # left out the percentile would drift down to the fast responses and hedge ever more calls
+            self._latency_tracker.record_latency(self._service_id, time.monotonic() - start_ts)
+            raise
+        self._latency_tracker.record_latency(self._service_id, time.monotonic() - start_ts)
+        return result
+
+    async def _wait_first_result(self, calls):
+        error = None
+        pending = set(calls)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    return call.result()
+                error = call.exception()
+        raise error
+
+    async def run_async(self, params):
+        self._logger.info(f"[Executor] Call API(hedged): {params}")
+        self.set_params(params)
+        calls = [asyncio.create_task(self._call_api_timed(self.get_url()))]
+        try:
+            done, pending = await asyncio.wait(calls, timeout=self._get_hedge_delay())
+            if done:
+                self._latency_tracker.mark_call(self._service_id)
+            elif self._latency_tracker.acquire_hedge(self._service_id, self._hedge_policy.get('max_extra_ratio')):
+                hedge_url = self._get_hedge_url()
+                self._logger.debug(f"[Executor] hedge {self._service_id}: {hedge_url}")
+                calls.append(asyncio.create_task(self._call_api_timed(hedge_url)))
+            result = await self._wait_first_result(calls)
+        finally:
+            for call in calls:
+                if not call.done():
+                    call.cancel()
+        result_map = result.get('result')
+        return result_map
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from common.conf_system import getHttpPoolConfig
+from common.json_codec import dumps_text
+from urllib.parse import urlsplit
+import threading
+import asyncio
+import aiohttp
+
+
+class HttpSessionPool:
+    """ a warm session per upstream host, all on one connector so that limit bounds the connections in total
+        and limit_per_host each host, the pool is bound to one event loop and rebound once that loop is closed """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_sessions'):
+            return
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        self._pool_conf = getHttpPoolConfig()
+        self._sessions = {}
+        self._connector = None
+        self._loop = None
+        self._closing_jobs = set()
+
+    def _gen_host_key(self, url):
+        url_info = urlsplit(url)
+        host_key = f"{url_info.scheme}://{url_info.netloc}"
+        return host_key
+
+    def _new_connector(self):
+        connector = aiohttp.TCPConnector(
+            limit=self._pool_conf.get('limit'),
+            limit_per_host=self._pool_conf.get('limit_per_host'),
+            keepalive_timeout=self._pool_conf.get('keepalive_timeout'),
+            ttl_dns_cache=self._pool_conf.get('dns_cache_ttl'),
+            use_dns_cache=True
+        )
+        return connector
+
+    def _new_session(self):
+        if self._connector is None or self._connector.closed:
+            self._connector = self._new_connector()
+        session = aiohttp.ClientSession(connector=self._connector, connector_owner=False, json_serialize=dumps_text)
+        return session
+
+    def _rebind(self, loop):
+        """ binds the pool to loop, sessions of the closed loop are closed on the new one """
+        sessions, connector = self._sessions, self._connector
+        self._loop = loop
+        self._sessions = {}
+        self._connector = None
+        if sessions or connector is not None:
+            closing_job = loop.create_task(self._close_sessions(sessions, connector))
+            self._closing_jobs.add(closing_job)
+            closing_job.add_done_callback(self._closing_jobs.discard)
+
+    async def _close_sessions(self, sessions, connector):
+        for host_key, session in sessions.items():
+            try:
+                await session.close()
+                self._logger.debug(f"[HttpSessionPool] closed session: {host_key}")
+            except Exception as e:
+                self._logger.error(e)
+        if connector is not None:
+            try:
+                await connector.close()
+            except Exception as e:
+                self._logger.error(e)
+
+    def get_session(self, url):
+        """ returns the warm session of the upstream host, or None when called outside the bound event loop """
+        loop = asyncio.get_running_loop()
+        with self._thread_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._rebind(loop)
+            if loop is not self._loop:
+                return None
+
+            host_key = self._gen_host_key(url)
+            session = self._sessions.get(host_key)
+            if session is None or session.closed:
+                self._logger.debug(f"[HttpSessionPool] open session: {host_key}")
+                session = self._new_session()
+                self._sessions[host_key] = session
+        return session
+
+    async def close(self):
+        with self._thread_lock:
+            sessions, connector = self._sessions, self._connector
+            self._sessions = {}
+            self._connector = None
+        await self._close_sessions(sessions, connector)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.error_pool.error import NotFoundFunction
+from typing import Any, Callable, Dict
+import functools
+import importlib
+import asyncio
+import inspect
+
+
+@functools.lru_cache(maxsize=None)
+def load_function(function_path: str) -> Callable:
+    """ imports "{module}:{function}" once, dotted attributes are allowed after the colon """
+    module_name, _, attr_path = function_path.partition(':')
+    if not module_name or not attr_path:
+        raise NotFoundFunction(function_path, "expected {module}:{function}")
+    try:
+        function = importlib.import_module(module_name)
+        for attr_name in attr_path.split('.'):
+            function = getattr(function, attr_name)
+    except (ImportError, AttributeError) as e:
+        raise NotFoundFunction(function_path, e)
+    if not callable(function):
+        raise NotFoundFunction(function_path, "not callable")
+    return function
+
+
+class InnerExecutor:
+    """ calls a python function of the recipe in-process instead of a localhost api
+
+        service: "function": "{module}:{function}", called with the params as keyword arguments
+        async functions are awaited on the loop of the run, sync ones run on the thread executor
+        a running sync function is not interrupted by timeout or cancel, its result is discarded
+    """
+    def __init__(self, logger, function_path, thread_executor=None):
+        self._logger = logger
+        self._function_path = function_path
+        self._thread_executor = thread_executor
+        self._params = None
+        self._timeout = None
+
+    def get_function_path(self):
+        return self._function_path
+
+    def set_params(self, params):
+        self._params = params
+
+    def get_params(self) -> Dict:
+        if not self._params:
+            return {}
+        return self._params
+
+    def set_timeout(self, timeout):
+        self._timeout = timeout
+
+    def cancel(self):
+        pass
+
+    def _is_async(self, function) -> bool:
+        return inspect.iscoroutinefunction(function) or inspect.iscoroutinefunction(getattr(function, '__call__', None))
+
+    def run(self, params) -> Any:
+        self._logger.info(f"[Executor] Call function: {self._function_path}")
+        self.set_params(params)
+        function = load_function(self._function_path)
+        if self._is_async(function):
+            return asyncio.run(asyncio.wait_for(function(**self.get_params()), self._timeout or None))
+        return function(**self.get_params())
+
+    async def run_async(self, params) -> Any:
+        self._logger.info(f"[Executor] Call function(async): {self._function_path}")
+        self.set_params(params)
+        function = load_function(self._function_path)
+        if self._is_async(function):
+            return await function(**self.get_params())
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread_executor, functools.partial(function, **self.get_params()))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from common.json_codec import dumps, loads
+from typing import Any, Dict, List, Tuple
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INFERENCE_HEADER = 'Inference-Header-Content-Length'
+TENSOR_FIELDS = ('name', 'shape', 'datatype', 'data')
+
+# v2 datatype: (numpy dtype, struct format), little-endian as the protocol requires
+DATATYPES = {
+    'BOOL': ('|b1', '?'),
+    'UINT8': ('|u1', 'B'),
+    'UINT16': ('<u2', 'H'),
+    'UINT32': ('<u4', 'I'),
+    'UINT64': ('<u8', 'Q'),
+    'INT8': ('|i1', 'b'),
+    'INT16': ('<i2', 'h'),
+    'INT32': ('<i4', 'i'),
+    'INT64': ('<i8', 'q'),
+    'FP16': ('<f2', 'e'),
+    'FP32': ('<f4', 'f'),
+    'FP64': ('<f8', 'd')
+}
+
+
+def flatten_data(data) -> List:
+    """ row-major items of a nested list, the layout of v2 json tensors """
+    if isinstance(data, (list, tuple)):
+        flat_data = []
+        for item in data:
+            flat_data.extend(flatten_data(item))
+        return flat_data
+    return [data]
+
+
+def gen_batch_key(params: Dict) -> Any:
+    """ requests with the same key can be concatenated along the first dimension, None: not a v2 json request """
+    inputs = params.get('inputs') if isinstance(params, dict) else None
+    if not isinstance(inputs, list) or not inputs:
+        return None
+    try:
+        input_keys = tuple((tensor['name'], tensor['datatype'], tuple(tensor['shape'][1:]), dumps(tensor.get('parameters'), sort_keys=True))
+                           for tensor in inputs)
+        request_key = dumps({key: value for key, value in params.items() if key not in ('inputs', 'id')}, sort_keys=True)
+    except (KeyError, IndexError, TypeError):
+        return None
+    return input_keys, request_key
+
+
+def merge_batch(params_list: List[Dict]) -> Tuple[Dict, List[int]]:
+    """ one v2 request of the inputs of every request concatenated along the first dimension,
+        params_list shares one gen_batch_key, returns the request and the batch size of each """
+    batch_sizes = [params['inputs'][0]['shape'][0] for params in params_list]
+    inputs = []
+    for input_index, tensor in enumerate(params_list[0]['inputs']):
+        data = []
+        for params in params_list:
+            data.extend(flatten_data(params['inputs'][input_index]['data']))
+        inputs.append(dict(tensor, shape=[sum(batch_sizes)] + list(tensor['shape'][1:]), data=data))
+    batch_params = {key: value for key, value in params_list[0].items() if key not in ('inputs', 'id')}
+    batch_params['inputs'] = inputs
+    return batch_params, batch_sizes
+
+
+def split_batch(result: Dict, batch_sizes: List[int]) -> List[Dict]:
+    """ the v2 response of a merged request split back into one response per request """
+    results = [{key: value for key, value in result.items() if key != 'outputs'} for _ in batch_sizes]
+    for split_result in results:
+        split_result['outputs'] = []
+    for output in result.get('outputs') or []:
+        shape = output.get('shape') or []
+        flat_data = flatten_data(output.get('data'))
+        if not shape or shape[0] != sum(batch_sizes):
+            raise ValueError(f"v2 output {output.get('name')} of shape {shape} does not match the batch of {sum(batch_sizes)}")
+        row_size = len(flat_data) // shape[0]
+        offset = 0
+        for split_result, batch_size in zip(results, batch_sizes):
+            split_data = flat_data[offset:offset + batch_size * row_size]
+            offset += batch_size * row_size
+            split_result['outputs'].append(dict(output, shape=[batch_size] + list(shape[1:]), data=split_data))
+    return results
+
+
+class KServeV2Codec:
+    """ KServe v2 binary data extension
+
+        request/response body = json inference header + raw tensors, the header length is sent in
+        Inference-Header-Content-Length and each tensor carries parameters.binary_data_size
+        params are either a full v2 body ({"inputs": [...]}) or the flattened single tensor
+        {"name", "shape", "datatype", "data"} of the recipe, the result keeps the same form
+        output tensors are decoded into numpy arrays without python lists, flat lists without numpy
+    """
+    def __init__(self, logger, binary_outputs=True):
+        self._logger = logger
+        self._binary_outputs = binary_outputs
+
+    def _encode_bytes_tensor(self, data) -> bytes:
+        """ BYTES elements are each prefixed by their 4-byte little-endian length """
+        if numpy is not None and isinstance(data, numpy.ndarray):
+            data = data.ravel().tolist()
+        chunks = []
+        for item in flatten_data(data):
+            item = item.encode('utf-8') if isinstance(item, str) else bytes(item)
+            chunks.append(struct.pack('<I', len(item)))
+            chunks.append(item)
+        return b''.join(chunks)
+
+    def _encode_tensor(self, data, datatype: str) -> bytes:
+        if datatype == 'BYTES':
+            return self._encode_bytes_tensor(data)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        if datatype not in DATATYPES:
+            raise ValueError(f"Not supported v2 datatype: {datatype}")
+        dtype, struct_format = DATATYPES.get(datatype)
+        if numpy is not None:
+            return numpy.ascontiguousarray(data, dtype=dtype).tobytes()
+        flat_data = flatten_data(data)
+        return struct.pack(f"<{len(flat_data)}{struct_format}", *flat_data)
+
+    def _decode_bytes_tensor(self, buffer: memoryview) -> List:
+        items = []
+        offset = 0
+        while offset < len(buffer):
+            item_size = struct.unpack_from('<I', buffer, offset)[0]
+            offset += 4
+            items.append(bytes(buffer[offset:offset + item_size]))
+            offset += item_size
+        return items
+
+    def _decode_tensor(self, buffer: memoryview, datatype: str, shape: List) -> Any:
+        if datatype == 'BYTES':
+            items = self._decode_bytes_tensor(buffer)
+            if numpy is not None:
+                return numpy.array(items, dtype=object).reshape(shape)
+            return items
+        if datatype not in DATATYPES:
+            raise ValueError(f"Not supported v2 datatype: {datatype}")
+        dtype, struct_format = DATATYPES.get(datatype)
+        if numpy is not None:
+            return numpy.frombuffer(buffer, dtype=dtype).reshape(shape)
+        item_count = len(buffer) // struct.calcsize(struct_format)
+        return list(struct.unpack(f"<{item_count}{struct_format}", buffer))
+
+    def _get_inputs(self, params: Dict) -> Tuple[List, Dict]:
+        if 'inputs' in params:
+            request_header = {key: value for key, value in params.items() if key != 'inputs'}
+            return params.get('inputs'), request_header
+        tensor = {key: params.get(key) for key in TENSOR_FIELDS}
+        request_header = {key: value for key, value in params.items() if key not in TENSOR_FIELDS}
+        return [tensor], request_header
+
+    def encode_request(self, params: Dict) -> Tuple[bytes, Dict]:
+        inputs, request_header = self._get_inputs(params)
+        header_inputs = []
+        tensor_buffers = []
+        for tensor in inputs:
+            tensor_buffer = self._encode_tensor(tensor.get('data'), tensor.get('datatype'))
+            header_input = {key: value for key, value in tensor.items() if key != 'data'}
+            header_input['parameters'] = dict(tensor.get('parameters') or {}, binary_data_size=len(tensor_buffer))
+            header_inputs.append(header_input)
+            tensor_buffers.append(tensor_buffer)
+        request_header['inputs'] = header_inputs
+
+        if self._binary_outputs:
+            if request_header.get('outputs'):
+                request_header['outputs'] = [dict(output, parameters=dict(output.get('parameters') or {}, binary_data=True))
+                                             for output in request_header.get('outputs')]
+            else:
+                request_header['parameters'] = dict(request_header.get('parameters') or {}, binary_data_output=True)
+
+        header_bytes = dumps(request_header)
+        headers = {
+            'Content-Type': 'application/octet-stream',
+            INFERENCE_HEADER: str(len(header_bytes))
+        }
+        body = b''.join([header_bytes] + tensor_buffers)
+        return body, headers
+
+    def decode_response(self, body: bytes, header_length=None, is_flattened=True) -> Dict:
+        if header_length is None:
+            response_header = loads(body)
+            buffer = memoryview(b'')
+        else:
+            header_length = int(header_length)
+            response_header = loads(body[:header_length])
+            buffer = memoryview(body)[header_length:]
+
+        outputs = []
+        offset = 0
+        for output in response_header.get('outputs') or []:
+            output = dict(output)
+            binary_data_size = (output.get('parameters') or {}).get('binary_data_size')
+            if binary_data_size is not None:
+                output['data'] = self._decode_tensor(buffer[offset:offset + binary_data_size],
+                                                     output.get('datatype'), output.get('shape'))
+                offset += binary_data_size
+            outputs.append(output)
+
+        result = {key: value for key, value in response_header.items() if key != 'outputs'}
+        if is_flattened and len(outputs) == 1:
+            result.update({key: outputs[0].get(key) for key in TENSOR_FIELDS})
+        else:
+            result['outputs'] = outputs
+        return result
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from common.conf_system import getLatencyWindow
+from collections import deque
+from typing import Dict
+import threading
+import math
+
+
+class LatencyTracker:
+    """ recent latencies and hedged calls of each service, over a sliding window of calls """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_latencies'):
+            return
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        self._window = getLatencyWindow()
+        self._latencies = {}
+        self._hedge_marks = {}
+        self._hedge_counts = {}
+
+    def record_latency(self, service_id: str, latency: float) -> None:
+        with self._thread_lock:
+            latencies = self._latencies.get(service_id)
+            if latencies is None:
+                latencies = deque(maxlen=self._window)
+                self._latencies[service_id] = latencies
+            latencies.append(latency)
+
+    def get_percentile(self, service_id: str, percentile: float, min_samples: int = 1) -> float:
+        """ nearest-rank percentile of the window, None until min_samples calls are seen """
+        with self._thread_lock:
+            latencies = self._latencies.get(service_id)
+            if not latencies or len(latencies) < max(min_samples, 1):
+                return None
+            sorted_latencies = sorted(latencies)
+        rank = max(math.ceil(percentile / 100 * len(sorted_latencies)), 1)
+        return sorted_latencies[min(rank, len(sorted_latencies)) - 1]
+
+    def _mark_call(self, service_id: str, is_hedged: bool) -> None:
+        hedge_marks = self._hedge_marks.get(service_id)
+        if hedge_marks is None:
+            hedge_marks = deque(maxlen=self._window)
+            self._hedge_marks[service_id] = hedge_marks
+            self._hedge_counts[service_id] = 0
+        if len(hedge_marks) == hedge_marks.maxlen and hedge_marks[0]:
+            self._hedge_counts[service_id] -= 1
+        hedge_marks.append(is_hedged)
+        if is_hedged:
+            self._hedge_counts[service_id] += 1
+
+    def mark_call(self, service_id: str) -> None:
+        with self._thread_lock:
+            self._mark_call(service_id, False)
+
+    def acquire_hedge(self, service_id: str, max_extra_ratio: float) -> bool:
+        """ grants a hedge while hedged calls stay under max_extra_ratio of the recent calls """
+        with self._thread_lock:
+            hedge_marks = self._hedge_marks.get(service_id) or ()
+            hedge_count = self._hedge_counts.get(service_id, 0)
+            is_hedged = (hedge_count + 1) <= max_extra_ratio * (len(hedge_marks) + 1)
+            self._mark_call(service_id, is_hedged)
+        return is_hedged
+
+    def get_stats(self) -> Dict:
+        with self._thread_lock:
+            stats = {}
+            for service_id, latencies in self._latencies.items():
+                sorted_latencies = sorted(latencies)
+                stats[service_id] = {
+                    'samples': len(latencies),
+                    'p50': sorted_latencies[len(sorted_latencies) // 2],
+                    'max': sorted_latencies[-1],
+                    'hedged': self._hedge_counts.get(service_id, 0),
+                    'calls': len(self._hedge_marks.get(service_id) or [])
+                }
+        return stats
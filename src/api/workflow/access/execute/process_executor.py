@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.execute.inner_executor import InnerExecutor, load_function
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+import threading
+import asyncio
+import inspect
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SharedValue:
+    """ placeholder of a large str/bytes/array value copied into a shared memory block """
+    def __init__(self, name, size, kind, dtype=None, shape=None):
+        self.name = name
+        self.size = size
+        self.kind = kind
+        self.dtype = dtype
+        self.shape = shape
+
+
+def _to_buffer(value) -> Tuple[Any, str, Any, Any]:
+    if isinstance(value, str):
+        return value.encode('utf-8'), 'str', None, None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return value, 'bytes', None, None
+    return numpy.ascontiguousarray(value), 'array', value.dtype.str, value.shape
+
+
+def _is_shareable(value, shm_threshold) -> bool:
+    if not shm_threshold:
+        return False
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return len(value) >= shm_threshold
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.dtype != object and value.nbytes >= shm_threshold
+    return False
+
+
+def share_values(values, shm_threshold) -> Tuple[Any, List]:
+    """ moves the large top-level values of a dict into shared memory, returns the dict and the created blocks """
+    if not isinstance(values, dict) or not shm_threshold:
+        return values, []
+    shared_values = dict(values)
+    shm_blocks = []
+    for key, value in values.items():
+        if not _is_shareable(value, shm_threshold):
+            continue
+        buffer, kind, dtype, shape = _to_buffer(value)
+        size = buffer.nbytes if hasattr(buffer, 'nbytes') else len(buffer)
+        shm_block = shared_memory.SharedMemory(create=True, size=size)
+        shm_block.buf[:size] = memoryview(buffer).cast('B')
+        shm_blocks.append(shm_block)
+        shared_values[key] = SharedValue(shm_block.name, size, kind, dtype, shape)
+    return shared_values, shm_blocks
+
+
+def _read_shared_value(shared_value: SharedValue, unlink: bool) -> Any:
+    shm_block = shared_memory.SharedMemory(name=shared_value.name)
+    try:
+        data = bytes(shm_block.buf[:shared_value.size])
+    finally:
+        shm_block.close()
+        if unlink:
+            shm_block.unlink()
+    if shared_value.kind == 'str':
+        return data.decode('utf-8')
+    if shared_value.kind == 'array':
+        return numpy.frombuffer(data, dtype=shared_value.dtype).reshape(shared_value.shape)
+    return data
+
+
+def resolve_values(values, unlink=False) -> Any:
+    if not isinstance(values, dict):
+        return values
+    return {key: _read_shared_value(value, unlink) if isinstance(value, SharedValue) else value
+            for key, value in values.items()}
+
+
+def close_blocks(shm_blocks: List) -> None:
+    for shm_block in shm_blocks:
+        shm_block.close()
+        shm_block.unlink()
+
+
+def run_in_worker(function_path: str, params: Dict, cpu_affinity, shm_threshold) -> Any:
+    """ entry of the worker process: pinned to cpu_affinity for the call, large results are shared back """
+    params = resolve_values(params)
+    function = load_function(function_path)
+    prev_affinity = None
+    if cpu_affinity and hasattr(os, 'sched_setaffinity'):
+        prev_affinity = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, cpu_affinity)
+    try:
+        result = function(**params)
+        if inspect.isawaitable(result):
+            result = asyncio.run(result)
+    finally:
+        if prev_affinity is not None:
+            os.sched_setaffinity(0, prev_affinity)
+    # the blocks of the result are unlinked by the engine process once read,
+    # workers share its resource tracker which still reclaims them if the engine dies first
+    result, shm_blocks = share_values(result, shm_threshold)
+    for shm_block in shm_blocks:
+        shm_block.close()
+    return result
+
+
+def warm_up_worker() -> int:
+    return os.getpid()
+
+
+class ProcessExecutor(InnerExecutor):
+    """ calls the inner function in a warm worker process, for cpu-bound steps kept off the engine GIL
+
+        resources: "process": {"cpu_affinity": [2, 3]}, the worker is pinned to those cpus during the call
+        str/bytes/array values of the params and of a dict result beyond shm_threshold pass through shared memory
+        a call that already started in a worker is not interrupted by timeout or cancel
+    """
+    def __init__(self, logger, function_path, submit_process, process_policy):
+        super().__init__(logger, function_path)
+        self._submit_process = submit_process
+        self._cpu_affinity = process_policy.get('cpu_affinity')
+        self._shm_threshold = process_policy.get('shm_threshold')
+        self._future = None
+        self._abort_event = None
+
+    def cancel(self):
+        """ a pending call is dropped, a running one keeps its worker but the waiting task thread is released """
+        future, abort_event = self._future, self._abort_event
+        if future is not None:
+            future.cancel()
+        if abort_event is not None:
+            abort_event.set()
+
+    def _release_call(self, future, shm_blocks):
+        if future.done():
+            close_blocks(shm_blocks)
+            return
+        # timed out or cancelled while the worker still runs, its blocks are released once it is done
+        future.add_done_callback(lambda done_future: self._discard_call(done_future, shm_blocks))
+
+    def _discard_call(self, future, shm_blocks):
+        close_blocks(shm_blocks)
+        if not future.cancelled() and future.exception() is None:
+            resolve_values(future.result(), unlink=True)
+
+    def _submit(self):
+        params, shm_blocks = share_values(self.get_params(), self._shm_threshold)
+        try:
+            self._future = self._submit_process(
+                run_in_worker, self._function_path, params, self._cpu_affinity, self._shm_threshold)
+        except Exception:
+            close_blocks(shm_blocks)
+            raise
+        return shm_blocks
+
+    def run(self, params) -> Any:
+        self._logger.info(f"[Executor] Call function(process): {self._function_path}")
+        self.set_params(params)
+        abort_event = self._abort_event = threading.Event()
+        shm_blocks = self._submit()
+        future = self._future
+        future.add_done_callback(lambda _: abort_event.set())
+        try:
+            if not abort_event.wait(self._timeout or None):
+                raise asyncio.TimeoutError
+            if not future.done() or future.cancelled():
+                raise asyncio.CancelledError
+            result = future.result()
+        finally:
+            self._future = self._abort_event = None
+            self._release_call(future, shm_blocks)
+        return resolve_values(result, unlink=True)
+
+    async def run_async(self, params) -> Any:
+        self._logger.info(f"[Executor] Call function(process, async): {self._function_path}")
+        self.set_params(params)
+        shm_blocks = self._submit()
+        future = self._future
+        try:
+            result = await asyncio.wrap_future(future)
+        finally:
+            self._future = None
+            self._release_call(future, shm_blocks)
+        return resolve_values(result, unlink=True)
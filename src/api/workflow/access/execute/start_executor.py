@@ -9,6 +9,15 @@ class StartExecutor:
     def set_params(self, params):
         self._params = params
 
+    def set_timeout(self, timeout):
+        pass
+
+    def cancel(self):
+        pass
+
     def run(self, params):
         print(f"---- {params} -----")
-        return params
\ No newline at end of file
+        return params
+
+    async def run_async(self, params):
+        return self.run(params)
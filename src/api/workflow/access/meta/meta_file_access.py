@@ -3,6 +3,7 @@
 
 from common.conf_system import getLockDir, getRecipeDir, getRecipeFile
 from api.workflow.access.meta.file_lock import FileLock
+from common.json_codec import load
 from typing import Dict
 import traceback
 import json
@@ -37,8 +38,8 @@ class MetaFileAccess:
         try:
             with FileLock(self._lock_filepath):
                 if os.path.exists(filepath):
-                    with open(filepath, 'r', encoding='utf-8') as fd:
-                        dag_info = json.load(fd)
+                    with open(filepath, 'rb') as fd:
+                        dag_info = load(fd)
                 else:
                     os.makedirs(dirpath, exist_ok=True)
                     with open(filepath, 'w') as fd:
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from api.workflow.access.data.cached_io_data_access import CachedIODataAccess
+from api.workflow.access.data.blob_store_access import BlobStoreAccess, BlobRef
 from api.workflow.error_pool.error import NotExistedData
 
 class DataIoController:
@@ -15,35 +16,43 @@ class DataIoController:
     def __init__(self, logger):
         self._logger = logger
         self._data_access = CachedIODataAccess(logger)
+        self._blob_access = BlobStoreAccess(logger)
 
-    def set_init_service_params_ctl(self, wf_edges_meta):
-        for edge_id, edge_meta in wf_edges_meta.items():
-            service_id = edge_meta.get('target')
-            params_info = edge_meta.get('params_info')
-            for params_map in params_info:
-                if params_map.get('refer_type') == 'direct':
-                    param_name = params_map.get('key')
-                    value = params_map.get('value')
-                    self.set_service_params_ctl(service_id, params_map={param_name: value})
-
-    def set_service_params_ctl(self, service_id, params_map: dict):
-        self._set_data_ctl(service_id, params_map, io_type="I")
-
-    def set_service_result_ctl(self, service_id, result):
-        self._set_data_ctl(service_id, result, io_type='O')
-
-    def _set_data_ctl(self, service_id, data_map, io_type):
-        """ value_id = {io_type}.{service_id}.{param_name}"""
+    def open_run_data_ctl(self, request_id):
+        self._data_access.open_namespace(request_id)
+        for expired_request_id in self._data_access.pop_expired_namespaces():
+            self._blob_access.drop_namespace(expired_request_id)
+
+    def close_run_data_ctl(self, request_id):
+        self._data_access.drop_namespace(request_id)
+        self._blob_access.drop_namespace(request_id)
+
+    def set_service_params_ctl(self, service_id, params_map: dict, request_id=None):
+        self._set_data_ctl(service_id, params_map, io_type="I", request_id=request_id)
+
+    def set_service_result_ctl(self, service_id, result, request_id=None):
+        blob_refs = self._set_data_ctl(service_id, result, io_type='O', request_id=request_id)
+        return blob_refs
+
+    def _set_data_ctl(self, service_id, data_map, io_type, request_id=None):
+        """ value_id = {io_type}.{service_id}.{param_name}, stored in the namespace of request_id
+            returns the BlobRef of each key moved to the blob store """
         if io_type not in ['I', 'O']:
             raise Exception
 
+        blob_refs = {}
         for key_name, value in data_map.items():
             value_id = f"{io_type}.{service_id}.{key_name}"
-            self._data_access.set_data(value_id, value)
-
-    def get_start_service_params_ctl(self, service_id):
+            if request_id is not None and self._blob_access.is_blob_value(value):
+                # large values of a run stay in the blob store, the pool holds the reference
+                value = self._blob_access.put_blob(value, request_id)
+                blob_refs[key_name] = value
+            self._data_access.set_data(value_id, value, request_id)
+        return blob_refs
+
+    def get_start_service_params_ctl(self, service_id, request_id=None):
         params = {}
-        data_pool = self._data_access.get_all()
+        data_pool = self._data_access.get_namespace_data(request_id)
         for key, value in data_pool.items():
             if key.find(f"I.{service_id}") == 0:
                 params_name = key.split(".")[-1]
@@ -53,14 +62,14 @@ class DataIoController:
                 params[params_name] = value
         return params
 
-    def _get_service_value_ctl(self, key_name, io_type='O'):
+    def _get_service_value_ctl(self, key_name, io_type='O', request_id=None):
         """ key_name = {node_id}.{service_name}.{param_name}
             value_id = {io_type}.{node_id}.{service_name}.{param_name}"""
         value_id = f"{io_type}.{key_name}"
-        value = self._data_access.get_data(value_id)
+        value = self._data_access.get_data(value_id, request_id)
         return value
 
-    def get_service_params_ctl(self, service_id, wf_edges_meta):
+    def get_service_params_ctl(self, service_id, wf_edges_meta, request_id=None):
         def _extract_param_name(key_name):
             return key_name.split('.')[-1]
 
@@ -74,9 +83,9 @@ class DataIoController:
                 key = ref_param_map.get('key')
                 if refer_type.lower() == 'indirect':
                     ref_value_id = ref_param_map.get('value')
-                    value = self._get_service_value_ctl(ref_value_id, io_type="O")
+                    value = self._get_service_value_ctl(ref_value_id, io_type="O", request_id=request_id)
                 else:
-                    value = self._get_service_value_ctl(key, io_type="I")#ref_param_map.get('value')
+                    value = self._get_service_value_ctl(key, io_type="I", request_id=request_id)#ref_param_map.get('value')
                 param_name = _extract_param_name(key)
                 params[param_name] = value
         return params
@@ -85,7 +94,25 @@ class DataIoController:
         data_pool = self._data_access.get_all()
         return data_pool
 
-    def get_param_value_control(self, value_id):
-        param_value = self._data_access.get_data(value_id)
+    def get_data_pool_stats_ctl(self):
+        data_pool_stats = dict(self._data_access.get_stats(), blob_store=self._blob_access.get_stats())
+        return data_pool_stats
+
+    def get_param_value_control(self, value_id, request_id=None, pass_blob_ref=False):
+        """ a blob is read back for its consumer, or handed over as a reference when the service fetches it """
+        param_value = self._data_access.get_data(value_id, request_id)
+        if isinstance(param_value, BlobRef):
+            if pass_blob_ref:
+                return param_value.to_dict()
+            return self._blob_access.get_blob(param_value)
         return param_value
 
+    def delete_param_value_ctl(self, value_id, request_id=None):
+        param_value = self._data_access.delete_data(value_id, request_id)
+        if isinstance(param_value, BlobRef):
+            self._blob_access.delete_blob(param_value)
+
+    def get_blob_ctl(self, blob_id):
+        blob_data = self._blob_access.get_blob_bytes(blob_id)
+        return blob_data
+
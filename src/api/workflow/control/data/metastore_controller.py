@@ -3,6 +3,7 @@
 
 from api.workflow.access.meta.meta_file_access import MetaFileAccess
 from api.workflow.access.data.cached_metastore_access import CachedMetastoreAccess
+from api.workflow.access.data.meta_snapshot import freeze_meta
 from typing import Dict
 import threading
 
@@ -14,17 +15,13 @@ class MetastoreController:
         self._meta_file_access = MetaFileAccess(logger)
         self._cached_metastore_access = CachedMetastoreAccess(logger)
 
-    def set_metas_ctl(self, wf_comm_meta, wf_nodes_meta, wf_service_pool, wf_edges_meta,
-                  wf_forward_edge_graph, wf_backward_edge_graph, wf_resources_meta, start_nodes, end_nodes):
-        self.set_comm_meta_ctl(wf_comm_meta)
-        self.set_nodes_meta_ctl(wf_nodes_meta)
-        self.set_node_service_pool_ctl(wf_service_pool)
-        self.set_edges_meta_ctl(wf_edges_meta)
-        self.set_forward_graph_meta_ctl(wf_forward_edge_graph)
-        self.set_backward_graph_meta_ctl(wf_backward_edge_graph)
-        self.set_resources_meta_ctl(wf_resources_meta)
-        self.set_start_nodes_meta_ctl(start_nodes)
-        self.set_end_nodes_meta_ctl(end_nodes)
+    def set_metas_ctl(self, **metas):
+        snapshot = self._cached_metastore_access.publish_snapshot_access(**metas)
+        return snapshot
+
+    def is_changed_dag_ctl(self, wf_dag_meta: Dict) -> bool:
+        current_dag_meta = self._cached_metastore_access.get_dag_access()
+        return current_dag_meta != freeze_meta(wf_dag_meta)
 
     def set_comm_meta_ctl(self, wf_comm_meta):
         self._cached_metastore_access.set_comm_meta_access(wf_comm_meta)
@@ -89,20 +86,22 @@ class MetastoreController:
         edges_param_map = self._cached_metastore_access.get_edges_param_map_access()
         return edges_param_map
 
+    def set_compiled_workflow_ctl(self, compiled_workflow):
+        self._cached_metastore_access.set_compiled_workflow_access(compiled_workflow)
+
+    def get_compiled_workflow_ctl(self):
+        compiled_workflow = self._cached_metastore_access.get_compiled_workflow_access()
+        return compiled_workflow
+
     def get_metas_ctl(self):
-        meta_pack = {
-            "start_nodes": self._cached_metastore_access.get_start_nodes_meta_access(),
-            "end_nodes": self._cached_metastore_access.get_end_nodes_meta_access(),
-            "nodes_info": self._cached_metastore_access.get_nodes_meta_access(),
-            "service_pool": self._cached_metastore_access.get_node_service_pool_access(),
-            "edges_info": self._cached_metastore_access.get_edges_meta_access(),
-            "forward_edge_graph": self._cached_metastore_access.get_forward_edges_graph_meta_access(),
-            "forward_graph": self._cached_metastore_access.get_forward_graph_meta_access(),
-            "backward_graph": self._cached_metastore_access.get_backward_graph_meta_access(),
-            'edges_param_map': self._cached_metastore_access.get_edges_param_map_access()
-        }
+        # frozen meta pack of the current snapshot, shared without copy
+        meta_pack = self._cached_metastore_access.get_metas_access()
         return meta_pack
 
+    def get_snapshot_ctl(self):
+        snapshot = self._cached_metastore_access.get_snapshot_access()
+        return snapshot
+
     def save_wf_meta_on_file(self, wf_file_meta: Dict, dirpath: str = None, filename: str = None) -> None:
         self._meta_file_access.save_wf_meta_on_file(wf_file_meta, dirpath, filename)
 
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.data.cached_plan_access import CachedPlanAccess
+from common.conf_system import getPlanCacheSize
+
+
+class PlanCacheController:
+    def __init__(self, logger):
+        self._cached_plan_access = CachedPlanAccess(logger, getPlanCacheSize())
+
+    def get_action_plan_ctl(self, plan_key):
+        act_plan = self._cached_plan_access.get_plan_access(plan_key)
+        return act_plan
+
+    def set_action_plan_ctl(self, plan_key, act_plan):
+        self._cached_plan_access.set_plan_access(plan_key, act_plan)
+
+    def clear_action_plan_ctl(self):
+        self._cached_plan_access.clear_plan_access()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.data.cached_result_access import CachedResultAccess
+from api.workflow.control.meta.resource_parser import ResourceParser
+from common.conf_system import getResultCacheConfig
+from common.json_codec import dumps
+from typing import Any, Dict
+import hashlib
+import copy
+
+
+class ResultCacheController:
+    """ opt-in memoization of deterministic services, configured per node in the recipe resources
+
+        "cache": {"services": ["{service_name}"], "max_size": 1024, "ttl": 300, "max_memory": 67108864}
+        "cache": true enables every service of the node with the [RESULT_CACHE] defaults
+    """
+    def __init__(self, logger):
+        self._logger = logger
+        self._default_policy = getResultCacheConfig()
+        self._resource_parser = ResourceParser(logger)
+        self._cached_result_access = CachedResultAccess(logger)
+
+    def _dumps(self, data) -> bytes:
+        return dumps(data, sort_keys=True)
+
+    def gen_cache_policy_ctl(self, resources: Dict, service_id: str) -> Dict:
+        cache_conf = self._resource_parser.get_service_resource(resources, service_id, 'cache')
+        if cache_conf is None:
+            return None
+        cache_policy = self._resource_parser.merge_policy(self._default_policy, cache_conf)
+        return cache_policy
+
+    def gen_cache_key_ctl(self, params: Dict) -> str:
+        """ canonical hash of the resolved params, independent of key order, None when they are not serializable """
+        try:
+            cache_key = hashlib.sha256(self._dumps(params)).hexdigest()
+        except (TypeError, ValueError) as e:
+            self._logger.warn(f"# Not cacheable params: {e}")
+            return None
+        return cache_key
+
+    def get_result_ctl(self, service_id: str, cache_key: str) -> Any:
+        result = self._cached_result_access.get_result_access(service_id, cache_key)
+        if result is None:
+            return None
+        return copy.deepcopy(result)
+
+    def set_result_ctl(self, service_id: str, cache_key: str, result: Any, cache_policy: Dict) -> None:
+        if result is None:
+            return
+        try:
+            size = len(self._dumps(result))
+        except (TypeError, ValueError) as e:
+            self._logger.warn(f"# Not cacheable result of {service_id}: {e}")
+            return
+        self._cached_result_access.set_result_access(
+            service_id, cache_key, copy.deepcopy(result), size,
+            max_size=cache_policy.get('max_size'),
+            ttl=cache_policy.get('ttl'),
+            max_memory=cache_policy.get('max_memory')
+        )
+
+    def clear_result_ctl(self) -> None:
+        self._cached_result_access.clear_result_access()
+
+    def get_stats_ctl(self) -> Dict:
+        stats = self._cached_result_access.get_stats_access()
+        return stats
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.error_pool.error import RunRejected
+from common.conf_system import getAdmissionConfig
+from collections import deque
+from typing import Dict
+import asyncio
+import math
+import time
+
+
+class AdmissionController:
+    """ bounds the runs in flight on the server event loop
+
+        up to max_running_runs run at once, the next max_queued_runs wait in FIFO order,
+        a run is rejected when the queue is full or it waited for queue_timeout seconds
+        Retry-After is estimated from the recent run durations and the queue ahead
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_waiting_runs'):
+            return
+        self._logger = logger
+        admission_conf = getAdmissionConfig()
+        self._max_running_runs = admission_conf.get('max_running_runs')
+        self._max_queued_runs = admission_conf.get('max_queued_runs')
+        self._queue_timeout = admission_conf.get('queue_timeout')
+        self._running_runs = 0
+        self._waiting_runs = deque()
+        self._run_duration = 1.0
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'expired': 0}
+
+    def _get_retry_after(self) -> int:
+        run_slots = self._max_running_runs or 1
+        retry_after = self._run_duration * (len(self._waiting_runs) + 1) / run_slots
+        return max(math.ceil(retry_after), 1)
+
+    def _reject(self, reason) -> RunRejected:
+        self._stats['rejected'] += 1
+        return RunRejected(reason, self._get_retry_after())
+
+    async def admit_run_ctl(self, request_id: str) -> float:
+        """ returns the admission time once the run may start, raises RunRejected under overload """
+        if not self._max_running_runs or (self._running_runs < self._max_running_runs and not self._waiting_runs):
+            self._running_runs += 1
+            self._stats['admitted'] += 1
+            return time.monotonic()
+
+        if self._max_queued_runs and len(self._waiting_runs) >= self._max_queued_runs:
+            self._logger.warn(f"# Admission queue is full, reject run: {request_id}")
+            raise self._reject("queue is full")
+
+        admission = asyncio.get_running_loop().create_future()
+        self._waiting_runs.append(admission)
+        self._stats['queued'] += 1
+        try:
+            await asyncio.wait_for(admission, self._queue_timeout or None)
+        except asyncio.TimeoutError:
+            if admission in self._waiting_runs:
+                self._waiting_runs.remove(admission)
+            self._stats['expired'] += 1
+            self._logger.warn(f"# Admission queue wait exceeded {self._queue_timeout}s, reject run: {request_id}")
+            raise self._reject("queue wait timed out")
+        except asyncio.CancelledError:
+            if admission.done() and not admission.cancelled():
+                self.release_run_ctl()
+            elif admission in self._waiting_runs:
+                self._waiting_runs.remove(admission)
+            raise
+        self._stats['admitted'] += 1
+        return time.monotonic()
+
+    def release_run_ctl(self, admitted_ts: float = None) -> None:
+        """ hands the run slot over to the oldest waiting run """
+        if admitted_ts is not None:
+            self._run_duration = 0.8 * self._run_duration + 0.2 * (time.monotonic() - admitted_ts)
+        while self._waiting_runs:
+            admission = self._waiting_runs.popleft()
+            if not admission.done():
+                admission.set_result(True)
+                return
+        self._running_runs -= 1
+
+    def get_stats_ctl(self) -> Dict:
+        stats = dict(self._stats,
+                     running=self._running_runs,
+                     waiting=len(self._waiting_runs),
+                     max_running_runs=self._max_running_runs,
+                     max_queued_runs=self._max_queued_runs,
+                     run_duration=round(self._run_duration, 3))
+        return stats
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.control.execute.task_state import TaskState
+from api.workflow.access.execute.process_executor import warm_up_worker
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from common.conf_system import getMaxWorkers, getProcessPoolConfig
+from collections import deque
+from typing import Callable, Dict, List
+import multiprocessing
+import threading
+import os
+
+
+class ExecutionPool:
+    """ process-wide budget of running tasks shared by every run
+
+        a ready task starts once a worker and every concurrency slot of its service are free,
+        otherwise it waits in FIFO order and is started by the release of a finished task
+        slots: [(slot_key, limit)], e.g. [(('service', service_id), 4), (('node', node_id), 8)]
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_running_counts'):
+            return
+        self._logger = logger
+        self._thread_lock = threading.Lock()
+        self._max_workers = getMaxWorkers()
+        self._running_workers = 0
+        self._running_counts = {}
+        self._waiting_tasks = deque()
+        self._thread_executor = None
+        self._process_pool_conf = getProcessPoolConfig()
+        self._process_executor = None
+
+    def _is_available(self, slots: List) -> bool:
+        if self._max_workers and self._running_workers >= self._max_workers:
+            return False
+        for slot_key, limit in slots:
+            if limit and self._running_counts.get(slot_key, 0) >= limit:
+                return False
+        return True
+
+    def _acquire(self, slots: List) -> None:
+        self._running_workers += 1
+        for slot_key, limit in slots:
+            self._running_counts[slot_key] = self._running_counts.get(slot_key, 0) + 1
+
+    def _pop_startable_tasks(self) -> List:
+        """ FIFO scan of the waiting tasks, a task blocked by its own slots does not hold back the others """
+        startable_tasks = []
+        blocked_tasks = deque()
+        while self._waiting_tasks:
+            if self._max_workers and self._running_workers >= self._max_workers:
+                break
+            task, slots, start = self._waiting_tasks.popleft()
+            if task.get_state() == TaskState.CANCELED:
+                continue
+            if self._is_available(slots):
+                self._acquire(slots)
+                startable_tasks.append(start)
+            else:
+                blocked_tasks.append((task, slots, start))
+        blocked_tasks.extend(self._waiting_tasks)
+        self._waiting_tasks = blocked_tasks
+        return startable_tasks
+
+    def submit(self, task, slots: List, start: Callable) -> bool:
+        """ calls start() now when the slots are free, returns False when the task is queued instead """
+        with self._thread_lock:
+            self._waiting_tasks.append((task, slots, start))
+            startable_tasks = self._pop_startable_tasks()
+        for startable_task in startable_tasks:
+            startable_task()
+        return start in startable_tasks
+
+    def release(self, slots: List) -> None:
+        with self._thread_lock:
+            self._running_workers -= 1
+            for slot_key, limit in slots:
+                running_count = self._running_counts.get(slot_key, 0) - 1
+                if running_count > 0:
+                    self._running_counts[slot_key] = running_count
+                else:
+                    self._running_counts.pop(slot_key, None)
+            startable_tasks = self._pop_startable_tasks()
+        for start in startable_tasks:
+            start()
+
+    def get_thread_executor(self) -> ThreadPoolExecutor:
+        """ warm workers of the thread orchestration mode, sized to the worker budget """
+        with self._thread_lock:
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(max_workers=self._max_workers or None,
+                                                           thread_name_prefix='task')
+        return self._thread_executor
+
+    def _get_process_workers(self) -> int:
+        return self._process_pool_conf.get('max_workers') or os.cpu_count() or 1
+
+    def _new_process_executor(self) -> ProcessPoolExecutor:
+        process_workers = self._get_process_workers()
+        mp_context = multiprocessing.get_context(self._process_pool_conf.get('start_method'))
+        process_executor = ProcessPoolExecutor(max_workers=process_workers, mp_context=mp_context)
+        # starts every worker now, the first cpu-bound calls do not pay the interpreter start
+        for _ in range(process_workers):
+            process_executor.submit(warm_up_worker)
+        self._logger.info(f"[ExecutionPool] started {process_workers} worker processes")
+        return process_executor
+
+    def get_process_executor(self) -> ProcessPoolExecutor:
+        """ warm worker processes of the "process" inner functions """
+        with self._thread_lock:
+            if self._process_executor is None:
+                self._process_executor = self._new_process_executor()
+        return self._process_executor
+
+    def _restart_process_executor(self, broken_executor: ProcessPoolExecutor) -> None:
+        with self._thread_lock:
+            # another caller may have replaced it already
+            if self._process_executor is not broken_executor:
+                return
+            self._process_executor = None
+        self._logger.warn("[ExecutionPool] worker process pool is broken, restart it")
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit_process(self, function: Callable, *args) -> Future:
+        """ runs function(*args) in a worker process, a pool broken by a crashed worker is replaced once """
+        process_executor = self.get_process_executor()
+        try:
+            return process_executor.submit(function, *args)
+        except BrokenProcessPool:
+            self._restart_process_executor(process_executor)
+        return self.get_process_executor().submit(function, *args)
+
+    def shutdown(self) -> None:
+        with self._thread_lock:
+            process_executor = self._process_executor
+            self._process_executor = None
+        if process_executor is not None:
+            process_executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        with self._thread_lock:
+            stats = {
+                'max_workers': self._max_workers,
+                'running': self._running_workers,
+                'waiting': len(self._waiting_tasks),
+                'slots': {'.'.join(slot_key): running_count for slot_key, running_count in self._running_counts.items()},
+                'process_workers': self._get_process_workers() if self._process_executor is not None else 0
+            }
+        return stats
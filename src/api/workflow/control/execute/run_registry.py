@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.control.execute.task_state import TaskState
+from common.conf_system import getRunRegistryConfig
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict
+import asyncio
+import time
+
+
+class RunHandle:
+    """ state of a submitted run, task states and results are read live from its task map """
+    def __init__(self, run_id, request_id=None):
+        self._run_id = run_id
+        self._request_id = request_id
+        self._state = TaskState.QUEUED
+        self._submit_time = datetime.now()
+        self._start_time = None
+        self._end_time = None
+        self._finished_ts = None
+        self._task_map = {}
+        self._result = None
+        self._error = None
+        self._done_event = asyncio.Event()
+
+    def get_run_id(self):
+        return self._run_id
+
+    def get_state(self):
+        return self._state
+
+    def is_finished(self):
+        return self._finished_ts is not None
+
+    def get_finished_ts(self):
+        return self._finished_ts
+
+    def set_running(self, task_map):
+        self._state = TaskState.RUNNING
+        self._start_time = datetime.now()
+        self._task_map = task_map or {}
+
+    def set_finished(self, result=None, error=None):
+        if error is not None:
+            self._state = TaskState.FAILED
+        else:
+            task_states = [task.get_state() for task in self._task_map.values()]
+            if TaskState.TIMEOUT in task_states:
+                self._state = TaskState.TIMEOUT
+            elif TaskState.FAILED in task_states:
+                self._state = TaskState.FAILED
+            elif TaskState.CANCELED in task_states:
+                self._state = TaskState.CANCELED
+            else:
+                self._state = TaskState.COMPLETED
+        self._result = result
+        self._error = error
+        self._end_time = datetime.now()
+        self._finished_ts = time.monotonic()
+        self._done_event.set()
+
+    async def wait(self, timeout) -> bool:
+        try:
+            await asyncio.wait_for(self._done_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.is_finished()
+
+    def _format_time(self, time_value):
+        return time_value.isoformat() if time_value else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        tasks = {}
+        partial_results = {}
+        for service_id, task in self._task_map.items():
+            task_state = task.get_state()
+            tasks[service_id] = {
+                'state': task_state.name,
+                'start_time': self._format_time(task.get_start_time()),
+                'end_time': self._format_time(task.get_end_time()),
+                'error': str(task.get_error()) if task.get_error() else None
+            }
+            if task_state == TaskState.COMPLETED:
+                partial_results[service_id] = task.get_result()
+        run_info = {
+            'run_id': self._run_id,
+            'request_id': self._request_id,
+            'state': self._state.name,
+            'submit_time': self._format_time(self._submit_time),
+            'start_time': self._format_time(self._start_time),
+            'end_time': self._format_time(self._end_time),
+            'tasks': tasks,
+            'partial_results': partial_results,
+            'result': self._result,
+            'error': str(self._error) if self._error else None
+        }
+        return run_info
+
+
+class RunRegistry:
+    """ handles of the submitted runs, finished ones are dropped after ttl or beyond max_runs """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, logger):
+        if hasattr(self, '_run_handles'):
+            return
+        self._logger = logger
+        run_registry_conf = getRunRegistryConfig()
+        self._max_runs = run_registry_conf.get('max_runs')
+        self._ttl = run_registry_conf.get('ttl')
+        self._max_wait = run_registry_conf.get('max_wait')
+        self._run_handles = OrderedDict()
+
+    def _evict_runs(self) -> None:
+        now_ts = time.monotonic()
+        for run_id, run_handle in list(self._run_handles.items()):
+            if run_handle.is_finished() and self._ttl and now_ts - run_handle.get_finished_ts() > self._ttl:
+                del self._run_handles[run_id]
+        if not self._max_runs:
+            return
+        for run_id, run_handle in list(self._run_handles.items()):
+            if len(self._run_handles) < self._max_runs:
+                break
+            if run_handle.is_finished():
+                del self._run_handles[run_id]
+
+    def open_run_ctl(self, run_id: str, request_id: str = None) -> RunHandle:
+        """ run_id is minted by the engine, the request_id of the client may repeat across runs """
+        self._evict_runs()
+        run_handle = RunHandle(run_id, request_id)
+        self._run_handles[run_id] = run_handle
+        return run_handle
+
+    def get_run_ctl(self, run_id: str) -> RunHandle:
+        return self._run_handles.get(run_id)
+
+    async def wait_run_ctl(self, run_handle: RunHandle, wait: float) -> bool:
+        """ long-poll: returns once the run finished or after wait seconds, capped by max_wait """
+        if run_handle.is_finished() or not wait or wait <= 0:
+            return run_handle.is_finished()
+        if self._max_wait:
+            wait = min(wait, self._max_wait)
+        is_finished = await run_handle.wait(wait)
+        return is_finished
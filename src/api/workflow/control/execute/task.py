@@ -3,7 +3,9 @@
 
 from api.workflow.control.execute.task_context import TaskContext
 from api.workflow.control.execute.task_state import TaskState
+from api.workflow.error_pool.error import ExceededTimeout
 from datetime import datetime
+import asyncio
 
 
 class Task(TaskContext):
@@ -17,6 +19,12 @@ class Task(TaskContext):
         self._end_time = None
         self._params = {}
         self._result = None
+        self._is_cached = False
+        self._timeout = None
+        self._retry_policy = None
+        self._attempts = 0
+        self._concurrency_slots = []
+        self._pass_blob_ref = False
 
     def set_params(self, params=None):
         self._params = params
@@ -24,6 +32,9 @@ class Task(TaskContext):
     def _set_result(self, result):
         self._result = result
 
+    def set_result(self, result):
+        self._set_result(result)
+
     def get_params(self):
         return self._params
 
@@ -37,6 +48,9 @@ class Task(TaskContext):
     def get_error(self):
         return self._error
 
+    def set_error(self, error):
+        self._error = error
+
     def set_task(self, name, executor, **kwargs):
         self._task_name = name
         self._executor = executor
@@ -45,23 +59,122 @@ class Task(TaskContext):
     def get_result(self):
         return self._result
 
-    def execute(self):
+    def get_start_time(self):
+        return self._start_time
+
+    def get_end_time(self):
+        return self._end_time
+
+    def set_timeout(self, timeout=None):
+        self._timeout = timeout
+
+    def get_timeout(self):
+        return self._timeout
+
+    def set_retry_policy(self, retry_policy=None):
+        self._retry_policy = retry_policy
+
+    def get_retry_policy(self):
+        return self._retry_policy
+
+    def set_concurrency_slots(self, concurrency_slots=None):
+        self._concurrency_slots = concurrency_slots or []
+
+    def get_concurrency_slots(self):
+        return self._concurrency_slots
+
+    def set_pass_blob_ref(self, pass_blob_ref=False):
+        self._pass_blob_ref = pass_blob_ref
+
+    def is_pass_blob_ref(self):
+        return self._pass_blob_ref
+
+    def get_attempts(self):
+        return self._attempts
+
+    def _set_timeout_error(self, timeout):
+        self._state = TaskState.TIMEOUT
+        self._error = ExceededTimeout(timeout)
+        self._logger.error(f"{self._service_id}: {self._error}")
+
+    def set_cached_result(self, result):
+        self._start_time = self._end_time = datetime.now()
+        self._set_result(result)
+        self._is_cached = True
+        self._state = TaskState.COMPLETED
+
+    def is_cached(self):
+        return self._is_cached
+
+    def _is_running(self):
+        """ False once the task was expired or cancelled from outside, a late outcome of its call is dropped """
+        return self._state == TaskState.RUNNING
+
+    def execute(self, timeout=None):
         try:
             self._state = TaskState.RUNNING
             self._start_time = datetime.now()
+            self._attempts += 1
+            self._executor.set_timeout(timeout)
             result = self._executor.run(self._params)
-            self._set_result(result)
-            self._state = TaskState.COMPLETED
+            if self._is_running():
+                self._set_result(result)
+                self._state = TaskState.COMPLETED
+        except asyncio.TimeoutError:
+            if self._is_running():
+                self._set_timeout_error(timeout)
+        except asyncio.CancelledError:
+            if self._is_running():
+                self._state = TaskState.CANCELED
+        except Exception as e:
+            if self._is_running():
+                self._state = TaskState.FAILED
+                self._error = e
+            self._logger.error(e)
+        finally:
+            self._end_time = datetime.now()
+        self._logger.debug(f"{self._start_time} - {self._end_time}")
+
+    async def execute_async(self, timeout=None):
+        try:
+            self._state = TaskState.RUNNING
+            self._start_time = datetime.now()
+            self._attempts += 1
+            self._executor.set_timeout(timeout)
+            if timeout:
+                result = await asyncio.wait_for(self._executor.run_async(self._params), timeout)
+            else:
+                result = await self._executor.run_async(self._params)
+            if self._is_running():
+                self._set_result(result)
+                self._state = TaskState.COMPLETED
+        except asyncio.TimeoutError:
+            if self._is_running():
+                self._set_timeout_error(timeout)
         except Exception as e:
-            self._state = TaskState.FAILED
-            self._error = e
+            if self._is_running():
+                self._state = TaskState.FAILED
+                self._error = e
             self._logger.error(e)
         finally:
             self._end_time = datetime.now()
         self._logger.debug(f"{self._start_time} - {self._end_time}")
 
+    def expire(self):
+        """ run deadline passed: a running task moves to TIMEOUT and its in-flight call is aborted """
+        if self._state != TaskState.RUNNING:
+            return False
+        self._set_timeout_error(None)
+        self._executor.cancel()
+        return True
+
     def cancel(self):
-        if self._state in (TaskState.PENDING, TaskState.SCHEDULED, TaskState.ASSIGNED, TaskState.QUEUED):
+        """ moves a task that has not finished to CANCELED and aborts its in-flight call """
+        if self._state in (TaskState.PENDING, TaskState.SCHEDULED, TaskState.QUEUED, TaskState.RETRYING):
+            self._state = TaskState.CANCELED
+            return True
+        if self._state == TaskState.RUNNING:
             self._state = TaskState.CANCELED
+            self._executor.cancel()
             return True
         return False
\ No newline at end of file
@@ -4,6 +4,11 @@
 from api.workflow.access.execute.start_executor import StartExecutor
 from api.workflow.access.execute.end_executor import EndExecutor
 from api.workflow.access.execute.api_executor import ApiExecutor
+from api.workflow.access.execute.batch_api_executor import BatchApiExecutor
+from api.workflow.access.execute.hedged_api_executor import HedgedApiExecutor
+from api.workflow.access.execute.inner_executor import InnerExecutor
+from api.workflow.access.execute.process_executor import ProcessExecutor
+from api.workflow.control.execute.execution_pool import ExecutionPool
 import time
 
 
@@ -33,12 +38,16 @@ class TaskContext:
                 self._set_start_executor()
             elif self._role == 'end':
                 self._set_end_executor()
+            elif self._is_inner_function(service_info):
+                self._set_inner_executor(service_info.get('function'))
             else:
                 self._conn_info = self._extract_api_info(service_info)
                 self._set_api_executor(**self._conn_info)
         elif self._node_type.lower() == 'engine':
             if self._task_type.lower() == 'start_node':
                 self._set_start_executor()
+            elif service_info.get('function'):
+                self._set_inner_executor(service_info.get('function'))
             else:
                 self._conn_info = self._extract_api_info(service_info)
         else:
@@ -85,6 +94,49 @@ class TaskContext:
         self._executor = ApiExecutor(self._logger)
         self._executor.set_api(url=url, method=method, header=header, body=body)
 
+    def _is_inner_function(self, service_info):
+        """ inner services declaring "function": "{module}:{function}" run in-process """
+        return bool(self._location) and self._location.lower() == 'inner' and bool(service_info.get('function'))
+
+    def _set_inner_executor(self, function_path):
+        self._executor = InnerExecutor(self._logger, function_path, ExecutionPool(self._logger).get_thread_executor())
+
+    def set_process_policy(self, process_policy):
+        """ runs the inner function of this task in the worker processes, for cpu-bound steps """
+        if type(self._executor) is not InnerExecutor:
+            return
+        execution_pool = ExecutionPool(self._logger)
+        self._executor = ProcessExecutor(self._logger, self._executor.get_function_path(),
+                                         execution_pool.submit_process, process_policy)
+
+    def set_batch_policy(self, batch_policy):
+        """ routes the api calls of this task through the shared batcher of the service """
+        if not isinstance(self._executor, ApiExecutor):
+            return
+        self._executor = BatchApiExecutor(self._logger, batch_policy)
+        self._executor.set_api(url=self._conn_info.get('url'), method=self._conn_info.get('method'),
+                               header=self._conn_info.get('header'), body=self._conn_info.get('body'))
+
+    def set_hedge_policy(self, hedge_policy):
+        """ sends a duplicate of slow calls of this task, not combined with batching """
+        if type(self._executor) is not ApiExecutor:
+            return
+        self._executor = HedgedApiExecutor(self._logger, self._service_id, hedge_policy)
+        self._executor.set_api(url=self._conn_info.get('url'), method=self._conn_info.get('method'),
+                               header=self._conn_info.get('header'), body=self._conn_info.get('body'))
+
+    def set_kserve_binary_policy(self, kserve_binary_policy):
+        """ tensors of this task use the KServe v2 binary data extension, batched calls stay json """
+        if not isinstance(self._executor, ApiExecutor) or isinstance(self._executor, BatchApiExecutor):
+            return
+        self._executor.set_kserve_binary_policy(kserve_binary_policy)
+
+    def set_use_msgpack(self, use_msgpack):
+        """ bodies of this task are msgpack, batched calls stay json """
+        if not isinstance(self._executor, ApiExecutor) or isinstance(self._executor, BatchApiExecutor):
+            return
+        self._executor.set_use_msgpack(use_msgpack)
+
     def _set_start_executor(self):
         self._executor = StartExecutor(self._logger)
 
@@ -12,17 +12,19 @@ class TaskStateManager:
             TaskState.PENDING: [TaskState.SCHEDULED, TaskState.CANCELED, TaskState.SKIPPED],
             TaskState.SCHEDULED: [TaskState.QUEUED, TaskState.CANCELED],
             TaskState.QUEUED: [TaskState.RUNNING, TaskState.CANCELED],
-            TaskState.RUNNING: [TaskState.COMPLETED, TaskState.FAILED, TaskState.PAUSED, TaskState.TIMEOUT],
+            TaskState.RUNNING: [TaskState.COMPLETED, TaskState.FAILED, TaskState.PAUSED, TaskState.TIMEOUT, TaskState.CANCELED],
             TaskState.PAUSED: [TaskState.RUNNING, TaskState.CANCELED],
             TaskState.FAILED: [TaskState.RETRYING, TaskState.CANCELED],
+            TaskState.TIMEOUT: [TaskState.RETRYING, TaskState.CANCELED],
+            TaskState.RETRYING: [TaskState.QUEUED, TaskState.RUNNING, TaskState.CANCELED],
         }
 
-        return target_state in valid_transitions.get(task.state, [])
+        return target_state in valid_transitions.get(task.get_state(), [])
 
     @staticmethod
     def transition(task, target_state):
         """상태 전이 수행"""
         if TaskStateManager.can_transition(task, target_state):
-            task.state = target_state
+            task.set_state(target_state)
             return True
         return False
\ No newline at end of file
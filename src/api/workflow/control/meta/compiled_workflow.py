@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Tuple
+
+
+class CompiledWorkflow:
+    """ read-only execution plan of a recipe, built once per load
+
+        node_id: interned integer index of a service_id
+        forward/backward adjacency: CSR, neighbors of node n are targets[offsets[n]:offsets[n + 1]]
+        param_slots: per node, tuple of (param_name, refer_type, value_id) resolved from edges_param_map,
+                     value_id holds the literal itself for 'constant' slots
+        value refs: number of active nodes reading a data pool value, its liveness within a run
+    """
+    def __init__(self, version, service_ids, forward_offsets, forward_targets,
+                 backward_offsets, backward_targets, topo_order, param_slots):
+        self._version = version
+        self._service_ids = service_ids
+        self._node_index = {service_id: node_id for node_id, service_id in enumerate(service_ids)}
+        self._forward_offsets = forward_offsets
+        self._forward_targets = forward_targets
+        self._backward_offsets = backward_offsets
+        self._backward_targets = backward_targets
+        self._topo_order = topo_order
+        self._param_slots = param_slots
+
+    def get_version(self) -> int:
+        return self._version
+
+    def get_node_count(self) -> int:
+        return len(self._service_ids)
+
+    def get_service_ids(self) -> Tuple:
+        return self._service_ids
+
+    def get_node_id(self, service_id: str) -> int:
+        return self._node_index.get(service_id)
+
+    def get_service_id(self, node_id: int) -> str:
+        return self._service_ids[node_id]
+
+    def to_node_ids(self, service_ids: List) -> frozenset:
+        node_ids = frozenset(self._node_index[service_id] for service_id in service_ids if service_id in self._node_index)
+        return node_ids
+
+    def to_service_ids(self, node_ids) -> List:
+        service_ids = [self._service_ids[node_id] for node_id in node_ids]
+        return service_ids
+
+    def get_next_node_ids(self, node_id: int) -> Tuple:
+        return self._forward_targets[self._forward_offsets[node_id]:self._forward_offsets[node_id + 1]]
+
+    def get_prev_node_ids(self, node_id: int) -> Tuple:
+        return self._backward_targets[self._backward_offsets[node_id]:self._backward_offsets[node_id + 1]]
+
+    def get_topo_order(self) -> Tuple:
+        return self._topo_order
+
+    def get_param_slots(self, node_id: int) -> Tuple:
+        return self._param_slots[node_id]
+
+    def get_value_ids(self, node_id: int, act_param_slots: Dict = None) -> frozenset:
+        """ data pool values read by the node, 'constant' slots excluded """
+        param_slots = (act_param_slots or {}).get(node_id) or self._param_slots[node_id]
+        value_ids = frozenset(value_id for param_name, refer_type, value_id in param_slots if refer_type != 'constant')
+        return value_ids
+
+    def count_value_refs(self, act_node_ids, act_param_slots: Dict = None) -> Dict:
+        value_refs = {}
+        for node_id in act_node_ids:
+            for value_id in self.get_value_ids(node_id, act_param_slots):
+                value_refs[value_id] = value_refs.get(value_id, 0) + 1
+        return value_refs
+
+    def _find_reachable_node_ids(self, node_id: int, offsets: Tuple, targets: Tuple) -> frozenset:
+        visited = {node_id}
+        stack = [node_id]
+        while stack:
+            curr_node_id = stack.pop()
+            for neighbor_id in targets[offsets[curr_node_id]:offsets[curr_node_id + 1]]:
+                if neighbor_id not in visited:
+                    visited.add(neighbor_id)
+                    stack.append(neighbor_id)
+        return frozenset(visited)
+
+    def find_descendant_node_ids(self, node_id: int) -> frozenset:
+        """ node_id and every node reachable from it, O(V + E) """
+        return self._find_reachable_node_ids(node_id, self._forward_offsets, self._forward_targets)
+
+    def find_ancestor_node_ids(self, node_id: int) -> frozenset:
+        """ node_id and every node that reaches it, O(V + E) """
+        return self._find_reachable_node_ids(node_id, self._backward_offsets, self._backward_targets)
+
+    def find_start_node_ids(self, act_node_ids) -> List:
+        start_node_ids = []
+        for node_id in self._topo_order:
+            if node_id not in act_node_ids:
+                continue
+            if not any(prev_node_id in act_node_ids for prev_node_id in self.get_prev_node_ids(node_id)):
+                start_node_ids.append(node_id)
+        return start_node_ids
+
+    def find_end_node_ids(self, act_node_ids) -> List:
+        end_node_ids = []
+        for node_id in self._topo_order:
+            if node_id not in act_node_ids:
+                continue
+            if not any(next_node_id in act_node_ids for next_node_id in self.get_next_node_ids(node_id)):
+                end_node_ids.append(node_id)
+        return end_node_ids
+
+    def count_prev_node_ids(self, act_node_ids) -> Dict:
+        prev_counts = {}
+        for node_id in act_node_ids:
+            prev_counts[node_id] = sum(1 for prev_node_id in self.get_prev_node_ids(node_id) if prev_node_id in act_node_ids)
+        return prev_counts
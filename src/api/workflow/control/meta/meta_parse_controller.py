@@ -2,11 +2,13 @@
 # -*- coding: utf-8 -*-
 
 from api.workflow.control.meta.edge_transform import EdgeTransformer
+from api.workflow.control.meta.workflow_compiler import WorkflowCompiler
 
 class MetaParseController:
     def __init__(self, logger):
         self._logger = logger
         self._edge_transformer = EdgeTransformer(logger)
+        self._workflow_compiler = WorkflowCompiler(logger)
 
     def extract_wf_common_info_ctl(self, wf_meta: dict) -> dict:
         wf_comm_meta = {
@@ -45,7 +47,7 @@ class MetaParseController:
             curr_node = edge_info.get('source')
             next_node = edge_info.get('target')
             param_map_list = edge_info.get('params_info')
-            forward_edge_graph[next_node] = {}
+            forward_edge_graph.setdefault(next_node, {})
             if curr_node in forward_edge_graph.keys():
                 forward_edge_graph[curr_node][next_node] = param_map_list
             else:
@@ -57,7 +59,7 @@ class MetaParseController:
         for edge_id, edge_info in edges_meta.items():
             curr_node = edge_info.get('source')
             next_node = edge_info.get('target')
-            forward_graph[next_node] = []
+            forward_graph.setdefault(next_node, [])
             if curr_node in forward_graph.keys():
                 forward_graph[curr_node].append(next_node)
             else:
@@ -124,3 +126,7 @@ class MetaParseController:
     def extract_params_map_ctl(self, start_nodes, wf_service_pool, wf_edges_meta) -> dict:
         edge_params_map = self._edge_transformer.cvt_params_map_ctl(start_nodes, wf_service_pool, wf_edges_meta)
         return edge_params_map
+
+    def compile_workflow_ctl(self, wf_forward_graph, wf_backward_graph, edges_param_map):
+        compiled_workflow = self._workflow_compiler.compile(wf_forward_graph, wf_backward_graph, edges_param_map)
+        return compiled_workflow
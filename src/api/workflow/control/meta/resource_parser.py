@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Mapping
+
+
+class ResourceParser:
+    """ per-service view of the recipe resources block
+
+        "resources": {
+            "{node_id}": {
+                "{resource_name}": {"services": ["{service_name}"], ...options}
+            }
+        }
+        a resource block applies to every service of the node unless "services" is given,
+        true enables it with the defaults and "enable": false turns it off
+    """
+    def __init__(self, logger):
+        self._logger = logger
+
+    def get_service_resource(self, resources: Mapping, service_id: str, resource_name: str) -> Dict:
+        node_id, _, service_name = service_id.rpartition('.')
+        node_resources = (resources or {}).get(node_id) or {}
+        resource_conf = node_resources.get(resource_name)
+        if not resource_conf:
+            return None
+        if resource_conf is True:
+            return {}
+        if not resource_conf.get('enable', True):
+            return None
+        services = resource_conf.get('services')
+        if services and service_name not in services:
+            return None
+        return resource_conf
+
+    def merge_policy(self, default_policy: Dict, resource_conf: Mapping) -> Dict:
+        policy = dict(default_policy)
+        for policy_key in default_policy.keys():
+            if resource_conf.get(policy_key) is not None:
+                policy[policy_key] = resource_conf.get(policy_key)
+        return policy
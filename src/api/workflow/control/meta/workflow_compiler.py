@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.control.meta.compiled_workflow import CompiledWorkflow
+from api.workflow.error_pool.error import CyclicWorkflowGraph
+from collections import deque
+from typing import Dict, List
+import itertools
+
+
+class WorkflowCompiler:
+    _version_counter = itertools.count(1)
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def _intern_service_ids(self, forward_graph: Dict) -> tuple:
+        service_ids = list(forward_graph.keys())
+        for next_service_ids in forward_graph.values():
+            for next_service_id in next_service_ids:
+                if next_service_id not in forward_graph:
+                    service_ids.append(next_service_id)
+        return tuple(dict.fromkeys(service_ids))
+
+    def _build_csr(self, service_ids: tuple, node_index: Dict, graph: Dict) -> tuple:
+        offsets = [0]
+        targets = []
+        for service_id in service_ids:
+            neighbor_ids = graph.get(service_id) or []
+            for neighbor_id in dict.fromkeys(neighbor_ids):
+                targets.append(node_index[neighbor_id])
+            offsets.append(len(targets))
+        return tuple(offsets), tuple(targets)
+
+    def _sort_topology(self, node_count: int, forward_offsets: tuple, forward_targets: tuple) -> tuple:
+        in_degrees = [0] * node_count
+        for target in forward_targets:
+            in_degrees[target] += 1
+
+        ready_node_ids = deque(node_id for node_id in range(node_count) if in_degrees[node_id] == 0)
+        topo_order = []
+        while ready_node_ids:
+            node_id = ready_node_ids.popleft()
+            topo_order.append(node_id)
+            for next_node_id in forward_targets[forward_offsets[node_id]:forward_offsets[node_id + 1]]:
+                in_degrees[next_node_id] -= 1
+                if in_degrees[next_node_id] == 0:
+                    ready_node_ids.append(next_node_id)
+
+        if len(topo_order) != node_count:
+            raise CyclicWorkflowGraph
+        return tuple(topo_order)
+
+    def _resolve_param_slots(self, service_id: str, backward_graph: Dict, edges_param_map: Dict) -> tuple:
+        prev_service_ids = backward_graph.get(service_id)
+        if prev_service_ids:
+            edge_param_ids = [f"{prev_service_id}-{service_id}" for prev_service_id in prev_service_ids]
+        else:
+            edge_param_ids = [f"None-{service_id}"]
+
+        param_slots = {}
+        for edge_param_id in edge_param_ids:
+            param_map_list = edges_param_map.get(edge_param_id) or []
+            for param_map in param_map_list:
+                param_name = param_map.get('key')
+                refer_type = param_map.get('refer_type')
+                if refer_type == 'direct' and prev_service_ids:
+                    # recipe default, folded into the plan instead of the data pool
+                    refer_type = 'constant'
+                    value_id = param_map.get('value')
+                elif refer_type == 'direct':
+                    value_id = f"I.{service_id}.{param_name}"
+                else:
+                    value_id = f"O.{param_map.get('value')}"
+                param_slots[param_name] = (param_name, refer_type, value_id)
+        return tuple(param_slots.values())
+
+    def compile(self, forward_graph: Dict, backward_graph: Dict, edges_param_map: Dict) -> CompiledWorkflow:
+        service_ids = self._intern_service_ids(forward_graph)
+        node_index = {service_id: node_id for node_id, service_id in enumerate(service_ids)}
+
+        forward_offsets, forward_targets = self._build_csr(service_ids, node_index, forward_graph)
+        backward_offsets, backward_targets = self._build_csr(service_ids, node_index, backward_graph)
+        topo_order = self._sort_topology(len(service_ids), forward_offsets, forward_targets)
+        param_slots = tuple(self._resolve_param_slots(service_id, backward_graph, edges_param_map) for service_id in service_ids)
+
+        compiled_workflow = CompiledWorkflow(
+            version=next(self._version_counter),
+            service_ids=service_ids,
+            forward_offsets=forward_offsets,
+            forward_targets=forward_targets,
+            backward_offsets=backward_offsets,
+            backward_targets=backward_targets,
+            topo_order=topo_order,
+            param_slots=param_slots
+        )
+        self._logger.debug(f"# compiled workflow v{compiled_workflow.get_version()}: {len(service_ids)} nodes, {len(forward_targets)} edges")
+        return compiled_workflow
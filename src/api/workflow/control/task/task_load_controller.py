@@ -2,6 +2,9 @@
 # -*- coding: utf-8 -*-
 
 from api.workflow.control.execute.task import Task
+from api.workflow.control.meta.resource_parser import ResourceParser
+from common.conf_system import getBatchConfig, getTaskTimeout, getRetryConfig, getHedgeConfig, getConcurrencyConfig, getProcessPoolConfig, getOrchestrationMode
+from common.json_codec import is_msgpack_available
 
 
 class TaskLoadController:
@@ -9,11 +12,104 @@ class TaskLoadController:
         self._logger = logger
         self._datastore = datastore
         self._node_graph = {}
+        self._resource_parser = ResourceParser(logger)
+        self._orchestration_mode = getOrchestrationMode()
+        self._default_batch_policy = dict(getBatchConfig(), batch_url=None)
+        self._default_timeout_policy = {'seconds': getTaskTimeout()}
+        self._default_retry_policy = getRetryConfig()
+        self._default_hedge_policy = dict(getHedgeConfig(), alternate_urls=None)
+        self._default_concurrency_policy = getConcurrencyConfig()
+        self._default_kserve_binary_policy = {'binary_outputs': True}
+        self._default_process_policy = {'cpu_affinity': None, 'shm_threshold': getProcessPoolConfig().get('shm_threshold')}
 
-    def make_task_map(self, active_service_ids=[]):
+    def _gen_batch_policy(self, resources, service_id):
+        batch_conf = self._resource_parser.get_service_resource(resources, service_id, 'batch')
+        if batch_conf is None:
+            return None
+        batch_policy = self._resource_parser.merge_policy(self._default_batch_policy, batch_conf)
+        if batch_policy.get('batch_format') == 'list' and not batch_policy.get('batch_url'):
+            self._logger.warn(f"# batch_format list needs the batch_url of {service_id}, it is called without batching")
+            return None
+        if batch_policy.get('batch_format') not in ('list', 'kserve_v2'):
+            self._logger.warn(f"# Not supported batch_format of {service_id}: {batch_policy.get('batch_format')}")
+            return None
+        return batch_policy
+
+    def _gen_task_timeout(self, resources, service_id):
+        timeout_policy = self._default_timeout_policy
+        timeout_conf = self._resource_parser.get_service_resource(resources, service_id, 'timeout')
+        if timeout_conf is not None:
+            timeout_policy = self._resource_parser.merge_policy(timeout_policy, timeout_conf)
+        timeout = timeout_policy.get('seconds')
+        if not timeout:
+            return None
+        return float(timeout)
+
+    def _gen_retry_policy(self, resources, service_id):
+        retry_conf = self._resource_parser.get_service_resource(resources, service_id, 'retry')
+        if retry_conf is None:
+            return None
+        retry_policy = self._resource_parser.merge_policy(self._default_retry_policy, retry_conf)
+        return retry_policy
+
+    def _gen_hedge_policy(self, resources, service_id):
+        hedge_conf = self._resource_parser.get_service_resource(resources, service_id, 'hedge')
+        if hedge_conf is None:
+            return None
+        if self._orchestration_mode == 'THREAD':
+            self._logger.warn(f"# hedge applies to the async orchestration only, {service_id} is called without hedging")
+            return None
+        hedge_policy = self._resource_parser.merge_policy(self._default_hedge_policy, hedge_conf)
+        return hedge_policy
+
+    def _gen_concurrency_slots(self, resources, service_id):
+        concurrency_policy = self._default_concurrency_policy
+        concurrency_conf = self._resource_parser.get_service_resource(resources, service_id, 'concurrency')
+        if concurrency_conf is not None:
+            concurrency_policy = self._resource_parser.merge_policy(concurrency_policy, concurrency_conf)
+        node_id, _, _ = service_id.rpartition('.')
+        concurrency_slots = []
+        if concurrency_policy.get('max_concurrency'):
+            concurrency_slots.append((('service', service_id), int(concurrency_policy.get('max_concurrency'))))
+        if concurrency_policy.get('node_max_concurrency'):
+            concurrency_slots.append((('node', node_id), int(concurrency_policy.get('node_max_concurrency'))))
+        return concurrency_slots
+
+    def _gen_kserve_binary_policy(self, resources, service_id):
+        kserve_binary_conf = self._resource_parser.get_service_resource(resources, service_id, 'kserve_binary')
+        if kserve_binary_conf is None:
+            return None
+        kserve_binary_policy = self._resource_parser.merge_policy(self._default_kserve_binary_policy, kserve_binary_conf)
+        return kserve_binary_policy
+
+    def _gen_process_policy(self, resources, service_id):
+        process_conf = self._resource_parser.get_service_resource(resources, service_id, 'process')
+        if process_conf is None:
+            return None
+        process_policy = self._resource_parser.merge_policy(self._default_process_policy, process_conf)
+        return process_policy
+
+    def _gen_pass_blob_ref(self, resources, service_id):
+        """ "blob_ref": true, the service receives {"$blob": id, ...} and fetches large values itself """
+        blob_ref_conf = self._resource_parser.get_service_resource(resources, service_id, 'blob_ref')
+        return blob_ref_conf is not None
+
+    def _gen_use_msgpack(self, resources, service_id):
+        """ "msgpack": true, the service accepts and answers application/msgpack """
+        msgpack_conf = self._resource_parser.get_service_resource(resources, service_id, 'msgpack')
+        if msgpack_conf is None:
+            return False
+        if not is_msgpack_available():
+            self._logger.warn(f"# msgpack is not installed, {service_id} stays json")
+            return False
+        return True
+
+    def make_task_map(self, active_service_ids=None, service_pool=None, resources=None):
         task_map = {}
-        service_pool = self._datastore.get_node_service_pool_service()
+        if service_pool is None:
+            service_pool = self._datastore.get_node_service_pool_service()
         if not active_service_ids:
+            active_service_ids = []
             edges_param_map = self._datastore.get_edges_param_map_service()
             active_edge_ids = list(edges_param_map.keys())
             for service_id, service_info in service_pool.items():
@@ -24,5 +120,25 @@ class TaskLoadController:
         for active_service_id in active_service_ids:
             service_info = service_pool.get(active_service_id)
             task_obj = Task(self._logger, active_service_id, service_info)
+            task_obj.set_timeout(self._gen_task_timeout(resources, active_service_id))
+            task_obj.set_retry_policy(self._gen_retry_policy(resources, active_service_id))
+            task_obj.set_concurrency_slots(self._gen_concurrency_slots(resources, active_service_id))
+            task_obj.set_pass_blob_ref(self._gen_pass_blob_ref(resources, active_service_id))
+            batch_policy = self._gen_batch_policy(resources, active_service_id)
+            if batch_policy:
+                task_obj.set_batch_policy(batch_policy)
+            hedge_policy = self._gen_hedge_policy(resources, active_service_id)
+            if hedge_policy and batch_policy:
+                self._logger.warn(f"# hedge is not combined with batch, {active_service_id} is batched without hedging")
+            elif hedge_policy:
+                task_obj.set_hedge_policy(hedge_policy)
+            kserve_binary_policy = self._gen_kserve_binary_policy(resources, active_service_id)
+            if kserve_binary_policy:
+                task_obj.set_kserve_binary_policy(kserve_binary_policy)
+            elif self._gen_use_msgpack(resources, active_service_id):
+                task_obj.set_use_msgpack(True)
+            process_policy = self._gen_process_policy(resources, active_service_id)
+            if process_policy:
+                task_obj.set_process_policy(process_policy)
             task_map[active_service_id] = task_obj
         return task_map
@@ -16,4 +16,74 @@ class NotExistedData(Exception):
         self._errorMessage = "Not existed data in data pool"
 
     def __str__(self):
-        return self._errorMessage
\ No newline at end of file
+        return self._errorMessage
+
+
+class CyclicWorkflowGraph(Exception):
+    def __init__(self):
+        super().__init__("Workflow graph has a cycle")
+        self._errorMessage = "Workflow graph has a cycle"
+
+    def __str__(self):
+        return self._errorMessage
+
+
+class ExceededTimeout(Exception):
+    def __init__(self, timeout=None):
+        super().__init__("Exceeded timeout")
+        self._errorMessage = "Exceeded timeout: %0.3fs" % timeout if timeout else "Exceeded timeout"
+
+    def __str__(self):
+        return self._errorMessage
+
+
+class ApiCallFailed(Exception):
+    def __init__(self, url=None, status=None, retry_after=None):
+        super().__init__("API call failed")
+        self._url = url
+        self._status = status
+        self._retry_after = retry_after
+        if status:
+            self._errorMessage = f"API call failed with status {status}: {url}"
+        else:
+            self._errorMessage = f"API call failed, not connected: {url}"
+
+    def get_status(self):
+        return self._status
+
+    def get_retry_after(self):
+        return self._retry_after
+
+    def __str__(self):
+        return self._errorMessage
+
+
+class RunRejected(Exception):
+    def __init__(self, reason=None, retry_after=None):
+        super().__init__("Run rejected")
+        self._retry_after = retry_after
+        self._errorMessage = f"Run rejected, {reason}" if reason else "Run rejected"
+
+    def get_retry_after(self):
+        return self._retry_after
+
+    def __str__(self):
+        return self._errorMessage
+
+
+class ExceededDataPoolMemory(Exception):
+    def __init__(self, value_id=None, max_memory=None):
+        super().__init__("Exceeded data pool memory")
+        self._errorMessage = f"Exceeded data pool memory of {max_memory} bytes: {value_id}"
+
+    def __str__(self):
+        return self._errorMessage
+
+
+class NotFoundFunction(Exception):
+    def __init__(self, function_path=None, reason=None):
+        super().__init__("Not found function")
+        self._errorMessage = f"Not found function: {function_path}, {reason}" if reason else f"Not found function: {function_path}"
+
+    def __str__(self):
+        return self._errorMessage
@@ -6,6 +6,8 @@ from api.workflow.control.data.type_transfer import DataTypeTransfer
 from api.workflow.control.data.data_io_controller import DataIoController
 from api.workflow.control.data.metastore_controller import MetastoreController
 from api.workflow.control.data.task_pool_controller import TaskPoolController
+from api.workflow.control.data.plan_cache_controller import PlanCacheController
+from api.workflow.control.data.result_cache_controller import ResultCacheController
 from typing import Dict
 
 class DataStoreService:
@@ -15,48 +17,72 @@ class DataStoreService:
         self._data_controller = DataIoController(logger)
         self._metastore_controller = MetastoreController(logger)
         self._taskpool_controller = TaskPoolController(logger)
+        self._plan_cache_controller = PlanCacheController(logger)
+        self._result_cache_controller = ResultCacheController(logger)
 
     def _extract_param_name(self, key_path):
         param_name = key_path.split('.')[-1]
         return param_name
 
-    def set_init_service_params_service(self, wf_edges_meta):
-        self._data_controller.set_init_service_params_ctl(wf_edges_meta)
+    def open_run_data_service(self, request_id: str) -> None:
+        self._data_controller.open_run_data_ctl(request_id)
 
-    def set_service_params_service(self, service_id: str, params_map: dict):
+    def close_run_data_service(self, request_id: str) -> None:
+        self._data_controller.close_run_data_ctl(request_id)
+
+    def set_service_params_service(self, service_id: str, params_map: dict, request_id: str = None):
         """ service_id = {node_id}.{service_name}"""
         if not params_map:
             return
-        self._data_controller.set_service_params_ctl(service_id, params_map)
+        self._data_controller.set_service_params_ctl(service_id, params_map, request_id)
 
-    def set_service_result_service(self, service_id: str, result: dict):
+    def set_service_result_service(self, service_id: str, result: dict, request_id: str = None) -> dict:
         """ service_id = {node_id}.{service_name}"""
-        self._data_controller.set_service_result_ctl(service_id, result)
+        blob_refs = self._data_controller.set_service_result_ctl(service_id, result, request_id)
+        return blob_refs
 
-    def get_start_service_params_service(self, service_id: str) -> dict:
+    def get_start_service_params_service(self, service_id: str, request_id: str = None) -> dict:
         """ service_id = {node_id}.{service_name}"""
-        params = self._data_controller.get_start_service_params_ctl(service_id)
+        params = self._data_controller.get_start_service_params_ctl(service_id, request_id)
         return params
 
-    def get_service_params_service(self, service_id: str) -> dict:
+    def get_service_params_service(self, service_id: str, request_id: str = None) -> dict:
         """ service_id = {node_id}.{service_name}"""
         wf_edges_meta = self.get_edges_meta_service()
-        params = self._data_controller.get_service_params_ctl(service_id, wf_edges_meta)
+        params = self._data_controller.get_service_params_ctl(service_id, wf_edges_meta, request_id)
         return params
 
     def get_service_data_pool_service(self) -> Dict:
         data_pool = self._data_controller.get_data_pool_ctl()
         return data_pool
 
-    def get_param_value_service(self, value_id):
-        param_value = self._data_controller.get_param_value_control(value_id)
+    def get_data_pool_stats_service(self) -> Dict:
+        data_pool_stats = self._data_controller.get_data_pool_stats_ctl()
+        return data_pool_stats
+
+    def get_param_value_service(self, value_id, request_id=None, pass_blob_ref=False):
+        param_value = self._data_controller.get_param_value_control(value_id, request_id, pass_blob_ref)
         return param_value
 
+    def get_blob_service(self, blob_id) -> bytes:
+        blob_data = self._data_controller.get_blob_ctl(blob_id)
+        return blob_data
+
+    def delete_param_value_service(self, value_id, request_id=None):
+        self._data_controller.delete_param_value_ctl(value_id, request_id)
+
     def get_service_info_service(self, service_id) -> Dict:
         data_pool = self.get_service_data_pool_service()
         service_node_info = data_pool.get(service_id)
         return service_node_info
 
+    def set_metas_service(self, **metas):
+        snapshot = self._metastore_controller.set_metas_ctl(**metas)
+        return snapshot
+
+    def is_changed_dag_service(self, wf_dag_meta: Dict) -> bool:
+        return self._metastore_controller.is_changed_dag_ctl(wf_dag_meta)
+
     def set_comm_meta_service(self, wf_comm_meta):
         self._metastore_controller.set_comm_meta_ctl(wf_comm_meta)
 
@@ -115,10 +141,53 @@ class DataStoreService:
         edges_param_map = self._metastore_controller.get_edges_param_map_ctl()
         return edges_param_map
 
+    def set_compiled_workflow_service(self, compiled_workflow):
+        self._metastore_controller.set_compiled_workflow_ctl(compiled_workflow)
+
+    def get_compiled_workflow_service(self):
+        compiled_workflow = self._metastore_controller.get_compiled_workflow_ctl()
+        return compiled_workflow
+
+    def get_action_plan_service(self, plan_key):
+        act_plan = self._plan_cache_controller.get_action_plan_ctl(plan_key)
+        return act_plan
+
+    def set_action_plan_service(self, plan_key, act_plan):
+        self._plan_cache_controller.set_action_plan_ctl(plan_key, act_plan)
+
+    def clear_action_plan_service(self):
+        self._plan_cache_controller.clear_action_plan_ctl()
+
+    def gen_cache_policy_service(self, resources, service_id):
+        cache_policy = self._result_cache_controller.gen_cache_policy_ctl(resources, service_id)
+        return cache_policy
+
+    def gen_result_cache_key_service(self, params):
+        cache_key = self._result_cache_controller.gen_cache_key_ctl(params)
+        return cache_key
+
+    def get_cached_result_service(self, service_id, cache_key):
+        result = self._result_cache_controller.get_result_ctl(service_id, cache_key)
+        return result
+
+    def set_cached_result_service(self, service_id, cache_key, result, cache_policy):
+        self._result_cache_controller.set_result_ctl(service_id, cache_key, result, cache_policy)
+
+    def clear_result_cache_service(self):
+        self._result_cache_controller.clear_result_ctl()
+
+    def get_result_cache_stats_service(self):
+        stats = self._result_cache_controller.get_stats_ctl()
+        return stats
+
     def get_meta_pack_service(self) -> Dict:
         meta_pack = self._metastore_controller.get_metas_ctl()
         return meta_pack
 
+    def get_meta_snapshot_service(self):
+        snapshot = self._metastore_controller.get_snapshot_ctl()
+        return snapshot
+
     def set_wf_meta_service(self, wf_meta: Dict, dirpath: str = None, filename: str = None) -> None:
         self._metastore_controller.save_wf_meta_on_file(wf_meta, dirpath, filename)
 
@@ -8,175 +8,154 @@ class ActionPlanningService:
         self._metastore = metastore
         self._taskstore = taskstore
 
-    def _gen_task_graph_for_from(self, base_graph, from_service_id, count=0):
-        count += 1
-        space = "\t" * count
-        task_graph = {}
-        self._logger.debug(f"{space}@[{count}] < from: {from_service_id} >")
-        next_service_ids = base_graph.get(from_service_id)
-
-        self._logger.debug(f"{space} [{count}] # Step 0: find child nodes - {next_service_ids}")
-        if not next_service_ids and count == 1:
-            self._logger.debug(f"{space} [{count}] # Step -1")
-            return None
-        elif not next_service_ids:
-            task_graph[from_service_id] = []
-            return task_graph
-
-        self._logger.debug(f"{space} [{count}] # Step 1: Checking...")
-        for next_service_id in next_service_ids:
-            self._logger.debug(f"{space} [{count}] # Step 2: select and find next service - {next_service_id}")
-
-            next_graph = self._gen_task_graph_for_from(base_graph, next_service_id, count)
-            self._logger.debug(f"{space} [{count}] # Step 3: next_nodes: {next_graph}")
-            if not next_graph:
-                self._logger.debug(f"{space} [{count}] # Step 4: not exist next services")
-                continue
-            self._logger.debug(f"{space} [{count}] # Step 5: save next graph")
-            task_graph.update(next_graph)
-
-            if task_graph.get(from_service_id):
-                self._logger.debug(f"{space} [{count}] # Step 6: Add on - {from_service_id}")
-                task_graph[from_service_id].append(next_service_id)
-            else:
-                self._logger.debug(f"{space} [{count}] # Step 7: NEW - {from_service_id}")
-                task_graph[from_service_id] = [next_service_id]
-        self._logger.debug(f"{space} [{count}] # Step 8: completed registration")
-        return task_graph
-
-    def _gen_task_graph(self, base_graph, from_service_id, to_service_id, count=0):
-        count += 1
-        space = "\t" * count
-        task_graph = {}
-        self._logger.debug(f"{space}@[{count}] < {from_service_id} -> {to_service_id} >")
-        self._logger.debug(f"{space} [{count}] # Step 0: check end nodes ")
-        if from_service_id == to_service_id:
-            task_graph[from_service_id] = []
-            return task_graph
-
-        next_service_ids = base_graph.get(from_service_id)
-        self._logger.debug(f"{space} [{count}] # Step 1: {from_service_id} has child nodes - {next_service_ids}")
-
-        if not next_service_ids:
-            self._logger.debug(f"{space} [{count}] # Step -1")
-            return None
-
-        for next_service_id in next_service_ids:
-            self._logger.debug(f"{space} [{count}] # Step 2: select and find next service - {next_service_id}")
-            next_graph = self._gen_task_graph(base_graph, next_service_id, to_service_id, count)
-
-            self._logger.debug(f"{space} [{count}] # Step 3: {next_graph}")
-            if not next_graph:
-                self._logger.debug(f"{space} [{count}] # Step 4: not exist next services")
-                continue
-
-            self._logger.debug(f"{space} [{count}] # Step 5: update found graph to next graph")
-            task_graph.update(next_graph)
-
-            if task_graph.get(from_service_id):
-                self._logger.debug(f"{space} [{count}] # Step 6: Add on - {from_service_id}")
-                task_graph[from_service_id].append(next_service_id)
-            else:
-                self._logger.debug(f"{space} [{count}] # Step 7: NEW- {from_service_id}")
-                task_graph[from_service_id] = [next_service_id]
-
-        self._logger.debug(f"{space} [{count}] # Step 8: completed registration")
-        return task_graph
-
-    def _cvt_service_range(self, from_service_id=None, to_service_id=None):
-        forward_graph = self._datastore.get_forward_graph_meta_service()
-        backward_graph = self._datastore.get_backward_graph_meta_service()
-
+    def _get_node_id(self, compiled_workflow, service_id):
+        node_id = compiled_workflow.get_node_id(service_id)
+        if node_id is None:
+            self._logger.error(f"# Not exist service in DAG meta: {service_id}")
+        return node_id
+
+    def _cvt_service_range(self, compiled_workflow, from_service_id=None, to_service_id=None):
+        """ active node ids between from and to, by forward/backward reachability intersection """
         if not from_service_id and not to_service_id:
-            service_graph = forward_graph
-        elif from_service_id and not to_service_id:
-            service_graph = self._gen_task_graph_for_from(forward_graph, from_service_id)
-        elif not from_service_id and to_service_id:
-            service_graph = self._gen_task_graph_for_from(backward_graph, to_service_id)
+            return frozenset(compiled_workflow.get_topo_order())
+
+        from_node_id = to_node_id = None
+        if from_service_id:
+            from_node_id = self._get_node_id(compiled_workflow, from_service_id)
+            if from_node_id is None:
+                return frozenset()
+        if to_service_id:
+            to_node_id = self._get_node_id(compiled_workflow, to_service_id)
+            if to_node_id is None:
+                return frozenset()
+
+        if from_node_id is not None and to_node_id is None:
+            if not compiled_workflow.get_next_node_ids(from_node_id):
+                return frozenset()
+            act_node_ids = compiled_workflow.find_descendant_node_ids(from_node_id)
+        elif from_node_id is None and to_node_id is not None:
+            if not compiled_workflow.get_prev_node_ids(to_node_id):
+                return frozenset()
+            act_node_ids = compiled_workflow.find_ancestor_node_ids(to_node_id)
         else:
-            service_graph = self._gen_task_graph(forward_graph, from_service_id, to_service_id)
-        return service_graph
-
-    def gen_action_forward_graph_service(self, from_service_id, to_service_id):
-        act_forward_graph = self._cvt_service_range(from_service_id, to_service_id)
-        return act_forward_graph
-
-    def gen_action_backward_graph_service(self, foreward_graph):
-        act_backward_graph = self._metastore.reverse_forward_graph_service(foreward_graph)
-        return act_backward_graph
-
-    def gen_start_nodes_service(self, forward_graph):
-        act_start_nodes = self._metastore.find_start_nodes_service(forward_graph)
+            descendant_node_ids = compiled_workflow.find_descendant_node_ids(from_node_id)
+            if to_node_id not in descendant_node_ids:
+                return frozenset()
+            act_node_ids = descendant_node_ids & compiled_workflow.find_ancestor_node_ids(to_node_id)
+        return act_node_ids
+
+    def gen_action_node_ids(self, compiled_workflow, from_service_id, to_service_id):
+        act_node_ids = self._cvt_service_range(compiled_workflow, from_service_id, to_service_id)
+        return act_node_ids
+
+    def gen_start_nodes_service(self, compiled_workflow, act_node_ids):
+        start_node_ids = compiled_workflow.find_start_node_ids(act_node_ids)
+        act_start_nodes = sorted(compiled_workflow.to_service_ids(start_node_ids))
         return act_start_nodes
 
-    def gen_end_nodes_service(self, backward_graph):
-        act_end_nodes = self._metastore.find_end_nodes_service(backward_graph)
+    def gen_end_nodes_service(self, compiled_workflow, act_node_ids):
+        end_node_ids = compiled_workflow.find_end_node_ids(act_node_ids)
+        act_end_nodes = sorted(compiled_workflow.to_service_ids(end_node_ids))
         return act_end_nodes
 
-    def gen_action_edges_param_map(self, start_nodes, request_params):
-        act_edges_param_map = self._datastore.get_edges_param_map_service()
+    def gen_action_param_slots(self, compiled_workflow, start_nodes, request_params):
+        """ params of start nodes given in the request are read directly from I.{service_id}.{param_name} """
+        act_param_slots = {}
         if not request_params:
-            return act_edges_param_map
+            return act_param_slots
 
         for service_id in start_nodes:
-            task_edge_ids = act_edges_param_map.keys()
-            for task_edge_id in task_edge_ids:
-                if task_edge_id.find(service_id) <= 0:
-                    continue
+            node_id = compiled_workflow.get_node_id(service_id)
+            param_slots = []
+            for param_name, refer_type, value_id in compiled_workflow.get_param_slots(node_id):
+                if param_name in request_params:
+                    param_slots.append((param_name, 'direct', f"I.{service_id}.{param_name}"))
                 else:
-                    edge_param_map_list = act_edges_param_map.get(task_edge_id)
-                    for req_param_name, req_value in request_params.items():
-                        for edge_param_map in edge_param_map_list:
-                            param_name = edge_param_map.get('key')
-                            if req_param_name == param_name:
-                                edge_param_map['refer_type'] = 'direct'
-                                edge_param_map['value'] = f'I.{service_id}.{param_name}'
-        return act_edges_param_map
-
-    def gen_action_service_ids(self, forward_graph, backward_graph):
-        if not forward_graph:
-            return []
-        act_service_ids = list(forward_graph.keys())
-        act_service_ids.extend(list(backward_graph.keys()))
-        act_service_ids = list(set(act_service_ids))
-        return act_service_ids
-
-    def gen_action_tasks(self, action_service_ids):
-        task_map = self._taskstore.gen_active_tasks_service(action_service_ids)
+                    param_slots.append((param_name, refer_type, value_id))
+            act_param_slots[node_id] = tuple(param_slots)
+        return act_param_slots
+
+    def gen_action_cache_policies(self, resources, act_service_ids):
+        """ result cache policy of each active service that opted in through the recipe resources """
+        act_cache_policies = {}
+        for service_id in act_service_ids:
+            cache_policy = self._datastore.gen_cache_policy_service(resources, service_id)
+            if cache_policy:
+                act_cache_policies[service_id] = cache_policy
+        return act_cache_policies
+
+    def gen_action_output_keys(self, act_service_ids, act_value_refs):
+        """ output keys of each active service read by an active node, the others are never stored """
+        act_output_keys = {service_id: set() for service_id in act_service_ids}
+        for value_id in act_value_refs.keys():
+            io_type, _, key_name = value_id.partition('.')
+            service_id, _, param_name = key_name.rpartition('.')
+            if io_type == 'O' and service_id in act_output_keys:
+                act_output_keys[service_id].add(param_name)
+        act_output_keys = {service_id: frozenset(output_keys) for service_id, output_keys in act_output_keys.items()}
+        return act_output_keys
+
+    def gen_action_tasks(self, action_service_ids, service_pool=None, resources=None):
+        task_map = self._taskstore.gen_active_tasks_service(action_service_ids, service_pool, resources)
         return task_map
 
-    def gen_action_meta_pack(self, start_node, end_node, request):
-        action_meta_pack = self._datastore.get_meta_pack_service()
-        self._logger.info(f" # Step 1. Forward Graph")
-        act_forward_graph = self.gen_action_forward_graph_service(start_node, end_node)
-        self._print_map(act_forward_graph)
-
-        self._logger.info(f" # Step 2. Backward Graph")
-        act_backward_graph = self.gen_action_backward_graph_service(act_forward_graph)
-        self._print_map(act_backward_graph)
+    def _gen_action_plan(self, snapshot, start_node, end_node, request):
+        compiled_workflow = snapshot.get('compiled_workflow')
+        self._logger.info(f" # Step 1. Active Service Nodes")
+        act_node_ids = self.gen_action_node_ids(compiled_workflow, start_node, end_node)
+        self._logger.debug(f"  node ids: {sorted(act_node_ids)}")
 
-        self._logger.info(f" # Step 3. Start Service Node")
-        act_start_nodes = self.gen_start_nodes_service(act_forward_graph)
+        self._logger.info(f" # Step 2. Start Service Node")
+        act_start_nodes = self.gen_start_nodes_service(compiled_workflow, act_node_ids)
         self._logger.debug(f"  start nodes: {act_start_nodes}")
 
-        self._logger.info(f" # Step 4. End Service Node")
-        act_end_nodes = self.gen_end_nodes_service(act_backward_graph)
+        self._logger.info(f" # Step 3. End Service Node")
+        act_end_nodes = self.gen_end_nodes_service(compiled_workflow, act_node_ids)
         self._logger.debug(f"  end nodes: {act_end_nodes}")
 
-        self._logger.info(f" # Step 5. Extract task-edge_param_map")
-        act_edges_param_map = self.gen_action_edges_param_map(act_start_nodes, request)
-        self._print_map(act_edges_param_map)
+        self._logger.info(f" # Step 4. Resolve start param slots")
+        act_param_slots = self.gen_action_param_slots(compiled_workflow, act_start_nodes, request)
+        self._print_map(act_param_slots)
+
+        act_service_ids = tuple(compiled_workflow.to_service_ids(act_node_ids))
+        self._logger.info(f" # Step 5. Result cache policies")
+        act_cache_policies = self.gen_action_cache_policies(snapshot.get('resources'), act_service_ids)
+        self._print_map(act_cache_policies)
+
+        self._logger.info(f" # Step 6. Value liveness")
+        act_value_refs = compiled_workflow.count_value_refs(act_node_ids, act_param_slots)
+        act_output_keys = self.gen_action_output_keys(act_service_ids, act_value_refs)
+        self._print_map(act_value_refs)
+
+        act_plan = {
+            'compiled_workflow': compiled_workflow,
+            'act_node_ids': act_node_ids,
+            'act_service_ids': act_service_ids,
+            'act_start_nodes': tuple(act_start_nodes),
+            'act_end_nodes': tuple(act_end_nodes),
+            'act_param_slots': act_param_slots,
+            'act_cache_policies': act_cache_policies,
+            'act_value_refs': act_value_refs,
+            'act_output_keys': act_output_keys
+        }
+        return act_plan
 
-        self._logger.info(f" # Step 6. Generate Active Tasks")
-        action_service_ids = self.gen_action_service_ids(act_forward_graph, act_backward_graph)
-        act_task_map = self.gen_action_tasks(action_service_ids)
-        self._print_map(act_task_map)
-
-        action_meta_pack['act_forward_graph'] = act_forward_graph
-        action_meta_pack['act_backward_graph'] = act_backward_graph
-        action_meta_pack['act_start_nodes'] = act_start_nodes
-        action_meta_pack['act_end_nodes'] = act_end_nodes
-        action_meta_pack['act_edges_param_map'] = act_edges_param_map
+    def gen_action_meta_pack(self, start_node, end_node, request):
+        # pin the run to one snapshot, a hot-reload swaps in a new one without touching it
+        snapshot = self._datastore.get_meta_snapshot_service()
+        compiled_workflow = snapshot.get('compiled_workflow')
+        request_keys = frozenset(request.keys()) if request else frozenset()
+        plan_key = (compiled_workflow.get_version(), start_node, end_node, request_keys)
+
+        act_plan = self._datastore.get_action_plan_service(plan_key)
+        if act_plan is None:
+            act_plan = self._gen_action_plan(snapshot, start_node, end_node, request)
+            self._datastore.set_action_plan_service(plan_key, act_plan)
+
+        act_task_map = {}
+        if act_plan['act_service_ids']:
+            act_task_map = self.gen_action_tasks(list(act_plan['act_service_ids']), snapshot.get('service_pool'), snapshot.get('resources'))
+        action_meta_pack = dict(act_plan)
         action_meta_pack['act_task_map'] = act_task_map
         return action_meta_pack
 
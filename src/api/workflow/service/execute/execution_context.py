@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from queue import Queue
+import asyncio
+import time
+
+
+class ExecutionContext:
+    """ per-run event queue, value namespace and deadline, keyed by the server-minted run_id """
+    def __init__(self, logger, datastore, run_id, is_async=True, timeout=None):
+        self._logger = logger
+        self._datastore = datastore
+        self._run_id = run_id
+        self._deadline = time.monotonic() + timeout if timeout else None
+        self._task_listener = None
+        if is_async:
+            self._job_Q = asyncio.Queue()
+        else:
+            self._job_Q = Queue()
+
+    def open(self):
+        self._datastore.open_run_data_service(self._run_id)
+
+    def close(self):
+        self._datastore.close_run_data_service(self._run_id)
+
+    def get_run_id(self):
+        return self._run_id
+
+    def get_remaining_time(self):
+        """ seconds left of the run budget, None: no deadline """
+        if self._deadline is None:
+            return None
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    def get_job_queue(self):
+        return self._job_Q
+
+    def set_task_listener(self, task_listener=None):
+        """ task_listener(task) is called on the orchestrator thread whenever a task leaves RUNNING """
+        self._task_listener = task_listener
+
+    def notify_task(self, task):
+        if self._task_listener is None:
+            return
+        try:
+            self._task_listener(task)
+        except Exception as e:
+            self._logger.error(f"# Task listener failed: {task.get_service_id()}, {e}")
+
+    def set_service_params(self, service_id, params_map):
+        self._datastore.set_service_params_service(service_id, params_map, self._run_id)
+
+    def set_service_result(self, service_id, result):
+        blob_refs = self._datastore.set_service_result_service(service_id, result, self._run_id)
+        return blob_refs
+
+    def delete_param_value(self, value_id):
+        self._datastore.delete_param_value_service(value_id, self._run_id)
+
+    def get_param_value(self, value_id, pass_blob_ref=False):
+        value = self._datastore.get_param_value_service(value_id, self._run_id, pass_blob_ref)
+        return value
@@ -2,60 +2,104 @@
 # -*- coding: utf-8 -*-
 
 from api.workflow.control.execute.execution_flow_controller import ExecutionFlowController
+from api.workflow.control.execute.execution_pool import ExecutionPool
 from api.workflow.control.execute.task_state import TaskState
-from threading import Thread
+from api.workflow.control.execute.task_state_manager import TaskStateManager
+from api.workflow.error_pool.error import ApiCallFailed, ExceededDataPoolMemory
+from threading import Timer
+from queue import Empty
 import traceback
+import asyncio
+import random
 import time
 
 
 class WorkflowExecutionOrchestrator:
-    def __init__(self, logger, datastore, meta_pack, job_Q):
+    def __init__(self, logger, datastore, meta_pack, exec_context):
         self._logger = logger
         self._datastore = datastore
         self._meta_pack = meta_pack
-        self._job_Q = job_Q
-
-    def _get_next_service_ids(self, service_id):
-        edges_graph = self._meta_pack['act_forward_graph']
-        next_service_ids = edges_graph.get(service_id)
-        if not next_service_ids:
-            next_service_ids = []
-        return next_service_ids
-
-    def _get_prev_service_ids(self, service_id):
-        prev_edges_graph = self._meta_pack['act_backward_graph']
-        prev_service_ids = prev_edges_graph.get(service_id)
-        return prev_service_ids
-
-    def _get_params(self, service_id):
-        def get_edge_params(edge_param_id):
-            edges_param_map = self._meta_pack['act_edges_param_map']
-            param_map_list = edges_param_map.get(edge_param_id)
-            params = {}
-            for param_map in param_map_list:
-                param_name = param_map.get('key')
-
-                if param_map.get('refer_type') == 'direct':
-                    value_id = f"I.{service_id}.{param_name}"
-                else:
-                    addr_value = param_map.get('value')
-                    value_id = f"O.{addr_value}"
-
-                value = self._datastore.get_param_value_service(value_id)
-                params[param_name] = value
-            return params
-
-        backward_graph = self._meta_pack['backward_graph']
-        prev_service_ids = backward_graph.get(service_id)
-        param_map = {}
-        if not prev_service_ids:
-            edge_params_id = f"None-{service_id}"
-            param_map = get_edge_params(edge_params_id)
-            prev_service_ids = []
-        for prev_service_id in prev_service_ids:
-            edge_params_id = f"{prev_service_id}-{service_id}"
-            param_map = get_edge_params(edge_params_id)
-        return param_map
+        self._context = exec_context
+        self._prev_counts = {}
+        self._remaining = 0
+        self._value_refs = {}
+        self._held_params = set()
+        self._cache_keys = {}
+        self._retry_timers = []
+        self._schedule_later = None
+        self._execution_pool = ExecutionPool(logger)
+
+    def _get_compiled_workflow(self):
+        compiled_workflow = self._meta_pack['compiled_workflow']
+        return compiled_workflow
+
+    def _get_params(self, service_id, pass_blob_ref=False):
+        compiled_workflow = self._get_compiled_workflow()
+        node_id = compiled_workflow.get_node_id(service_id)
+        act_param_slots = self._meta_pack['act_param_slots']
+        if node_id in act_param_slots:
+            param_slots = act_param_slots[node_id]
+        else:
+            param_slots = compiled_workflow.get_param_slots(node_id)
+
+        params = {}
+        for param_name, refer_type, value_id in param_slots:
+            if refer_type == 'constant':
+                params[param_name] = value_id
+            else:
+                params[param_name] = self._context.get_param_value(value_id, pass_blob_ref)
+        return params
+
+    def _release_params(self, service_id):
+        """ drops each value the service read once its last active reader has resolved its params """
+        compiled_workflow = self._get_compiled_workflow()
+        node_id = compiled_workflow.get_node_id(service_id)
+        for value_id in compiled_workflow.get_value_ids(node_id, self._meta_pack['act_param_slots']):
+            value_ref = self._value_refs.get(value_id, 0) - 1
+            if value_ref > 0:
+                self._value_refs[value_id] = value_ref
+                continue
+            self._value_refs.pop(value_id, None)
+            self._context.delete_param_value(value_id)
+
+    def _release_held_params(self, service_id):
+        """ a task given blob references keeps the values it read until it is done, its service fetches them meanwhile """
+        if service_id not in self._held_params:
+            return
+        self._held_params.discard(service_id)
+        self._release_params(service_id)
+
+    def _set_service_result(self, service_id, result):
+        """ only output keys read by an active node enter the data pool, returns the BlobRef of large values """
+        output_keys = self._meta_pack['act_output_keys'].get(service_id)
+        if not output_keys or not isinstance(result, dict):
+            return {}
+        live_result = {key_name: value for key_name, value in result.items() if key_name in output_keys}
+        blob_refs = self._context.set_service_result(service_id, live_result)
+        return blob_refs
+
+    def _get_cache_policy(self, service_id):
+        cache_policy = self._meta_pack.get('act_cache_policies', {}).get(service_id)
+        return cache_policy
+
+    def _get_cached_result(self, service_id, params):
+        """ memoized result of an opted-in service, the key is kept to store the result on completion """
+        if not self._get_cache_policy(service_id):
+            return None
+        cache_key = self._datastore.gen_result_cache_key_service(params)
+        if cache_key is None:
+            return None
+        self._cache_keys[service_id] = cache_key
+        result = self._datastore.get_cached_result_service(service_id, cache_key)
+        return result
+
+    def _set_cached_result(self, task):
+        service_id = task.get_service_id()
+        cache_key = self._cache_keys.get(service_id)
+        if cache_key is None or task.is_cached():
+            return
+        cache_policy = self._get_cache_policy(service_id)
+        self._datastore.set_cached_result_service(service_id, cache_key, task.get_result(), cache_policy)
 
     def _get_start_nodes(self):
         start_nodes = self._meta_pack['act_start_nodes']
@@ -68,123 +112,322 @@ class WorkflowExecutionOrchestrator:
     def _set_start_jobs(self, request_params):
         start_service_ids = self._get_start_nodes()
         for start_service_id in start_service_ids:
-            self._datastore.set_service_params_service(start_service_id, request_params)
-            self._job_Q.put_nowait(start_service_id)
-
-    def _check_all_completed(self, task_map):
-        be_completed = True
-        for k, task in task_map.items():
-            if task.get_state() != TaskState.COMPLETED:
-                be_completed = False
-                break
-        return be_completed
+            self._context.set_service_params(start_service_id, request_params)
+
+    def _init_schedule(self):
+        """ counts the unfinished predecessors of every active node, once per run """
+        act_node_ids = self._meta_pack['act_node_ids']
+        self._prev_counts = self._get_compiled_workflow().count_prev_node_ids(act_node_ids)
+        self._remaining = len(act_node_ids)
+        self._value_refs = dict(self._meta_pack['act_value_refs'])
+
+    def _get_ready_service_ids(self):
+        ready_node_ids = [node_id for node_id, count in self._prev_counts.items() if count == 0]
+        ready_service_ids = self._get_compiled_workflow().to_service_ids(ready_node_ids)
+        return ready_service_ids
+
+    def _get_end_result(self, task_map, result=None):
+        end_service_ids = self._get_end_nodes()
+        for end_service_id in end_service_ids:
+            end_task = task_map.get(end_service_id)
+            result = end_task.get_result()
+        return result
+
+    def _get_task_timeout(self, task):
+        """ service timeout capped by the remaining budget of the run """
+        timeout = task.get_timeout()
+        remaining_time = self._context.get_remaining_time()
+        if remaining_time is not None and (timeout is None or remaining_time < timeout):
+            timeout = max(remaining_time, 0.001)
+        return timeout
+
+    def _expire_run(self, task_map):
+        self._logger.error(f"# Exceeded run deadline: {self._context.get_run_id()}")
+        # tasks that finished right at the deadline are still queued, e.g. a service timeout capped by the run budget
+        job_Q = self._context.get_job_queue()
+        while not job_Q.empty():
+            service_id = job_Q.get_nowait()
+            self._release_held_params(service_id)
+            self._context.notify_task(task_map.get(service_id))
+        for service_id, task in task_map.items():
+            if task.expire():
+                self._context.notify_task(task)
+
+    def _cancel_run(self, task_map):
+        """ fail-fast: unfinished tasks of the run move to CANCELED and their in-flight calls are aborted """
+        self._cancel_retry_timers()
+        canceled_service_ids = [service_id for service_id, task in task_map.items() if task.cancel()]
+        if canceled_service_ids:
+            self._logger.warn(f"# Canceled tasks of {self._context.get_run_id()}: {canceled_service_ids}")
+        for service_id in canceled_service_ids:
+            self._release_held_params(service_id)
+            self._context.notify_task(task_map.get(service_id))
+
+    def _is_retryable(self, task):
+        retry_policy = task.get_retry_policy()
+        if not retry_policy or task.get_attempts() >= retry_policy.get('max_attempts'):
+            return False
+        if task.get_state() == TaskState.TIMEOUT:
+            return retry_policy.get('retry_on_timeout')
+        error = task.get_error()
+        if isinstance(error, ApiCallFailed):
+            return error.get_status() is None or error.get_status() in retry_policy.get('retry_on_status')
+        return False
+
+    def _get_retry_delay(self, task, remaining_time):
+        """ Retry-After of the upstream if given, else exponential backoff with full jitter,
+            capped by backoff_max and the remaining run deadline """
+        retry_policy = task.get_retry_policy()
+        error = task.get_error()
+        if isinstance(error, ApiCallFailed) and error.get_retry_after() is not None:
+            retry_delay = min(error.get_retry_after(), retry_policy.get('backoff_max'))
+        else:
+            backoff = retry_policy.get('backoff_base') * (2 ** (task.get_attempts() - 1))
+            retry_delay = random.uniform(0, min(backoff, retry_policy.get('backoff_max')))
+        if remaining_time is not None:
+            retry_delay = min(retry_delay, remaining_time)
+        return retry_delay
+
+    def _retry_task(self, task, dispatch):
+        """ schedules the task again after the backoff, other ready tasks keep running meanwhile """
+        if not self._is_retryable(task):
+            return False
+        service_id = task.get_service_id()
+        remaining_time = self._context.get_remaining_time()
+        retry_delay = self._get_retry_delay(task, remaining_time)
+        if remaining_time is not None and retry_delay >= remaining_time:
+            self._logger.error(f"# Not retried {service_id}, retry delay reaches the run deadline in {remaining_time:.3f}s")
+            return False
+        if not TaskStateManager.transition(task, TaskState.RETRYING):
+            return False
+        self._logger.warn(f"# Retry {service_id} in {retry_delay:.3f}s, attempt {task.get_attempts()}: {task.get_error()}")
+
+        def retry():
+            if TaskStateManager.transition(task, TaskState.QUEUED):
+                self._submit_task(task, dispatch)
+
+        self._retry_timers.append(self._schedule_later(retry_delay, retry))
+        return True
+
+    def _cancel_retry_timers(self):
+        for retry_timer in self._retry_timers:
+            retry_timer.cancel()
+        self._retry_timers = []
 
     def _execute_task(self, task):
         try:
-            task.execute()
-            service_id = task.get_service_id()
-            self._job_Q.put_nowait(service_id)
+            task.execute(self._get_task_timeout(task))
         except Exception as e:
             self._logger.error(e)
+        finally:
+            self._execution_pool.release(task.get_concurrency_slots())
+            self._context.get_job_queue().put_nowait(task.get_service_id())
 
-    def _timeout(self, timeout):
-        time.sleep(timeout)
-        self._job_Q.put_nowait("SIGTERM")
+    async def _execute_task_async(self, task, job_Q):
+        try:
+            await task.execute_async(self._get_task_timeout(task))
+        except Exception as e:
+            self._logger.error(e)
+        finally:
+            job_Q.put_nowait(task.get_service_id())
+
+    def _submit_task(self, task, dispatch):
+        """ a QUEUED task runs once the execution pool grants its worker and concurrency slots """
+        def start():
+            if task.get_state() != TaskState.QUEUED:
+                self._execution_pool.release(task.get_concurrency_slots())
+                return
+            task.set_state(TaskState.RUNNING)
+            dispatch(task)
+
+        if not self._execution_pool.submit(task, task.get_concurrency_slots(), start):
+            self._logger.debug(f" - Step 1. [QUEUED   ] wait for execution slots: {task.get_service_id()}")
+
+    def _dispatch_task(self, task_map, service_id, dispatch):
+        self._logger.debug(f" - Step 1. [RUNNING  ] aggregation params and run: {service_id}")
+        task = task_map.get(service_id)
+        try:
+            params = self._get_params(service_id, task.is_pass_blob_ref())
+        except Exception as e:
+            self._logger.error(f"# Not resolved params of {service_id}: {e}")
+            task.set_error(e)
+            task.set_state(TaskState.FAILED)
+            self._context.get_job_queue().put_nowait(service_id)
+            return
+        task.set_params(params)
+        if task.is_pass_blob_ref():
+            self._held_params.add(service_id)
+        else:
+            self._release_params(service_id)
+
+        cached_result = self._get_cached_result(service_id, params)
+        if cached_result is not None:
+            self._logger.debug(f" - Step 1. [CACHED   ] skip execution, memoized result: {service_id}")
+            task.set_cached_result(cached_result)
+            self._context.get_job_queue().put_nowait(service_id)
+            return
+        task.set_state(TaskState.QUEUED)
+        self._submit_task(task, dispatch)
+
+    def _handle_task_state(self, task_map, service_id, dispatch):
+        """ returns (is_finished, result) for a task that left RUNNING, costs O(out-degree) """
+        result = None
+        task = task_map.get(service_id)
+        task_state = task.get_state()
+        self._logger.critical(f"# REQ: {service_id} - {task_state}")
+        self._context.notify_task(task)
+
+        if task_state in [TaskState.COMPLETED]:
+            self._logger.debug(f" - Step 2. [COMPLETED] done task execution : {service_id}")
+            self._release_held_params(service_id)
+            result = task.get_result()
+            try:
+                blob_refs = self._set_service_result(service_id, result)
+            except ExceededDataPoolMemory as e:
+                self._logger.error(f"# Not stored result of {service_id}: {e}")
+                task.set_error(e)
+                task.set_state(TaskState.FAILED)
+                self._context.notify_task(task)
+                self._show_task(task_map)
+                return True, None
+            self._set_cached_result(task)
+            if blob_refs:
+                # the value lives in the blob store, the task (read by run handles and streams) keeps the reference
+                task.set_result(dict(result, **blob_refs))
+            self._show_task_info(task)
+
+            self._remaining -= 1
+            compiled_workflow = self._get_compiled_workflow()
+            node_id = compiled_workflow.get_node_id(service_id)
+            for next_node_id in compiled_workflow.get_next_node_ids(node_id):
+                if next_node_id not in self._prev_counts:
+                    continue
+                self._prev_counts[next_node_id] -= 1
+                if self._prev_counts[next_node_id] == 0:
+                    next_service_id = compiled_workflow.get_service_id(next_node_id)
+                    self._dispatch_task(task_map, next_service_id, dispatch)
+
+            if self._remaining == 0:
+                result = self._get_end_result(task_map, result)
+                return True, result
+
+        elif task_state in [TaskState.FAILED, TaskState.TIMEOUT] and self._retry_task(task, dispatch):
+            self._logger.debug(f" - Step 3. [RETRYING ] retry task : {service_id}")
+
+        elif task_state in [TaskState.FAILED]:
+            self._logger.debug(f" - Step 3. [FAILED   ] failed task : {service_id}")
+            self._release_held_params(service_id)
+            self._show_task(task_map)
+            return True, result
+
+        elif task_state in [TaskState.TIMEOUT]:
+            self._logger.debug(f" - Step 3. [TIMEOUT  ] timed out task : {service_id}")
+            self._release_held_params(service_id)
+            self._show_task(task_map)
+            return True, result
+
+        elif task_state in [TaskState.PAUSED]:
+            self._logger.debug(f" - Step 4. [PAUSED   ] paused task by user : {service_id}")
+            return True, result
+
+        elif task_state in [TaskState.STOPPED]:
+            self._logger.debug(f" - Step 5. [STOP     ] stop task by user : {service_id}")
+            return True, result
+
+        elif task_state in [TaskState.SKIPPED]:
+            self._logger.debug(f" - Step 6. [SKIPPED  ] skipped task: {service_id}")
+            return True, result
+
+        elif task_state in [TaskState.BLOCKED]:
+            self._logger.debug(f" - Step 7. [BLOCKED  ] blocked task: {service_id}")
+            return True, result
+
+        else:
+            self._release_held_params(service_id)
+            return True, result
+        return False, result
 
     def _run_exec_handler(self, task_map):
-        # executor = Thread(target=self._timeout, args=(3,))
-        # executor.start()
+        def dispatch(task):
+            self._execution_pool.get_thread_executor().submit(self._execute_task, task)
 
+        def schedule_later(delay, callback):
+            retry_timer = Timer(delay, callback)
+            retry_timer.daemon = True
+            retry_timer.start()
+            return retry_timer
+
+        self._schedule_later = schedule_later
+        job_Q = self._context.get_job_queue()
         result = None
         start_ts = time.time()
+        self._init_schedule()
+        for service_id in self._get_ready_service_ids():
+            self._dispatch_task(task_map, service_id, dispatch)
         while True:
             try:
                 self._logger.debug("<<< WAIT Q >>>")
-                service_id = self._job_Q.get()
-                if service_id == "SIGTERM":
-                    self._logger.error("Exit process")
-                    break
-                task = task_map.get(service_id)
-                task_state = task.get_state()
-                self._logger.critical(f"# REQ: {service_id} - {task_state}")
-
-                if task_state in [TaskState.PENDING]:
-                    self._logger.debug(f" - Step 1. [PENDING  ] wait order to run: {service_id}")
-                    task.set_state(TaskState.SCHEDULED)
-                    self._job_Q.put_nowait(service_id)
-
-                elif task_state in [TaskState.SCHEDULED]:
-                    self._logger.debug(f" - Step 2. [SCHEDULED] prepared service resources: {service_id}")
-                    task.set_state(TaskState.QUEUED)
-                    self._job_Q.put_nowait(service_id)
-
-                elif task_state in [TaskState.QUEUED]:
-                    self._logger.debug(f" - Step 3. [QUEUED   ] aggregation params and run: {service_id}")
-                    runnable = True
-                    prev_service_ids = self._get_prev_service_ids(service_id)
-                    if prev_service_ids:
-                        for prev_service_id in prev_service_ids:
-                            prev_task = task_map.get(prev_service_id)
-                            if prev_task.get_state() not in [TaskState.COMPLETED, TaskState.SKIPPED]:
-                                runnable = False
-                    else:
-                        runnable = True
-                    if runnable:
-                        params = self._get_params(service_id)
-                        task.set_params(params)
-                        task.set_state(TaskState.RUNNING)
-                        self._job_Q.put_nowait(service_id)
-
-                elif task_state in [TaskState.RUNNING]:
-                    executor = Thread(target=self._execute_task, args=(task,))
-                    executor.start()
-
-                elif task_state in [TaskState.COMPLETED]:
-                    self._logger.debug(f" - Step 4. [COMPLETED] done task execution : {service_id}")
-                    task_result = task.get_result()
-                    result = task_result
-
-                    self._datastore.set_service_result_service(service_id, task_result)
-                    next_service_ids = self._get_next_service_ids(service_id)
-                    for next_service_id in next_service_ids:
-                        self._job_Q.put_nowait(next_service_id)
-
-                    if self._check_all_completed(task_map):
-                        end_service_ids = self._get_end_nodes()
-                        for end_service_id in end_service_ids:
-                            end_task = task_map.get(end_service_id)
-                            result = end_task.get_result()
-                        break
-
-                elif task_state in [TaskState.FAILED]:
-                    self._logger.debug(f" - Step 5. [FAILED   ] paused task by user : {service_id}")
-                    self._show_task(task_map)
-                    break
-
-                elif task_state in [TaskState.PAUSED]:
-                    self._logger.debug(f" - Step 6. [PAUSED   ] paused task by user : {service_id}")
+                try:
+                    service_id = job_Q.get(timeout=self._context.get_remaining_time())
+                except Empty:
+                    self._expire_run(task_map)
                     break
-
-                elif task_state in [TaskState.STOPPED]:
-                    self._logger.debug(f" - Step 7. [STOP     ] stop task by user : {service_id}")
-                    break
-
-                elif task_state in [TaskState.SKIPPED]:
-                    self._logger.debug(f" - Step 8. [SKIPPED  ] skipped task: {service_id}")
+                is_finished, step_result = self._handle_task_state(task_map, service_id, dispatch)
+                if step_result is not None:
+                    result = step_result
+                if is_finished:
                     break
-
-                elif task_state in [TaskState.BLOCKED]:
-                    self._logger.debug(f" - Step 9. [BLOCKED  ] blocked task: {service_id}")
-                    break
-
-                else:
-                    break
-                self._show_task(task_map)
-                self._show_task_info(task)
             except Exception as e:
                 self._logger.error(e)
                 self._logger.error(traceback.print_exc())
                 break
+        self._cancel_run(task_map)
+        end_ts = time.time()
+        duration = "%0.2f" %(end_ts - start_ts)
+        self._logger.info(f"--- # Request Job Completed, Duration: {duration}s ---")
+        self._logger.info(f" - Result: {result}")
+        return result
+
+    async def _run_async_exec_handler(self, task_map):
+        job_Q = self._context.get_job_queue()
+        running_jobs = set()
+
+        def dispatch(task):
+            job = asyncio.create_task(self._execute_task_async(task, job_Q))
+            running_jobs.add(job)
+            job.add_done_callback(running_jobs.discard)
+            # also called for a job cancelled before its first step, its finally never runs
+            job.add_done_callback(lambda _: self._execution_pool.release(task.get_concurrency_slots()))
+
+        self._schedule_later = asyncio.get_running_loop().call_later
+        result = None
+        start_ts = time.time()
+        self._init_schedule()
+        try:
+            for service_id in self._get_ready_service_ids():
+                self._dispatch_task(task_map, service_id, dispatch)
+            while True:
+                try:
+                    self._logger.debug("<<< WAIT Q >>>")
+                    try:
+                        service_id = await asyncio.wait_for(job_Q.get(), self._context.get_remaining_time())
+                    except asyncio.TimeoutError:
+                        self._expire_run(task_map)
+                        break
+                    is_finished, step_result = self._handle_task_state(task_map, service_id, dispatch)
+                    if step_result is not None:
+                        result = step_result
+                    if is_finished:
+                        break
+                except Exception as e:
+                    self._logger.error(e)
+                    self._logger.error(traceback.format_exc())
+                    break
+        finally:
+            # also reached when the run itself is cancelled, e.g. on a client disconnect
+            self._cancel_run(task_map)
+            for job in list(running_jobs):
+                job.cancel()
         end_ts = time.time()
         duration = "%0.2f" %(end_ts - start_ts)
         self._logger.info(f"--- # Request Job Completed, Duration: {duration}s ---")
@@ -193,9 +436,25 @@ class WorkflowExecutionOrchestrator:
 
     def run_workflow(self, request_params):
         self._logger.critical(f" # user params: {request_params}")
-        self._set_start_jobs(request_params)
-        task_map = self._meta_pack.get('act_task_map')
-        result = self._run_exec_handler(task_map)
+        self._context.open()
+        try:
+            self._set_start_jobs(request_params)
+            task_map = self._meta_pack.get('act_task_map')
+            result = self._run_exec_handler(task_map)
+        finally:
+            self._context.close()
+        return result
+
+    async def run_workflow_async(self, request_params):
+        """ runs the workflow as coroutines on the caller's event loop, no thread per task """
+        self._logger.critical(f" # user params: {request_params}")
+        self._context.open()
+        try:
+            self._set_start_jobs(request_params)
+            task_map = self._meta_pack.get('act_task_map')
+            result = await self._run_async_exec_handler(task_map)
+        finally:
+            self._context.close()
         return result
 
     def _show_task(self, task_map):
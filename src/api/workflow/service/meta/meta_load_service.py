@@ -5,6 +5,7 @@ from common.conf_system import getRecipeDir, getRecipeFile
 from api.workflow.control.meta.meta_parse_controller import MetaParseController
 from typing import Dict, List, Any
 from watchfiles import awatch
+from copy import deepcopy
 import traceback
 import threading
 import asyncio
@@ -52,10 +53,14 @@ class MetaLoadService:
         wf_meta = self._datastore.get_wf_meta_file_service()
         if wf_meta:
             updated_dag_meta = self._meta_controller.cvt_wf_to_dag(wf_meta)
-            current_dag_meta = self._datastore.get_dag_service()
-            if current_dag_meta != updated_dag_meta:
+            if self._datastore.is_changed_dag_service(updated_dag_meta):
                 self._logger.debug("# SYNC UPDATE")
-                self.set_base_wf_meta(wf_meta)
+                try:
+                    await asyncio.to_thread(self.set_base_wf_meta, wf_meta)
+                except Exception as e:
+                    self._logger.error(f"# Keep current DAG meta, failed to load updated recipe: {e}")
+                    self._logger.error(traceback.format_exc())
+                    return
                 self._logger.debug(updated_dag_meta)
 
     # 수정 필요
@@ -113,69 +118,84 @@ class MetaLoadService:
         edge_params_map = self._meta_controller.extract_params_map_ctl(start_nodes, wf_service_pool, wf_edges_meta)
         return edge_params_map
 
+    def compile_workflow_service(self, wf_forward_graph, wf_backward_graph, edges_param_map):
+        compiled_workflow = self._meta_controller.compile_workflow_ctl(wf_forward_graph, wf_backward_graph, edges_param_map)
+        return compiled_workflow
+
     def set_base_wf_meta(self, wf_meta: Dict = None):
+        """ builds the whole next version off to the side and publishes it with a single snapshot swap,
+            in-flight runs keep the compiled workflow they started with """
         if not wf_meta:
             wf_meta = self._datastore.get_wf_meta_file_service()
+        wf_dag_meta = deepcopy(wf_meta)
 
         self._logger.error("# [DAG Loader] Step 01. Extract Common Info")
         wf_comm_meta = self.extract_wf_common_info_service(wf_meta)
-        self._datastore.set_comm_meta_service(wf_comm_meta)
         # self._print_debug_data(wf_comm_meta)
 
         self._logger.error("# [DAG Loader] Step 02. Extract Resource Meta")
         wf_resources_meta = self.get_wf_to_resources_service(wf_meta)
-        self._datastore.set_resources_meta_service(wf_resources_meta)
         # self._print_debug_data(wf_resources_meta)
 
         self._logger.error("# [DAG Loader] Step 03. Extract Nodes")
         wf_nodes_meta = self.extract_wf_to_nodes_service(wf_meta)
-        self._datastore.set_nodes_meta_service(wf_nodes_meta)
         # self._print_debug_data(wf_nodes_meta)
 
         self._logger.error("# [DAG Loader] Step 04. Extract Service Pool")
         wf_service_pool = self.cvt_wf_to_service_pool_service(wf_nodes_meta)
-        self._datastore.set_node_service_pool_service(wf_service_pool)
         # self._print_debug_data(wf_service_pool)
 
         self._logger.error("# [DAG Loader] Step 05. Extract Edges")
         wf_edges_meta = self.extract_wf_to_edges_service(wf_meta, wf_service_pool)
-        self._datastore.set_edges_meta_service(wf_edges_meta)
         # self._print_debug_data(wf_edges_meta)
 
         self._logger.error("# [DAG Loader] Step 06. Extract Forward-Edge graph")
         wf_forward_edge_graph = self.extract_forward_edge_graph_service(wf_edges_meta)
-        self._datastore.set_forward_edge_graph_meta_service(wf_forward_edge_graph)
         # self._print_debug_data(wf_forward_edge_graph)
 
         self._logger.error("# [DAG Loader] Step 07 Extract Forward-graph")
         wf_forward_graph = self.extract_forward_graph_service(wf_edges_meta)
-        self._datastore.set_forward_graph_meta_service(wf_forward_graph)
         self._print_debug_data(wf_forward_graph)
 
         self._logger.error("# [DAG Loader] Step 08. Extract backward-graph")
         wf_backward_graph = self.extract_backward_graph_service(wf_edges_meta)
-        self._datastore.set_backward_graph_meta_service(wf_backward_graph)
         self._print_debug_data(wf_backward_graph)
 
         self._logger.error("# [DAG Loader] Step 09. Extract Start Node from forward_graph")
         start_nodes = self.find_start_nodes_service(wf_forward_graph)
-        self._datastore.set_start_nodes_meta_service(start_nodes)
         # self._print_debug_data(start_nodes)
 
         self._logger.error("# [DAG Loader] Step 10. Extract End Node from backward_graph")
         end_nodes = self.find_end_nodes_service(wf_backward_graph)
-        self._datastore.set_end_nodes_meta_service(end_nodes)
         # self._print_debug_data(end_nodes)
 
         self._logger.error("# [DAG Loader] Step 11. Extract service params-map")
         edges_param_map = self.extract_params_map_service(start_nodes, wf_service_pool, wf_edges_meta)
-        self._datastore.set_edges_param_map_service(edges_param_map)
         self._print_debug_data(edges_param_map)
 
-        self._logger.error("# [DAG Loader] Step 12. Set init params")
-        self._datastore.set_init_service_params_service(wf_edges_meta)
-
-        self._logger.error("# [DAG Loader] Step 13. Generate task map")
+        self._logger.error("# [DAG Loader] Step 12. Compile workflow plan")
+        compiled_workflow = self.compile_workflow_service(wf_forward_graph, wf_backward_graph, edges_param_map)
+
+        self._logger.error("# [DAG Loader] Step 13. Publish meta snapshot")
+        self._datastore.set_metas_service(
+            dag_meta=wf_dag_meta,
+            comm_meta=wf_comm_meta,
+            resources=wf_resources_meta,
+            nodes_info=wf_nodes_meta,
+            service_pool=wf_service_pool,
+            edges_info=wf_edges_meta,
+            forward_edge_graph=wf_forward_edge_graph,
+            forward_graph=wf_forward_graph,
+            backward_graph=wf_backward_graph,
+            start_nodes=start_nodes,
+            end_nodes=end_nodes,
+            edges_param_map=edges_param_map,
+            compiled_workflow=compiled_workflow
+        )
+        self._datastore.clear_action_plan_service()
+        self._datastore.clear_result_cache_service()
+
+        self._logger.error("# [DAG Loader] Step 14. Generate task map")
         task_map = self._taskstore.gen_init_tasks_service()
         self._datastore.set_init_task_map_service(task_map)
         self._print_task_map(task_map, edges_param_map)
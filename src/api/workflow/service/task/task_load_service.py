@@ -13,6 +13,6 @@ class TaskLoadService:
         task_map = self._task_controller.make_task_map()
         return task_map
 
-    def gen_active_tasks_service(self, act_service_ids=[]):
-        task_map = self._task_controller.make_task_map(act_service_ids)
+    def gen_active_tasks_service(self, act_service_ids=None, service_pool=None, resources=None):
+        task_map = self._task_controller.make_task_map(act_service_ids, service_pool, resources)
         return task_map
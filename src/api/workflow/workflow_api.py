@@ -6,12 +6,23 @@ from api.workflow.service.data.data_store_service import DataStoreService
 from api.workflow.service.task.task_load_service import TaskLoadService
 from api.workflow.service.execute.action_planner import ActionPlanningService
 from api.workflow.service.execute.workflow_execution_orchestrator import WorkflowExecutionOrchestrator
-from multiprocessing import Process, Queue
+from api.workflow.service.execute.execution_context import ExecutionContext
+from api.workflow.access.execute.http_session_pool import HttpSessionPool
+from api.workflow.access.execute.latency_tracker import LatencyTracker
+from api.workflow.control.execute.execution_pool import ExecutionPool
+from api.workflow.control.execute.admission_controller import AdmissionController
+from api.workflow.control.execute.run_registry import RunRegistry
+from api.workflow.control.execute.task_state import TaskState
+from api.workflow.error_pool.error import RunRejected, NotExistedData
+from common.conf_system import getOrchestrationMode, getRunTimeout, getDisconnectCheckInterval, getStreamKeepaliveInterval
+from common.json_codec import loads, dumps_text, encode_body, decode_body, accepts_msgpack
 from typing import Dict, Any
 from abc import abstractmethod
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse, Response
+import asyncio
 import time
-import json
+import uuid
 
 class BaseRouter:
     def __init__(self, logger=None, tags=[]):
@@ -41,50 +52,280 @@ class WorkflowEngine(BaseRouter):
         self._taskstore = TaskLoadService(logger, self._datastore)
         self._metastore = MetaLoadService(logger, self._datastore, self._taskstore)
         self._act_planner = ActionPlanningService(logger, self._datastore, self._metastore, self._taskstore)
-        self._job_Q = Queue()
+        self._orchestration_mode = getOrchestrationMode()
+        self._run_timeout = getRunTimeout()
+        self._disconnect_check_interval = getDisconnectCheckInterval()
+        self._stream_keepalive_interval = getStreamKeepaliveInterval()
+        self._admission = AdmissionController(logger)
+        self._run_registry = RunRegistry(logger)
+        self._submitted_runs = set()
+        self._http_pool = HttpSessionPool(logger)
+        self.router.add_event_handler("shutdown", self._http_pool.close)
+        self.router.add_event_handler("shutdown", ExecutionPool(logger).shutdown)
+
+    async def _run_until_disconnect(self, http_request: Request, run_id: str, run_coro) -> Any:
+        """ awaits the run, canceling it once the client has gone away """
+        run_job = asyncio.ensure_future(run_coro)
+        try:
+            while True:
+                done_jobs, _ = await asyncio.wait({run_job}, timeout=self._disconnect_check_interval)
+                if done_jobs:
+                    return run_job.result()
+                if await http_request.is_disconnected():
+                    self._logger.warn(f"# Client disconnected, cancel run: {run_id}")
+                    run_job.cancel()
+                    await asyncio.gather(run_job, return_exceptions=True)
+                    return None
+        finally:
+            if not run_job.done():
+                run_job.cancel()
+
+    async def _read_request(self, http_request: Request) -> Dict[str, Any]:
+        """ json or msgpack body of a run request, by its Content-Type """
+        body = await http_request.body()
+        request = decode_body(body, http_request.headers.get('Content-Type'))
+        if not isinstance(request, dict):
+            raise ValueError("run request must be an object")
+        return request
+
+    def _gen_response(self, http_request: Request, content: Any, status_code=200, headers=None) -> Response:
+        """ msgpack when the client accepts it, json of the fast codec otherwise """
+        use_msgpack = http_request is not None and accepts_msgpack(http_request.headers.get('Accept'))
+        body, content_type = encode_body(content, use_msgpack)
+        return Response(content=body, status_code=status_code, media_type=content_type, headers=headers)
+
+    def _gen_run_id(self) -> str:
+        return "RUN_%X_%s" %(int(time.time() * 10000), uuid.uuid4().hex[:8])
+
+    def _parse_run_request(self, request: Dict[str, Any]):
+        """ a run is keyed by a server-minted run_id, the request_id of the client is passed through as given
+            "_timeout" is reserved for the run budget, a recipe param may be named "timeout" """
+        start_node = request.get('from')
+        if start_node:
+            request.pop('from')
+        end_node = request.get('to')
+        if end_node:
+            request.pop("to")
+        if request and 'request_id' in list(request.keys()):
+            request_id = request.pop('request_id')
+        else:
+            request_id = "AUTO_%X_%s" %(int(time.time() * 10000), uuid.uuid4().hex[:8])
+        request['request_id'] = request_id
+        run_timeout = request.pop('_timeout', None) or self._run_timeout
+        return start_node, end_node, self._gen_run_id(), run_timeout
+
+    async def _execute_run(self, start_node, end_node, request, run_id, run_timeout,
+                           http_request=None, run_handle=None, task_listener=None):
+        act_meta_pack = self._act_planner.gen_action_meta_pack(start_node, end_node, request)
+        if act_meta_pack.get('act_start_nodes'):
+            is_async = self._orchestration_mode != 'THREAD'
+            exec_context = ExecutionContext(self._logger, self._datastore, run_id, is_async, float(run_timeout))
+            exec_context.set_task_listener(task_listener)
+            workflow_engine = WorkflowExecutionOrchestrator(self._logger, self._datastore, act_meta_pack, exec_context)
+            if run_handle is not None:
+                run_handle.set_running(act_meta_pack.get('act_task_map'))
+            if not is_async:
+                # a thread run can not be aborted, it keeps its admission slot until it ends even if the client left
+                result = await asyncio.to_thread(workflow_engine.run_workflow, request)
+            elif http_request is not None:
+                result = await self._run_until_disconnect(http_request, run_id, workflow_engine.run_workflow_async(request))
+            else:
+                result = await workflow_engine.run_workflow_async(request)
+        else:
+            self._logger.error(f"# Not generated task_map, check DAG meta")
+            result = "# Not generated task_map, check DAG meta"
+        return result
+
+    async def _run_submitted(self, run_handle, start_node, end_node, request, run_timeout):
+        """ background run of /workflow/submit, the outcome is kept on its run handle """
+        run_id = run_handle.get_run_id()
+        try:
+            admitted_ts = await self._admission.admit_run_ctl(run_id)
+        except RunRejected as e:
+            run_handle.set_finished(error=e)
+            return
+        try:
+            result = await self._execute_run(start_node, end_node, request, run_id, run_timeout, run_handle=run_handle)
+            run_handle.set_finished(result)
+        except Exception as e:
+            self._logger.error(f"# Submitted run failed: {run_id}, {e}")
+            run_handle.set_finished(error=e)
+        finally:
+            self._admission.release_run_ctl(admitted_ts)
+
+    def _gen_task_event(self, task, with_output=False) -> Dict[str, Any]:
+        start_time = task.get_start_time()
+        end_time = task.get_end_time()
+        task_event = {
+            'service_id': task.get_service_id(),
+            'state': task.get_state().name,
+            'attempts': task.get_attempts(),
+            'start_time': start_time.isoformat() if start_time else None,
+            'end_time': end_time.isoformat() if end_time else None,
+            'elapsed': (end_time - start_time).total_seconds() if start_time and end_time else None,
+            'error': str(task.get_error()) if task.get_error() else None
+        }
+        if with_output and task.get_state() == TaskState.COMPLETED:
+            task_event['output'] = task.get_result()
+        return task_event
+
+    def _format_sse(self, event_name: str, event_data: Dict[str, Any]) -> str:
+        return f"event: {event_name}\ndata: {dumps_text(event_data)}\n\n"
+
+    def _stream_run(self, admitted_ts, start_node, end_node, request, run_id, run_timeout, with_output):
+        """ SSE events of the run: one 'task' per task leaving RUNNING, then 'result' or 'error' """
+        loop = asyncio.get_running_loop()
+        event_Q = asyncio.Queue()
+
+        def task_listener(task):
+            task_event = self._gen_task_event(task, with_output)
+            loop.call_soon_threadsafe(event_Q.put_nowait, ('task', task_event))
+
+        run_ids = {'run_id': run_id, 'request_id': request.get('request_id')}
+
+        # call_soon keeps the final events behind the task events already scheduled by the listener
+        async def run():
+            try:
+                result = await self._execute_run(start_node, end_node, request, run_id, run_timeout,
+                                                 task_listener=task_listener)
+                loop.call_soon(event_Q.put_nowait, ('result', dict(run_ids, result=result)))
+            except Exception as e:
+                self._logger.error(f"# Streamed run failed: {run_id}, {e}")
+                loop.call_soon(event_Q.put_nowait, ('error', dict(run_ids, error=str(e))))
+            finally:
+                self._admission.release_run_ctl(admitted_ts)
+                loop.call_soon(event_Q.put_nowait, None)
+
+        # the run owns the admission slot, it is released even if the stream never starts
+        run_job = asyncio.create_task(run())
+        self._submitted_runs.add(run_job)
+        run_job.add_done_callback(self._submitted_runs.discard)
+        return self._iter_stream_events(event_Q, run_job)
+
+    async def _iter_stream_events(self, event_Q, run_job):
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(event_Q.get(), self._stream_keepalive_interval or None)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield self._format_sse(*event)
+        finally:
+            # client went away before the run finished
+            if not run_job.done():
+                run_job.cancel()
 
     def setup_routes(self):
         @self.router.post(path='/workflow/meta')
         async def create_workflow(workflow) -> None:
-            wf_meta = json.loads(workflow)
+            wf_meta = loads(workflow)
             self._metastore.change_wf_meta(wf_meta)
             # return self._metastore.get_dag()
 
         @self.router.post(path='/workflow/run')
-        async def call_chained_model_service(request: Dict[str, Any]):
-            start_node = request.get('from')
-            if start_node:
-                request.pop('from')
-            end_node = request.get('to')
-            if end_node:
-                request.pop("to")
-            if request and 'request_id' in list(request.keys()):
-                request_id = request.pop('request_id')
-            else:
-                request_id = "AUTO_%X" %(int(time.time() * 10000))
-            request['request_id'] = request_id
+        async def call_chained_model_service(http_request: Request):
+            try:
+                request = await self._read_request(http_request)
+            except ValueError as e:
+                return self._gen_response(http_request, {"result": f"Invalid run request: {e}"}, status_code=400)
+            start_node, end_node, run_id, run_timeout = self._parse_run_request(request)
+            try:
+                admitted_ts = await self._admission.admit_run_ctl(run_id)
+            except RunRejected as e:
+                return self._gen_response(http_request, {"result": str(e)}, status_code=429,
+                                          headers={"Retry-After": str(e.get_retry_after())})
+            try:
+                result = await self._execute_run(start_node, end_node, request, run_id, run_timeout, http_request=http_request)
+            finally:
+                self._admission.release_run_ctl(admitted_ts)
+            return self._gen_response(http_request, {"result": result})
 
-            act_meta_pack = self._act_planner.gen_action_meta_pack(start_node, end_node, request)
-            if act_meta_pack.get('act_start_nodes'):
-                workflow_engine = WorkflowExecutionOrchestrator(self._logger, self._datastore, act_meta_pack, self._job_Q)
-                result = workflow_engine.run_workflow(request)
-            else:
-                self._logger.error(f"# Not generated task_map, check DAG meta")
-                result = "# Not generated task_map, check DAG meta"
-            return {"result": result}
+        @self.router.post(path='/workflow/run/stream')
+        async def stream_chained_model_service(http_request: Request, with_output: bool = False):
+            try:
+                request = await self._read_request(http_request)
+            except ValueError as e:
+                return self._gen_response(http_request, {"result": f"Invalid run request: {e}"}, status_code=400)
+            start_node, end_node, run_id, run_timeout = self._parse_run_request(request)
+            try:
+                admitted_ts = await self._admission.admit_run_ctl(run_id)
+            except RunRejected as e:
+                return self._gen_response(http_request, {"result": str(e)}, status_code=429,
+                                          headers={"Retry-After": str(e.get_retry_after())})
+            stream_events = self._stream_run(admitted_ts, start_node, end_node, request, run_id, run_timeout, with_output)
+            return StreamingResponse(stream_events, media_type='text/event-stream',
+                                     headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+        @self.router.post(path='/workflow/submit')
+        async def submit_chained_model_service(http_request: Request):
+            try:
+                request = await self._read_request(http_request)
+            except ValueError as e:
+                return self._gen_response(http_request, {"result": f"Invalid run request: {e}"}, status_code=400)
+            start_node, end_node, run_id, run_timeout = self._parse_run_request(request)
+            run_handle = self._run_registry.open_run_ctl(run_id, request.get('request_id'))
+            run_job = asyncio.create_task(self._run_submitted(run_handle, start_node, end_node, request, run_timeout))
+            self._submitted_runs.add(run_job)
+            run_job.add_done_callback(self._submitted_runs.discard)
+            return self._gen_response(http_request, {"run_id": run_id, "request_id": request.get('request_id'),
+                                                     "state": run_handle.get_state().name}, status_code=202)
+
+        @self.router.get(path='/workflow/runs/{run_id}')
+        async def call_run_state(http_request: Request, run_id: str, wait: float = 0):
+            run_handle = self._run_registry.get_run_ctl(run_id)
+            if run_handle is None:
+                return self._gen_response(http_request, {"result": f"Not found run: {run_id}"}, status_code=404)
+            await self._run_registry.wait_run_ctl(run_handle, wait)
+            return self._gen_response(http_request, run_handle.to_dict())
 
         @self.router.get(path='/workflow/datapool')
-        async def call_data_pool():
+        async def call_data_pool(http_request: Request):
             self._logger.debug("-------------------------< Data Pool >-------------------------")
             data_pool = self._datastore.get_service_data_pool_service()
             for k, v in data_pool.items():
                 self._logger.debug(f" - {k} : \t{v}")
-            return data_pool
+            return self._gen_response(http_request, data_pool)
+
+        @self.router.get(path='/workflow/datapool/stats')
+        async def call_data_pool_stats(http_request: Request):
+            data_pool_stats = self._datastore.get_data_pool_stats_service()
+            return self._gen_response(http_request, data_pool_stats)
+
+        @self.router.get(path='/workflow/blobs/{blob_id}')
+        async def call_blob(http_request: Request, blob_id: str):
+            try:
+                blob_data = self._datastore.get_blob_service(blob_id)
+            except NotExistedData:
+                return self._gen_response(http_request, {"result": f"Not found blob: {blob_id}"}, status_code=404)
+            return Response(content=blob_data, media_type='application/octet-stream')
+
+        @self.router.get(path='/workflow/cache')
+        async def call_result_cache_stats(http_request: Request):
+            cache_stats = self._datastore.get_result_cache_stats_service()
+            return self._gen_response(http_request, cache_stats)
+
+        @self.router.get(path='/workflow/latency')
+        async def call_latency_stats(http_request: Request):
+            latency_stats = LatencyTracker(self._logger).get_stats()
+            return self._gen_response(http_request, latency_stats)
+
+        @self.router.get(path='/workflow/pool')
+        async def call_execution_pool_stats(http_request: Request):
+            pool_stats = ExecutionPool(self._logger).get_stats()
+            return self._gen_response(http_request, pool_stats)
+
+        @self.router.get(path='/workflow/admission')
+        async def call_admission_stats(http_request: Request):
+            admission_stats = self._admission.get_stats_ctl()
+            return self._gen_response(http_request, admission_stats)
 
         @self.router.get(path='/workflow/state')
-        async def call_task_pool():
+        async def call_task_pool(http_request: Request):
             self._logger.debug("-------------------------< Data Pool >-------------------------")
             data_pool = self._datastore.get_service_data_pool_service()
             for k, v in data_pool.items():
                 self._logger.debug(f" - {k} : \t{v}")
-            return data_pool
\ No newline at end of file
+            return self._gen_response(http_request, data_pool)
\ No newline at end of file
@@ -50,3 +50,151 @@ def getRecipeFile(section='DAG'):
     conf = getConfig()
     fileName = conf.get(section, 'dag_file')
     return fileName
+
+def getOrchestrationMode(section='EXECUTION'):
+    conf = getConfig()
+    orchMode = conf.get(section, 'orchestration_mode', fallback='async')
+    return orchMode.upper()
+
+def getHttpPoolConfig(section='HTTP_POOL'):
+    conf = getConfig()
+    poolConf = {
+        'limit': conf.getint(section, 'limit', fallback=1000),
+        'limit_per_host': conf.getint(section, 'limit_per_host', fallback=100),
+        'keepalive_timeout': conf.getfloat(section, 'keepalive_timeout', fallback=30.0),
+        'dns_cache_ttl': conf.getint(section, 'dns_cache_ttl', fallback=300)
+    }
+    return poolConf
+
+def getPlanCacheSize(section='PLANNER'):
+    conf = getConfig()
+    cacheSize = conf.getint(section, 'plan_cache_size', fallback=256)
+    return cacheSize
+
+def getResultCacheConfig(section='RESULT_CACHE'):
+    conf = getConfig()
+    cacheConf = {
+        'max_size': conf.getint(section, 'max_size', fallback=1024),
+        'ttl': conf.getfloat(section, 'ttl', fallback=300.0),
+        'max_memory': conf.getint(section, 'max_memory', fallback=67108864)
+    }
+    return cacheConf
+
+def getBatchConfig(section='BATCH'):
+    conf = getConfig()
+    batchConf = {
+        'max_batch_size': conf.getint(section, 'max_batch_size', fallback=16),
+        'max_wait_ms': conf.getfloat(section, 'max_wait_ms', fallback=5.0),
+        'batch_format': conf.get(section, 'batch_format', fallback='list')
+    }
+    return batchConf
+
+def getTaskTimeout(section='EXECUTION'):
+    conf = getConfig()
+    taskTimeout = conf.getfloat(section, 'task_timeout', fallback=60.0)
+    return taskTimeout
+
+def getRunTimeout(section='EXECUTION'):
+    conf = getConfig()
+    runTimeout = conf.getfloat(section, 'run_timeout', fallback=0.0)
+    return runTimeout
+
+def getDisconnectCheckInterval(section='EXECUTION'):
+    conf = getConfig()
+    disconnectCheckInterval = conf.getfloat(section, 'disconnect_check_interval', fallback=1.0)
+    return disconnectCheckInterval
+
+def getMaxWorkers(section='CONCURRENCY'):
+    conf = getConfig()
+    maxWorkers = conf.getint(section, 'max_workers', fallback=64)
+    return maxWorkers
+
+def getConcurrencyConfig(section='CONCURRENCY'):
+    conf = getConfig()
+    concurrencyConf = {
+        'max_concurrency': conf.getint(section, 'max_concurrency', fallback=0),
+        'node_max_concurrency': conf.getint(section, 'node_max_concurrency', fallback=0)
+    }
+    return concurrencyConf
+
+def getStreamKeepaliveInterval(section='EXECUTION'):
+    conf = getConfig()
+    streamKeepaliveInterval = conf.getfloat(section, 'stream_keepalive_interval', fallback=15.0)
+    return streamKeepaliveInterval
+
+def getProcessPoolConfig(section='PROCESS_POOL'):
+    conf = getConfig()
+    processPoolConf = {
+        'max_workers': conf.getint(section, 'max_workers', fallback=0),
+        'start_method': conf.get(section, 'start_method', fallback='spawn'),
+        'shm_threshold': conf.getint(section, 'shm_threshold', fallback=1048576)
+    }
+    return processPoolConf
+
+def getAdmissionConfig(section='ADMISSION'):
+    conf = getConfig()
+    admissionConf = {
+        'max_running_runs': conf.getint(section, 'max_running_runs', fallback=64),
+        'max_queued_runs': conf.getint(section, 'max_queued_runs', fallback=128),
+        'queue_timeout': conf.getfloat(section, 'queue_timeout', fallback=5.0)
+    }
+    return admissionConf
+
+def getRunRegistryConfig(section='RUNS'):
+    conf = getConfig()
+    runRegistryConf = {
+        'max_runs': conf.getint(section, 'max_runs', fallback=1024),
+        'ttl': conf.getfloat(section, 'ttl', fallback=600.0),
+        'max_wait': conf.getfloat(section, 'max_wait', fallback=60.0)
+    }
+    return runRegistryConf
+
+def getJsonBackend(section='CODEC'):
+    conf = getConfig()
+    jsonBackend = conf.get(section, 'json_backend', fallback='auto')
+    return jsonBackend.lower()
+
+def getDataPoolConfig(section='DATA_POOL'):
+    conf = getConfig()
+    dataPoolConf = {
+        'max_memory': conf.getint(section, 'max_memory', fallback=536870912),
+        'run_ttl': conf.getfloat(section, 'run_ttl', fallback=3600.0),
+        'sweep_interval': conf.getfloat(section, 'sweep_interval', fallback=60.0)
+    }
+    return dataPoolConf
+
+def getBlobStoreConfig(section='BLOB_STORE'):
+    conf = getConfig()
+    blobStoreConf = {
+        'threshold': conf.getint(section, 'threshold', fallback=1048576),
+        'max_memory': conf.getint(section, 'max_memory', fallback=268435456),
+        'spill_dir': conf.get(section, 'spill_dir', fallback='/tmp/workflow_blobs')
+    }
+    return blobStoreConf
+
+def getRetryConfig(section='RETRY'):
+    conf = getConfig()
+    retryOnStatus = conf.get(section, 'retry_on_status', fallback='429,502,503,504')
+    retryConf = {
+        'max_attempts': conf.getint(section, 'max_attempts', fallback=3),
+        'backoff_base': conf.getfloat(section, 'backoff_base', fallback=0.1),
+        'backoff_max': conf.getfloat(section, 'backoff_max', fallback=5.0),
+        'retry_on_status': [int(status) for status in retryOnStatus.split(',') if status.strip()],
+        'retry_on_timeout': conf.getboolean(section, 'retry_on_timeout', fallback=True)
+    }
+    return retryConf
+
+def getHedgeConfig(section='HEDGE'):
+    conf = getConfig()
+    hedgeConf = {
+        'percentile': conf.getfloat(section, 'percentile', fallback=95.0),
+        'min_samples': conf.getint(section, 'min_samples', fallback=20),
+        'min_delay_ms': conf.getfloat(section, 'min_delay_ms', fallback=5.0),
+        'max_extra_ratio': conf.getfloat(section, 'max_extra_ratio', fallback=0.05)
+    }
+    return hedgeConf
+
+def getLatencyWindow(section='HEDGE'):
+    conf = getConfig()
+    latencyWindow = conf.getint(section, 'latency_window', fallback=256)
+    return latencyWindow
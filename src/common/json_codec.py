@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from common.conf_system import getJsonBackend
+from typing import Any, Tuple, Union
+import base64
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+MSGPACK_CONTENT_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+MSGPACK_ACCEPT = f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.9"
+
+_backend = None
+
+
+def _default(value: Any) -> Any:
+    """ arrays as lists, blob references as their dict, bytes as base64, TypeError for anything else """
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def get_backend() -> str:
+    """ [CODEC] json_backend, auto: orjson when installed, the stdlib json otherwise """
+    global _backend
+    if _backend is None:
+        json_backend = getJsonBackend()
+        if json_backend in ('auto', 'orjson') and orjson is not None:
+            _backend = 'orjson'
+        else:
+            _backend = 'json'
+    return _backend
+
+
+def dumps(value: Any, sort_keys: bool = False) -> bytes:
+    """ utf-8 json bytes, values beyond orjson (ints over 64 bits, deep nesting) fall back to the stdlib """
+    if get_backend() == 'orjson':
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(value, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(value, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def dumps_text(value: Any, sort_keys: bool = False) -> str:
+    return dumps(value, sort_keys=sort_keys).decode('utf-8')
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """ raises json.JSONDecodeError for both backends """
+    if get_backend() == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load(fd) -> Any:
+    return loads(fd.read())
+
+
+def is_msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def is_msgpack(content_type: str) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(';')[0].strip().lower()
+    return media_type in MSGPACK_CONTENT_TYPES
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """ the client listed a msgpack media type in Accept, quality values are not ranked """
+    if not accept or msgpack is None:
+        return False
+    return any(is_msgpack(media_range) for media_range in accept.split(','))
+
+
+def encode_body(value: Any, use_msgpack: bool = False) -> Tuple[bytes, str]:
+    """ body and its content type, msgpack only when asked for and installed, bytes stay binary in msgpack """
+    if use_msgpack and msgpack is not None:
+        return msgpack.packb(value, default=_default, use_bin_type=True), MSGPACK_CONTENT_TYPE
+    return dumps(value), JSON_CONTENT_TYPE
+
+
+def decode_body(body: bytes, content_type: str = None) -> Any:
+    """ decodes by the content type of the body, json unless it is a msgpack media type, None when empty """
+    if not body:
+        return None
+    if is_msgpack(content_type):
+        if msgpack is None:
+            raise ValueError(f"msgpack is not installed to decode: {content_type}")
+        return msgpack.unpackb(body, raw=False)
+    if not body.strip():
+        return None
+    return loads(body)
@@ -32,34 +32,42 @@ class CSPMiddleware(BaseHTTPMiddleware):
 # 	wfEngine.do_process()
 
 
-logger = Logger().getLogger()
-logger.setLevel("DEBUG")
+def create_app() -> FastAPI:
+    logger = Logger().getLogger()
+    logger.setLevel("DEBUG")
 
-app = FastAPI()
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-app.add_middleware(CSPMiddleware)
-api_service_launcher = ApiLauncher(app, logger)
-app.include_router(api_service_launcher.get_router(), prefix="/admin")
+    app = FastAPI()
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(CSPMiddleware)
+    api_service_launcher = ApiLauncher(app, logger)
+    app.include_router(api_service_launcher.get_router(), prefix="/admin")
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """애플리케이션 종료 시 리소스 정리"""
+        try:
+            multiprocessing.resource_tracker._resource_tracker._fd = None
+        except Exception:
+            pass
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """애플리케이션 종료 시 리소스 정리"""
-    try:
-        multiprocessing.resource_tracker._resource_tracker._fd = None
-    except Exception:
-        pass
+    @app.exception_handler(Exception)
+    async def global_exception_handler(request, exc):
+        logger.error(f"Global exception: {exc}", exc_info=True)
+        return {"detail": "Internal Server Error"}
 
-@app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
-    logger.error(f"Global exception: {exc}", exc_info=True)
-    return {"detail": "Internal Server Error"}
+    return app
+
+
+# spawned processes (uvicorn workers, the worker processes of inner functions) re-import this file as __mp_main__,
+# they must not build an engine of their own
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import configparser
+import contextlib
+import logging
+import asyncio
+import json
+import sys
+import os
+import pytest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', '..', 'src'))
+CONF_PATH = os.path.abspath(os.path.join(TEST_DIR, '..', '..', 'conf', 'system.conf'))
+
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TEST_DIR)
+
+
+def gen_node(node_id, node_type, role, service_name, service_type, inputs, outputs, function=None):
+    service_info = {
+        "name": service_name, "desc": service_name, "type": service_type,
+        "url": "", "method": "POST", "header": {}, "body": {},
+        "params": {"format": "json", "input": [{"required": True, "key": key, "type": "string"} for key in inputs]},
+        "result": {"format": "json", "output": [{"key": key, "type": "string"} for key in outputs]}
+    }
+    if function:
+        service_info["function"] = function
+    node_info = {
+        "node_id": node_id, "node_type": node_type, "role": role, "location": "inner",
+        "containable": False, "api_keys": [""],
+        "node_info": {"name": node_id, "code": node_id, "version": "1.0", "title": node_id, "desc": node_id},
+        "services": {service_name: service_info}
+    }
+    return node_info
+
+
+def gen_edge(source, target, params):
+    edge_info = {
+        "source": source, "source_handler": {"type": "sequence", "conditions": {}},
+        "target": target, "target_handler": {"type": "sequence", "conditions": {}},
+        "params_info": [{"refer_type": "indirect", "key": key, "value": value} for key, value in params.items()]
+    }
+    return edge_info
+
+
+def gen_recipe():
+    """ start -> produce (large text) -> consume (blob_ref) -> end """
+    recipe = {
+        "workflow_id": "test_workflow", "name": "test workflow", "version": "1.0",
+        "description": "test workflow", "run_mode": "ALL",
+        "nodes": [
+            gen_node("start_node", "engine", "start", "start", "start_node", ["size"], ["size"]),
+            gen_node("produce_node", "engine", "inference", "produce", "inference", ["size"], ["text"],
+                     function="inner_functions:produce"),
+            gen_node("consume_node", "engine", "inference", "consume", "inference", ["text"], ["fetched_size"],
+                     function="inner_functions:consume"),
+            gen_node("end_node", "rest-api", "end", "end", "end", ["fetched_size"], ["fetched_size"])
+        ],
+        "edges": [
+            gen_edge("start_node.start", "produce_node.produce", {"size": "start_node.start.size"}),
+            gen_edge("produce_node.produce", "consume_node.consume", {"text": "produce_node.produce.text"}),
+            gen_edge("consume_node.consume", "end_node.end", {"fetched_size": "consume_node.consume.fetched_size"})
+        ],
+        "resources": {"consume_node": {"blob_ref": True}}
+    }
+    return recipe
+
+
+def gen_fan_out_recipe():
+    """ start -> {produce -> consume, fail} -> end, the failing branch cancels consume """
+    recipe = gen_recipe()
+    recipe["nodes"] = [
+        gen_node("start_node", "engine", "start", "start", "start_node", ["size"], ["size"]),
+        gen_node("produce_node", "engine", "inference", "produce", "inference", ["size"], ["text"],
+                 function="inner_functions:produce_async"),
+        gen_node("consume_node", "engine", "inference", "consume", "inference", ["text"], ["fetched_size"],
+                 function="inner_functions:consume"),
+        gen_node("fail_node", "engine", "inference", "fail", "inference", ["size"], ["text"],
+                 function="inner_functions:fail_async"),
+        gen_node("end_node", "rest-api", "end", "end", "end", ["fetched_size", "text"], ["fetched_size"])
+    ]
+    recipe["edges"] = [
+        gen_edge("start_node.start", "produce_node.produce", {"size": "start_node.start.size"}),
+        gen_edge("start_node.start", "fail_node.fail", {"size": "start_node.start.size"}),
+        gen_edge("produce_node.produce", "consume_node.consume", {"text": "produce_node.produce.text"}),
+        gen_edge("consume_node.consume", "end_node.end", {"fetched_size": "consume_node.consume.fetched_size"}),
+        gen_edge("fail_node.fail", "end_node.end", {"text": "fail_node.fail.text"})
+    ]
+    recipe["resources"] = {}
+    return recipe
+
+
+@pytest.fixture(scope='session')
+def engine_home(tmp_path_factory):
+    """ conf and recipe of the engine in a temporary home, conf is read from ../conf of the working directory """
+    home_dir = tmp_path_factory.mktemp('engine')
+    for dirname in ['conf', 'src', 'recipe', 'lock', 'meta']:
+        os.makedirs(home_dir / dirname, exist_ok=True)
+
+    conf = configparser.RawConfigParser()
+    conf.read(CONF_PATH)
+    conf.set('HOME', 'home_dir', str(home_dir))
+    conf.set('HOME', 'lock_dir', f"{home_dir}/lock/")
+    conf.set('HOME', 'route_dir', str(home_dir / 'meta'))
+    conf.set('DAG', 'dag_dir', str(home_dir / 'recipe'))
+    conf.set('DAG', 'dag_file', 'test_recipe.json')
+    conf.set('BLOB_STORE', 'spill_dir', str(home_dir / 'blobs'))
+    with open(home_dir / 'conf' / 'system.conf', 'w') as fd:
+        conf.write(fd)
+    with open(home_dir / 'recipe' / 'test_recipe.json', 'w') as fd:
+        json.dump(gen_recipe(), fd)
+
+    prev_dir = os.getcwd()
+    os.chdir(home_dir / 'src')
+    yield home_dir
+    os.chdir(prev_dir)
+
+
+async def _cancel_tasks():
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture(scope='session')
+def engine(engine_home):
+    from api.workflow.workflow_api import WorkflowEngine
+    logger = logging.getLogger('test_workflow')
+    engine = WorkflowEngine(logger)
+    yield engine
+    # stops the recipe watcher before the interpreter exits
+    watch_loop = engine._metastore._task.get_loop()
+    asyncio.run_coroutine_threadsafe(_cancel_tasks(), watch_loop).result(10)
+    watch_loop.call_soon_threadsafe(watch_loop.stop)
+
+
+@contextlib.contextmanager
+def recipe_loaded(engine, recipe):
+    """ publishes another recipe for the duration of a test, the test recipe is restored afterwards """
+    engine._metastore.set_base_wf_meta(recipe)
+    try:
+        yield
+    finally:
+        engine._metastore.set_base_wf_meta(gen_recipe())
+
+
+def get_endpoint(engine, path):
+    for route in engine.get_router().routes:
+        if route.path == path:
+            return route.endpoint
+    raise KeyError(path)
+
+
+async def start_server(handler):
+    """ a service on a free local port, returns its runner and base url """
+    from aiohttp import web
+    app = web.Application()
+    app.router.add_post('/{path:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def gen_http_request(request):
+    """ json POST request as the endpoints receive it """
+    from starlette.requests import Request
+    body = json.dumps(request).encode('utf-8')
+    scope = {'type': 'http', 'method': 'POST', 'path': '/', 'query_string': b'',
+             'headers': [(b'content-type', b'application/json')]}
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return Request(scope, receive)
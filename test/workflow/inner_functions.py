@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+
+# inner functions of the test recipe, fetch_blob is bound by the test to GET /workflow/blobs/{blob_id}
+fetch_blob = None
+fetched_blobs = []
+
+
+def produce(size, **kwargs):
+    return {"text": "x" * int(size)}
+
+
+def consume(text, **kwargs):
+    # values under the blob store threshold are passed inline
+    if not isinstance(text, dict):
+        return {"fetched_size": len(text)}
+    status_code, body = fetch_blob(text["$blob"])
+    fetched_blobs.append((text["$blob"], status_code, len(body)))
+    return {"fetched_size": len(body)}
+
+
+def sleep(seconds, **kwargs):
+    time.sleep(float(seconds))
+    return {"slept": seconds}
+
+
+async def produce_async(size, **kwargs):
+    return {"text": "x" * int(size)}
+
+
+async def fail_async(size, **kwargs):
+    raise ValueError(f"failed on purpose: {size}")
+
+
+# answers of flaky_async before it succeeds, (status, retry_after) each, set by the test
+flaky_failures = []
+
+
+async def flaky_async(size, **kwargs):
+    from api.workflow.error_pool.error import ApiCallFailed
+    if flaky_failures:
+        status, retry_after = flaky_failures.pop(0)
+        raise ApiCallFailed("inner_functions:flaky_async", status, retry_after)
+    return {"text": "x" * int(size)}
+
+
+def produce_slowly(size, **kwargs):
+    time.sleep(0.3)
+    return {"text": "x" * int(size)}
+
+
+# sizes produce_counted was called with
+produced_sizes = []
+
+
+def produce_counted(size, **kwargs):
+    produced_sizes.append(int(size))
+    return {"text": "x" * int(size)}
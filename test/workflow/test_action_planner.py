@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import gen_recipe, recipe_loaded
+from api.workflow.access.data.cached_plan_access import CachedPlanAccess
+import logging
+
+
+def test_plan_is_reused_for_same_range_and_request_keys(engine):
+    planner = engine._act_planner
+
+    first_pack = planner.gen_action_meta_pack(None, None, {"size": 1, "request_id": "first"})
+    second_pack = planner.gen_action_meta_pack(None, None, {"size": 2, "request_id": "second"})
+
+    assert second_pack['act_param_slots'] is first_pack['act_param_slots']
+    assert second_pack['act_value_refs'] is first_pack['act_value_refs']
+    # tasks hold the state of one run and are never shared
+    assert second_pack['act_task_map'] is not first_pack['act_task_map']
+    assert second_pack['act_task_map']["produce_node.produce"] is not first_pack['act_task_map']["produce_node.produce"]
+
+
+def test_plan_covers_nodes_between_from_and_to(engine):
+    planner = engine._act_planner
+
+    meta_pack = planner.gen_action_meta_pack("produce_node.produce", "consume_node.consume", {"size": 1})
+
+    assert sorted(meta_pack['act_service_ids']) == ["consume_node.consume", "produce_node.produce"]
+    assert meta_pack['act_start_nodes'] == ("produce_node.produce",)
+    assert meta_pack['act_end_nodes'] == ("consume_node.consume",)
+    assert planner.gen_action_meta_pack("consume_node.consume", "produce_node.produce", {"size": 1})['act_service_ids'] == ()
+
+
+def test_reloaded_recipe_is_planned_again(engine):
+    planner = engine._act_planner
+    prev_pack = planner.gen_action_meta_pack(None, None, {"size": 1})
+    recipe = gen_recipe()
+    recipe["nodes"][1]["services"]["produce"]["function"] = "inner_functions:produce_async"
+
+    with recipe_loaded(engine, recipe):
+        meta_pack = planner.gen_action_meta_pack(None, None, {"size": 1})
+
+    assert meta_pack['compiled_workflow'].get_version() > prev_pack['compiled_workflow'].get_version()
+    assert meta_pack['act_param_slots'] is not prev_pack['act_param_slots']
+
+
+def test_least_recently_used_plan_is_evicted(engine_home):
+    plan_access = CachedPlanAccess(logging.getLogger('test_action_planner'), max_size=2)
+    plan_access.set_plan_access("first", {"plan": 1})
+    plan_access.set_plan_access("second", {"plan": 2})
+    plan_access.get_plan_access("first")
+
+    plan_access.set_plan_access("third", {"plan": 3})
+
+    assert plan_access.get_plan_access("second") is None
+    assert plan_access.get_plan_access("first") == {"plan": 1}
+    assert plan_access.get_plan_access("third") == {"plan": 3}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import get_endpoint, gen_http_request, gen_recipe, recipe_loaded
+from api.workflow.control.execute.admission_controller import AdmissionController
+from api.workflow.error_pool.error import RunRejected
+import contextlib
+import logging
+import asyncio
+import json
+import pytest
+
+
+@contextlib.contextmanager
+def admission_limited(max_running_runs, max_queued_runs, queue_timeout):
+    """ limits of the shared admission controller for the duration of a test """
+    admission = AdmissionController(logging.getLogger('test_admission'))
+    limits = (admission._max_running_runs, admission._max_queued_runs, admission._queue_timeout)
+    admission._max_running_runs, admission._max_queued_runs, admission._queue_timeout = \
+        max_running_runs, max_queued_runs, queue_timeout
+    try:
+        yield admission
+    finally:
+        admission._max_running_runs, admission._max_queued_runs, admission._queue_timeout = limits
+
+
+def test_runs_beyond_limit_wait_in_order_or_are_rejected(engine_home):
+    async def admit_runs(admission):
+        first_ts = await admission.admit_run_ctl("first")
+        second_job = asyncio.create_task(admission.admit_run_ctl("second"))
+        await asyncio.sleep(0)
+        with pytest.raises(RunRejected) as rejected:
+            await admission.admit_run_ctl("third")
+        assert not second_job.done()
+        admission.release_run_ctl(first_ts)
+        second_ts = await asyncio.wait_for(second_job, 1)
+        admission.release_run_ctl(second_ts)
+        return rejected.value
+
+    with admission_limited(1, 1, 5) as admission:
+        rejected = asyncio.run(admit_runs(admission))
+        stats = admission.get_stats_ctl()
+
+    assert str(rejected) == "Run rejected, queue is full"
+    assert rejected.get_retry_after() >= 1
+    assert (stats['running'], stats['waiting']) == (0, 0)
+
+
+def test_run_endpoint_answers_429_with_retry_after(engine):
+    run_workflow = get_endpoint(engine, '/workflow/run')
+
+    async def run_while_busy(admission):
+        admitted_ts = await admission.admit_run_ctl("busy")
+        try:
+            return await run_workflow(http_request=gen_http_request({"size": 10}))
+        finally:
+            admission.release_run_ctl(admitted_ts)
+
+    with admission_limited(1, 1, 0.1) as admission:
+        response = asyncio.run(run_while_busy(admission))
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert json.loads(response.body) == {"result": "Run rejected, queue wait timed out"}
+
+
+def test_thread_mode_run_does_not_block_event_loop(engine):
+    run_workflow = get_endpoint(engine, '/workflow/run')
+    recipe = gen_recipe()
+    recipe["nodes"][1]["services"]["produce"]["function"] = "inner_functions:produce_slowly"
+
+    async def run_with_ticker():
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(asyncio.get_running_loop().time())
+                await asyncio.sleep(0.01)
+
+        ticker_job = asyncio.create_task(tick())
+        try:
+            response = await run_workflow(http_request=gen_http_request({"size": 10}))
+        finally:
+            ticker_job.cancel()
+        return response, ticks
+
+    orchestration_mode = engine._orchestration_mode
+    engine._orchestration_mode = 'THREAD'
+    try:
+        with recipe_loaded(engine, recipe):
+            response, ticks = asyncio.run(run_with_ticker())
+    finally:
+        engine._orchestration_mode = orchestration_mode
+
+    assert json.loads(response.body) == {"result": {"fetched_size": 10}}
+    assert len(ticks) > 10
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import start_server
+from api.workflow.access.execute.api_batcher import ApiBatcher
+from api.workflow.error_pool.error import ApiCallFailed
+from aiohttp import web
+import logging
+import asyncio
+import pytest
+
+logger = logging.getLogger('test_api_batcher')
+
+
+def gen_v2_request(rows):
+    return {"id": f"rows_{len(rows)}",
+            "inputs": [{"name": "x", "datatype": "FP32", "shape": [len(rows), 2], "data": rows}]}
+
+
+def test_kserve_v2_calls_are_concatenated_and_split(engine_home):
+    received = []
+
+    async def infer(request):
+        body = await request.json()
+        received.append(body)
+        tensor = body["inputs"][0]
+        output = dict(tensor, name="y", data=[value * 2 for value in tensor["data"]])
+        return web.json_response({"model_name": "m", "outputs": [output]})
+
+    async def run():
+        runner, base_url = await start_server(infer)
+        try:
+            batcher = ApiBatcher(logger, f"{base_url}/v2/models/m/infer", max_batch_size=3, max_wait_ms=50,
+                                 batch_format='kserve_v2')
+            return await asyncio.gather(
+                batcher.submit(gen_v2_request([[1, 2]]), 5),
+                batcher.submit(gen_v2_request([[3, 4], [5, 6]]), 5),
+                batcher.submit(gen_v2_request([[7, 8]]), 5))
+        finally:
+            await runner.cleanup()
+
+    results = asyncio.run(run())
+
+    assert len(received) == 1
+    assert received[0]["inputs"][0]["shape"] == [4, 2]
+    assert "id" not in received[0]
+    assert [result["outputs"][0]["data"] for result in results] == [[2, 4], [6, 8, 10, 12], [14, 16]]
+    assert [result["outputs"][0]["shape"] for result in results] == [[1, 2], [2, 2], [1, 2]]
+    assert [result["id"] for result in results] == ["rows_1", "rows_2", "rows_1"]
+
+
+def test_list_calls_are_sent_to_batch_url(engine_home):
+    received = []
+
+    async def generate(request):
+        body = await request.json()
+        received.append((request.path, body))
+        return web.json_response([{"text_output": item["text_input"].upper()} for item in body])
+
+    async def run():
+        runner, base_url = await start_server(generate)
+        try:
+            batcher = ApiBatcher(logger, f"{base_url}/generate", batch_url=f"{base_url}/generate_batch",
+                                 max_batch_size=2, max_wait_ms=50)
+            return await asyncio.gather(batcher.submit({"text_input": "a"}, 5), batcher.submit({"text_input": "b"}, 5))
+        finally:
+            await runner.cleanup()
+
+    results = asyncio.run(run())
+
+    assert received == [("/generate_batch", [{"text_input": "a"}, {"text_input": "b"}])]
+    assert results == [{"text_output": "A"}, {"text_output": "B"}]
+
+
+def test_failed_batch_raises_api_call_failed_to_every_call(engine_home):
+    async def busy(request):
+        return web.json_response({"error": "busy"}, status=503, headers={"Retry-After": "2"})
+
+    async def run():
+        runner, base_url = await start_server(busy)
+        try:
+            batcher = ApiBatcher(logger, f"{base_url}/infer", max_batch_size=2, max_wait_ms=50, batch_format='kserve_v2')
+            return await asyncio.gather(batcher.submit(gen_v2_request([[1, 2]]), 5),
+                                        batcher.submit(gen_v2_request([[3, 4]]), 5), return_exceptions=True)
+        finally:
+            await runner.cleanup()
+
+    errors = asyncio.run(run())
+
+    for error in errors:
+        assert isinstance(error, ApiCallFailed)
+        assert (error.get_status(), error.get_retry_after()) == (503, 2.0)
+
+
+def test_stalled_batch_is_bounded_by_the_call_timeout(engine_home):
+    async def stalled(request):
+        await asyncio.sleep(1.5)
+        return web.json_response([])
+
+    async def run():
+        runner, base_url = await start_server(stalled)
+        try:
+            batcher = ApiBatcher(logger, f"{base_url}/generate", batch_url=f"{base_url}/generate_batch",
+                                 max_batch_size=2, max_wait_ms=50)
+            started_ts = asyncio.get_running_loop().time()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.gather(batcher.submit({"text_input": "a"}, 0.2), batcher.submit({"text_input": "b"}, 0.3))
+            return asyncio.get_running_loop().time() - started_ts
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) < 1
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import get_endpoint
+from api.workflow.access.data.blob_store_access import BlobRef
+from api.workflow.control.execute.run_registry import RunRegistry
+from common.json_codec import dumps, loads
+import inner_functions
+import logging
+import asyncio
+
+
+def test_blob_ref_consumer_fetches_blob_while_running(engine):
+    call_blob = get_endpoint(engine, '/workflow/blobs/{blob_id}')
+
+    def fetch_blob(blob_id):
+        response = asyncio.run(call_blob(http_request=None, blob_id=blob_id))
+        return response.status_code, response.body
+
+    inner_functions.fetch_blob = fetch_blob
+    inner_functions.fetched_blobs.clear()
+    size = 2 * 1024 * 1024
+    request = {"size": size, "request_id": "test_blob_ref"}
+
+    result = asyncio.run(engine._execute_run(None, None, request, "test_blob_ref", 10))
+
+    assert result == {"fetched_size": size}
+    [(blob_id, status_code, fetched_size)] = inner_functions.fetched_blobs
+    assert status_code == 200
+    assert fetched_size == size
+    # released once the consumer is done
+    response = asyncio.run(call_blob(http_request=None, blob_id=blob_id))
+    assert response.status_code == 404
+
+
+def test_run_handle_keeps_blob_ref_of_large_result(engine):
+    run_handle = RunRegistry(logging.getLogger('test_blob_ref')).open_run_ctl("test_blob_ref_handle")
+    inner_functions.fetch_blob = lambda blob_id: (200, b"")
+    size = 2 * 1024 * 1024
+    request = {"size": size, "request_id": "test_blob_ref_handle"}
+
+    asyncio.run(engine._execute_run(None, None, request, "test_blob_ref_handle", 10, run_handle=run_handle))
+    run_handle.set_finished({"fetched_size": 0})
+
+    produce_result = run_handle.to_dict()['partial_results']['produce_node.produce']
+    assert isinstance(produce_result['text'], BlobRef)
+    assert loads(dumps(produce_result)) == {"text": {"$blob": produce_result['text'].blob_id, "size": size, "type": "text"}}
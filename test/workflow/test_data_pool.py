@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.data.cached_io_data_access import CachedIODataAccess
+from api.workflow.control.data.data_io_controller import DataIoController
+from api.workflow.error_pool.error import ExceededDataPoolMemory, NotExistedData
+import logging
+import asyncio
+import pytest
+import time
+
+
+def test_result_beyond_max_memory_fails_the_task(engine):
+    data_access = DataIoController._instance._data_access
+    task_events = []
+
+    def task_listener(task):
+        task_events.append((task.get_service_id(), task.get_state().name, task.get_error()))
+
+    max_memory = data_access._max_memory
+    data_access._max_memory = 100
+    try:
+        request = {"size": 1000, "request_id": "test_data_pool"}
+        asyncio.run(engine._execute_run(None, None, request, "test_data_pool", 10, task_listener=task_listener))
+    finally:
+        data_access._max_memory = max_memory
+
+    produce_events = [(state, error) for service_id, state, error in task_events if service_id == "produce_node.produce"]
+    state, error = produce_events[-1]
+    assert state == "FAILED"
+    assert isinstance(error, ExceededDataPoolMemory)
+    assert ("consume_node.consume", "CANCELED", None) in task_events
+
+
+def test_expiry_keeps_runs_in_use(engine_home):
+    data_access = CachedIODataAccess(logging.getLogger('test_data_pool'))
+    data_access._run_ttl = 0.2
+    data_access._sweep_interval = 0
+    data_access.open_namespace("active_run")
+    data_access.open_namespace("abandoned_run")
+    time.sleep(0.15)
+    data_access.set_data("node.key", "value", "active_run")
+    time.sleep(0.1)
+
+    data_access.open_namespace("next_run")
+
+    assert data_access.pop_expired_namespaces() == ["abandoned_run"]
+    assert data_access.get_data("node.key", "active_run") == "value"
+
+
+def test_expiry_sweep_is_amortized(engine_home):
+    data_access = CachedIODataAccess(logging.getLogger('test_data_pool'))
+    data_access._run_ttl = 0.05
+    data_access._sweep_interval = 60
+    data_access.open_namespace("first_run")
+    time.sleep(0.1)
+
+    data_access.open_namespace("second_run")
+    data_access.open_namespace("third_run")
+
+    assert data_access.pop_expired_namespaces() == []
+    assert data_access.get_stats()['runs'] == 3
+
+
+def test_run_reads_only_its_own_namespace(engine_home):
+    data_access = CachedIODataAccess(logging.getLogger('test_data_pool'))
+    data_access.open_namespace("first_run")
+    data_access.open_namespace("second_run")
+    data_access.set_data("O.node.key", "value", "first_run")
+
+    assert data_access.get_data("O.node.key", "first_run") == "value"
+    with pytest.raises(NotExistedData):
+        data_access.get_data("O.node.key", "second_run")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import gen_fan_out_recipe, recipe_loaded
+from api.workflow.control.execute.execution_pool import ExecutionPool
+import logging
+import asyncio
+
+
+def test_failed_fan_out_gives_back_every_slot(engine):
+    execution_pool = ExecutionPool(logging.getLogger('test_execution_pool'))
+    task_states = {}
+
+    def task_listener(task):
+        task_states[task.get_service_id()] = task.get_state().name
+
+    with recipe_loaded(engine, gen_fan_out_recipe()):
+        for run_index in range(3):
+            request = {"size": 10, "request_id": f"test_fan_out_{run_index}"}
+            asyncio.run(engine._execute_run(None, None, request, f"test_fan_out_{run_index}", 0,
+                                            task_listener=task_listener))
+
+            assert task_states["fail_node.fail"] == "FAILED"
+            assert task_states["produce_node.produce"] == "COMPLETED"
+            assert execution_pool.get_stats()['running'] == 0
+            assert execution_pool.get_stats()['slots'] == {}
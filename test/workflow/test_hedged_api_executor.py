@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import start_server
+from api.workflow.access.execute.hedged_api_executor import HedgedApiExecutor
+from api.workflow.access.execute.latency_tracker import LatencyTracker
+from aiohttp import web
+import logging
+import asyncio
+
+logger = logging.getLogger('test_hedged_api_executor')
+
+
+def gen_hedge_policy(alternate_url, max_extra_ratio):
+    return {'percentile': 95, 'min_samples': 20, 'min_delay_ms': 5, 'max_extra_ratio': max_extra_ratio,
+            'alternate_urls': [alternate_url]}
+
+
+async def serve(request):
+    """ /slow answers after a second, /fast at once """
+    if request.path == '/slow':
+        await asyncio.sleep(1)
+    return web.json_response({"path": request.path})
+
+
+def call_hedged(service_id, max_extra_ratio):
+    latency_tracker = LatencyTracker(logger)
+    for _ in range(20):
+        latency_tracker.record_latency(service_id, 0.01)
+
+    async def run():
+        runner, base_url = await start_server(serve)
+        try:
+            executor = HedgedApiExecutor(logger, service_id, gen_hedge_policy(f"{base_url}/fast", max_extra_ratio))
+            executor.set_url(f"{base_url}/slow")
+            started_ts = asyncio.get_running_loop().time()
+            result = await executor.run_async({"text_input": "a"})
+            return result, asyncio.get_running_loop().time() - started_ts
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+
+def test_slow_call_is_hedged_to_alternate_url(engine_home):
+    result, elapsed = call_hedged('hedge_node.hedged', 1.0)
+
+    assert result == {"path": "/fast"}
+    assert elapsed < 0.5
+    stats = LatencyTracker(logger).get_stats()['hedge_node.hedged']
+    assert (stats['hedged'], stats['calls']) == (1, 1)
+    # the cancelled slow call is kept as a lower bound of the service latency
+    assert stats['samples'] == 22
+
+
+def test_hedge_is_not_sent_beyond_max_extra_ratio(engine_home):
+    result, elapsed = call_hedged('hedge_node.unhedged', 0)
+
+    assert result == {"path": "/slow"}
+    assert elapsed >= 1
+    stats = LatencyTracker(logger).get_stats()['hedge_node.unhedged']
+    assert (stats['hedged'], stats['calls']) == (0, 1)
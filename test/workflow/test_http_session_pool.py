@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.execute.http_session_pool import HttpSessionPool
+import logging
+import asyncio
+
+
+def test_host_sessions_share_one_connector(engine_home):
+    session_pool = HttpSessionPool(logging.getLogger('test_http_session_pool'))
+
+    async def get_sessions():
+        return [session_pool.get_session(url) for url in
+                ["http://first-host:8000/infer", "http://first-host:8000/generate", "http://second-host:8000/infer"]]
+
+    first_session, same_session, second_session = asyncio.run(get_sessions())
+
+    assert first_session is same_session
+    assert first_session is not second_session
+    assert first_session.connector is second_session.connector
+
+
+def test_sessions_of_closed_loop_are_closed_on_rebind(engine_home):
+    session_pool = HttpSessionPool(logging.getLogger('test_http_session_pool'))
+
+    async def get_session():
+        session = session_pool.get_session("http://first-host:8000/infer")
+        return session, session.connector
+
+    async def rebind():
+        session = session_pool.get_session("http://first-host:8000/infer")
+        await asyncio.gather(*session_pool._closing_jobs)
+        await session_pool.close()
+        return session
+
+    stale_session, stale_connector = asyncio.run(get_session())
+    session = asyncio.run(rebind())
+
+    assert session is not stale_session
+    assert stale_session.closed
+    assert stale_connector.closed
+    assert session.closed
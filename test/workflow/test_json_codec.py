@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.control.data.result_cache_controller import ResultCacheController
+from common.json_codec import dumps, loads, encode_body, decode_body, JSON_CONTENT_TYPE
+import logging
+import base64
+import pytest
+
+
+def test_bytes_are_encoded_as_base64(engine_home):
+    audio = bytes(range(256))
+
+    encoded = loads(dumps({"audio": audio}))
+
+    assert base64.b64decode(encoded["audio"]) == audio
+
+
+def test_unsupported_type_raises(engine_home):
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_ints_beyond_64_bits_fall_back_to_stdlib(engine_home):
+    assert loads(dumps({"value": 2 ** 70})) == {"value": 2 ** 70}
+
+
+def test_body_round_trip(engine_home):
+    body, content_type = encode_body({"text": "요약", "score": 0.5})
+
+    assert content_type == JSON_CONTENT_TYPE
+    assert decode_body(body, content_type) == {"text": "요약", "score": 0.5}
+    assert decode_body(b" \n", content_type) is None
+
+
+def test_unserializable_values_are_not_cached(engine_home):
+    result_cache = ResultCacheController(logging.getLogger('test_json_codec'))
+    cache_policy = {'max_size': 8, 'ttl': 60, 'max_memory': 0}
+
+    assert result_cache.gen_cache_key_ctl({"value": object()}) is None
+    cache_key = result_cache.gen_cache_key_ctl({"value": 1})
+    result_cache.set_result_ctl("node.service", cache_key, {"value": object()}, cache_policy)
+    assert result_cache.get_result_ctl("node.service", cache_key) is None
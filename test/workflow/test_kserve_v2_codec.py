@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import start_server
+from api.workflow.access.execute.api_executor import ApiExecutor
+from api.workflow.access.execute.kserve_v2_codec import KServeV2Codec, INFERENCE_HEADER
+from common.json_codec import dumps, loads
+from aiohttp import web
+import logging
+import asyncio
+import struct
+import pytest
+
+logger = logging.getLogger('test_kserve_v2_codec')
+
+
+def split_body(body, header_length):
+    return loads(body[:header_length]), body[header_length:]
+
+
+def gen_response_body(outputs):
+    """ v2 binary response of (name, datatype, shape, raw tensor) outputs """
+    response_header = {"model_name": "m", "outputs": [
+        {"name": name, "datatype": datatype, "shape": shape, "parameters": {"binary_data_size": len(raw)}}
+        for name, datatype, shape, raw in outputs]}
+    header_bytes = dumps(response_header)
+    return header_bytes + b''.join(raw for _, _, _, raw in outputs), len(header_bytes)
+
+
+def test_flattened_tensor_is_sent_as_raw_little_endian_bytes(engine_home):
+    params = {"name": "x", "shape": [2, 2], "datatype": "FP32", "data": [[1.0, 2.0], [3.0, 4.0]], "id": "req"}
+
+    body, headers = KServeV2Codec(logger).encode_request(params)
+
+    request_header, raw = split_body(body, int(headers[INFERENCE_HEADER]))
+    assert headers['Content-Type'] == 'application/octet-stream'
+    assert request_header == {"id": "req", "parameters": {"binary_data_output": True}, "inputs": [
+        {"name": "x", "shape": [2, 2], "datatype": "FP32", "parameters": {"binary_data_size": 16}}]}
+    assert raw == struct.pack('<4f', 1.0, 2.0, 3.0, 4.0)
+
+
+def test_bytes_tensor_items_are_length_prefixed(engine_home):
+    params = {"inputs": [{"name": "text", "shape": [2], "datatype": "BYTES", "data": ["ab", "c"]}],
+              "outputs": [{"name": "y"}]}
+
+    body, headers = KServeV2Codec(logger).encode_request(params)
+
+    request_header, raw = split_body(body, int(headers[INFERENCE_HEADER]))
+    assert raw == struct.pack('<I', 2) + b"ab" + struct.pack('<I', 1) + b"c"
+    assert request_header["outputs"] == [{"name": "y", "parameters": {"binary_data": True}}]
+    assert "parameters" not in request_header
+
+
+def test_binary_outputs_are_decoded(engine_home):
+    body, header_length = gen_response_body([
+        ("y", "INT32", [1, 3], struct.pack('<3i', 1, -2, 3)),
+        ("label", "BYTES", [1], struct.pack('<I', 3) + b"cat")])
+    codec = KServeV2Codec(logger)
+
+    result = codec.decode_response(body, header_length, is_flattened=False)
+
+    assert result["model_name"] == "m"
+    assert [output["data"] for output in result["outputs"]] == [[1, -2, 3], [b"cat"]]
+
+
+def test_single_output_is_flattened_for_flattened_params(engine_home):
+    body, header_length = gen_response_body([("y", "FP64", [2], struct.pack('<2d', 0.5, 1.5))])
+
+    result = KServeV2Codec(logger).decode_response(body, header_length)
+
+    assert result == {"model_name": "m", "name": "y", "shape": [2], "datatype": "FP64", "data": [0.5, 1.5]}
+
+
+def test_json_response_without_header_length_is_kept(engine_home):
+    response = {"model_name": "m", "outputs": [{"name": "y", "datatype": "FP32", "shape": [1], "data": [1.0]}]}
+
+    result = KServeV2Codec(logger).decode_response(dumps(response), None, is_flattened=False)
+
+    assert result == response
+
+
+def test_unsupported_datatype_is_rejected(engine_home):
+    with pytest.raises(ValueError):
+        KServeV2Codec(logger).encode_request({"name": "x", "shape": [1], "datatype": "COMPLEX", "data": [1]})
+
+
+def test_api_executor_calls_service_with_binary_tensors(engine_home):
+    async def infer(request):
+        body = await request.read()
+        request_header, raw = split_body(body, int(request.headers[INFERENCE_HEADER]))
+        data = struct.unpack('<2f', raw)
+        response_body, header_length = gen_response_body([("y", "FP32", [2], struct.pack('<2f', *[v * 2 for v in data]))])
+        return web.Response(body=response_body, headers={INFERENCE_HEADER: str(header_length)},
+                            content_type='application/octet-stream')
+
+    async def run():
+        runner, base_url = await start_server(infer)
+        try:
+            executor = ApiExecutor(logger)
+            executor.set_url(f"{base_url}/v2/models/m/infer")
+            executor.set_kserve_binary_policy({'binary_outputs': True})
+            return await executor.run_async({"name": "x", "shape": [2], "datatype": "FP32", "data": [1.0, 2.5]})
+        finally:
+            await runner.cleanup()
+
+    result = asyncio.run(run())
+
+    assert result["data"] == [2.0, 5.0]
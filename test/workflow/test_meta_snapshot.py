@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import gen_recipe, recipe_loaded
+from api.workflow.access.data.cached_metastore_access import CachedMetastoreAccess
+import threading
+import logging
+import asyncio
+import pytest
+
+logger = logging.getLogger('test_meta_snapshot')
+
+
+def test_published_metas_are_frozen_and_old_snapshot_is_kept(engine_home):
+    metastore_access = CachedMetastoreAccess(logger)
+    first_snapshot = metastore_access.publish_snapshot_access(dag_meta={"nodes": ["a"]}, resources={"a": {"cache": True}})
+
+    second_snapshot = metastore_access.publish_snapshot_access(dag_meta={"nodes": ["a", "b"]})
+
+    assert second_snapshot.get_version() == first_snapshot.get_version() + 1
+    assert first_snapshot.get('dag_meta')['nodes'] == ("a",)
+    assert second_snapshot.get('dag_meta')['nodes'] == ("a", "b")
+    # metas not given are shared with the previous snapshot
+    assert second_snapshot.get('resources') is first_snapshot.get('resources')
+    with pytest.raises(TypeError):
+        second_snapshot.get('dag_meta')['nodes'] = ()
+    with pytest.raises(TypeError):
+        second_snapshot.get('resources')['a']['cache'] = False
+
+
+def test_readers_never_see_a_half_published_snapshot(engine_home):
+    metastore_access = CachedMetastoreAccess(logger)
+    metastore_access.publish_snapshot_access(dag_meta={"version": 0}, resources={"version": 0})
+    torn_reads = []
+    is_publishing = threading.Event()
+    is_publishing.set()
+
+    def read_snapshots():
+        while is_publishing.is_set():
+            snapshot = metastore_access.get_snapshot_access()
+            if snapshot.get('dag_meta')['version'] != snapshot.get('resources')['version']:
+                torn_reads.append(snapshot.get_version())
+
+    readers = [threading.Thread(target=read_snapshots) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for version in range(1, 2001):
+        metastore_access.publish_snapshot_access(dag_meta={"version": version}, resources={"version": version})
+    is_publishing.clear()
+    for reader in readers:
+        reader.join()
+
+    assert torn_reads == []
+    assert metastore_access.get_snapshot_access().get('dag_meta')['version'] == 2000
+
+
+def test_in_flight_run_keeps_its_snapshot_across_reload(engine):
+    slow_recipe = gen_recipe()
+    slow_recipe["nodes"][1]["services"]["produce"]["function"] = "inner_functions:produce_slowly"
+    failing_recipe = gen_recipe()
+    failing_recipe["nodes"][1]["services"]["produce"]["function"] = "inner_functions:fail_async"
+
+    async def run_during_reload():
+        request = {"size": 10, "request_id": "test_meta_snapshot"}
+        run_job = asyncio.create_task(engine._execute_run(None, None, request, "test_meta_snapshot", 10))
+        await asyncio.sleep(0.1)
+        engine._metastore.set_base_wf_meta(failing_recipe)
+        return await run_job
+
+    with recipe_loaded(engine, slow_recipe):
+        prev_version = engine._datastore.get_meta_snapshot_service().get_version()
+        result = asyncio.run(run_during_reload())
+        next_version = engine._datastore.get_meta_snapshot_service().get_version()
+
+    assert result == {"fetched_size": 10}
+    assert next_version > prev_version
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.access.execute.process_executor import ProcessExecutor
+from api.workflow.control.execute.execution_pool import ExecutionPool
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import pytest
+import os
+
+
+def test_broken_process_pool_is_replaced(engine_home):
+    logger = logging.getLogger('test_process_pool')
+    execution_pool = ExecutionPool(logger)
+    process_policy = {'cpu_affinity': None, 'shm_threshold': 1024}
+    try:
+        crashed_call = execution_pool.submit_process(os._exit, 1)
+        with pytest.raises(BrokenProcessPool):
+            crashed_call.result(30)
+        broken_executor = execution_pool.get_process_executor()
+
+        executor = ProcessExecutor(logger, "inner_functions:produce", execution_pool.submit_process, process_policy)
+        result = executor.run({"size": 2048})
+
+        assert result == {"text": "x" * 2048}
+        assert execution_pool.get_process_executor() is not broken_executor
+    finally:
+        execution_pool.shutdown()
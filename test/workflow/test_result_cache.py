@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import gen_recipe, recipe_loaded
+from api.workflow.access.data.cached_result_access import CachedResultAccess
+import inner_functions
+import logging
+import asyncio
+import time
+
+
+def gen_cached_recipe():
+    recipe = gen_recipe()
+    recipe["nodes"][1]["services"]["produce"]["function"] = "inner_functions:produce_counted"
+    recipe["resources"] = {"produce_node": {"cache": True}}
+    return recipe
+
+
+def test_deterministic_service_is_called_once_per_params(engine):
+    cached_states = []
+
+    def task_listener(task):
+        if task.get_service_id() == "produce_node.produce":
+            cached_states.append(task.is_cached())
+
+    inner_functions.produced_sizes.clear()
+    results = []
+    with recipe_loaded(engine, gen_cached_recipe()):
+        for size in [10, 10, 20]:
+            request = {"size": size, "request_id": "test_result_cache"}
+            results.append(asyncio.run(engine._execute_run(None, None, request, f"test_result_cache_{len(results)}", 10,
+                                                           task_listener=task_listener)))
+
+    assert results == [{"fetched_size": 10}, {"fetched_size": 10}, {"fetched_size": 20}]
+    assert inner_functions.produced_sizes == [10, 20]
+    assert cached_states == [False, True, False]
+
+
+def test_entries_are_bounded_by_size_memory_and_ttl(engine_home):
+    result_access = CachedResultAccess(logging.getLogger('test_result_cache'))
+
+    for cache_key in ["first", "second", "third"]:
+        result_access.set_result_access("svc", cache_key, {"key": cache_key}, 10, max_size=2, ttl=0, max_memory=0)
+    assert result_access.get_result_access("svc", "first") is None
+    assert result_access.get_result_access("svc", "third") == {"key": "third"}
+
+    assert not result_access.set_result_access("svc", "large", {"key": "large"}, 100, max_size=0, ttl=0, max_memory=50)
+
+    result_access.set_result_access("svc", "expiring", {"key": "expiring"}, 10, max_size=0, ttl=0.05, max_memory=0)
+    time.sleep(0.1)
+    assert result_access.get_result_access("svc", "expiring") is None
+
+    stats = result_access.get_stats_access()["svc"]
+    assert (stats['evictions'], stats['expirations']) == (1, 1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import gen_recipe, recipe_loaded
+import inner_functions
+import asyncio
+import time
+
+
+def gen_flaky_recipe(retry_conf):
+    """ the test recipe with a produce node failing as inner_functions.flaky_failures tells """
+    recipe = gen_recipe()
+    recipe["nodes"][1]["services"]["produce"]["function"] = "inner_functions:flaky_async"
+    recipe["resources"] = {"produce_node": {"retry": retry_conf}}
+    return recipe
+
+
+def run_flaky(engine, retry_conf, failures, run_timeout=0):
+    task_events = []
+
+    def task_listener(task):
+        if task.get_service_id() == "produce_node.produce":
+            task_events.append((task.get_state().name, task.get_attempts()))
+
+    inner_functions.flaky_failures[:] = failures
+    with recipe_loaded(engine, gen_flaky_recipe(retry_conf)):
+        started_ts = time.monotonic()
+        request = {"size": 10, "request_id": "test_retry"}
+        result = asyncio.run(engine._execute_run(None, None, request, "test_retry", run_timeout,
+                                                 task_listener=task_listener))
+    return result, task_events, time.monotonic() - started_ts
+
+
+def test_failed_call_is_retried_after_backoff(engine):
+    result, task_events, _ = run_flaky(engine, {"max_attempts": 3, "backoff_base": 0.01},
+                                       [(502, None), (None, None)])
+
+    assert result == {"fetched_size": 10}
+    assert task_events[-1] == ("COMPLETED", 3)
+
+
+def test_retry_after_is_capped_by_backoff_max(engine):
+    result, task_events, elapsed = run_flaky(engine, {"max_attempts": 2, "backoff_max": 0.1}, [(503, 60)])
+
+    assert result == {"fetched_size": 10}
+    assert task_events[-1] == ("COMPLETED", 2)
+    assert elapsed < 5
+
+
+def test_retry_is_not_scheduled_past_run_deadline(engine):
+    _, task_events, elapsed = run_flaky(engine, {"max_attempts": 2, "backoff_max": 60}, [(503, 30)], run_timeout=1)
+
+    assert task_events[-1] == ("FAILED", 1)
+    assert elapsed < 1
+
+
+def test_status_out_of_retry_on_status_is_not_retried(engine):
+    _, task_events, _ = run_flaky(engine, {"max_attempts": 3}, [(404, None)])
+
+    assert task_events[-1] == ("FAILED", 1)
+    assert inner_functions.flaky_failures == []
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import get_endpoint, gen_http_request
+import json
+import asyncio
+
+
+def test_submit_with_same_request_id_keeps_both_runs(engine):
+    submit_run = get_endpoint(engine, '/workflow/submit')
+    call_run_state = get_endpoint(engine, '/workflow/runs/{run_id}')
+    sizes = [1000, 2000]
+
+    async def submit_all():
+        submitted_runs = []
+        for size in sizes:
+            response = await submit_run(http_request=gen_http_request({"size": size, "request_id": "submitted_id"}))
+            assert response.status_code == 202
+            submitted_runs.append(json.loads(response.body))
+        run_states = []
+        for submitted_run in submitted_runs:
+            response = await call_run_state(http_request=None, run_id=submitted_run['run_id'], wait=10)
+            run_states.append(json.loads(response.body))
+        return submitted_runs, run_states
+
+    submitted_runs, run_states = asyncio.run(submit_all())
+
+    assert submitted_runs[0]['run_id'] != submitted_runs[1]['run_id']
+    assert [submitted_run['request_id'] for submitted_run in submitted_runs] == ["submitted_id", "submitted_id"]
+    assert [run_state['state'] for run_state in run_states] == ["COMPLETED", "COMPLETED"]
+    assert [run_state['result'] for run_state in run_states] == [{"fetched_size": size} for size in sizes]
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+
+def test_run_request_keeps_recipe_timeout_param(engine):
+    request = {"request_id": "client_id", "timeout": 5, "_timeout": 2}
+
+    _, _, run_id, run_timeout = engine._parse_run_request(request)
+
+    assert run_timeout == 2
+    assert request == {"request_id": "client_id", "timeout": 5}
+    assert run_id != "client_id"
+
+
+def test_runs_with_same_request_id_do_not_share_data(engine):
+    sizes = [1000, 2000]
+    run_requests = []
+    for size in sizes:
+        request = {"size": size, "request_id": "duplicated_id"}
+        start_node, end_node, run_id, run_timeout = engine._parse_run_request(request)
+        run_requests.append((start_node, end_node, request, run_id, 10))
+
+    async def run_all():
+        return await asyncio.gather(*[engine._execute_run(*run_request) for run_request in run_requests])
+
+    results = asyncio.run(run_all())
+
+    assert run_requests[0][3] != run_requests[1][3]
+    assert results == [{"fetched_size": size} for size in sizes]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import get_endpoint, gen_http_request, gen_fan_out_recipe, recipe_loaded
+import asyncio
+import json
+
+
+def parse_sse(chunks):
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(':'):
+            continue
+        event_line, data_line = chunk.strip().split('\n')
+        events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return events
+
+
+def stream_run(engine, request, with_output=False):
+    stream_workflow = get_endpoint(engine, '/workflow/run/stream')
+
+    async def read_stream():
+        response = await stream_workflow(http_request=gen_http_request(request), with_output=with_output)
+        return response.headers['content-type'], [chunk async for chunk in response.body_iterator]
+
+    content_type, chunks = asyncio.run(read_stream())
+    return content_type, parse_sse(chunks)
+
+
+def test_task_events_are_streamed_before_result(engine):
+    content_type, events = stream_run(engine, {"size": 10, "request_id": "test_stream"}, with_output=True)
+
+    assert content_type.startswith('text/event-stream')
+    assert [event_name for event_name, _ in events] == ['task'] * 4 + ['result']
+    task_events = {event_data['service_id']: event_data for _, event_data in events[:-1]}
+    assert list(task_events) == ["start_node.start", "produce_node.produce", "consume_node.consume", "end_node.end"]
+    assert all(task_event['state'] == 'COMPLETED' for task_event in task_events.values())
+    assert task_events["produce_node.produce"]['output'] == {"text": "x" * 10}
+    _, result_event = events[-1]
+    assert result_event['request_id'] == "test_stream"
+    assert result_event['result'] == {"fetched_size": 10}
+
+
+def test_failed_task_is_streamed_with_its_error(engine):
+    with recipe_loaded(engine, gen_fan_out_recipe()):
+        _, events = stream_run(engine, {"size": 10})
+
+    task_states = {event_data['service_id']: event_data['state'] for event_name, event_data in events if event_name == 'task'}
+    assert task_states["fail_node.fail"] == 'FAILED'
+    fail_event = next(event_data for _, event_data in events if event_data.get('service_id') == "fail_node.fail")
+    assert fail_event['error'] == "failed on purpose: 10"
+    assert 'output' not in fail_event
+    assert events[-1][0] == 'result'
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from conftest import gen_node
+import threading
+import logging
+import time
+
+
+def gen_task(function):
+    from api.workflow.control.execute.task import Task
+    node_info = gen_node("sleep_node", "engine", "inference", "sleep", "inference", ["seconds"], ["slept"],
+                         function=function)
+    service_info = dict(node_info["services"]["sleep"], node_type="engine", role="inference", location="inner")
+    return Task(logging.getLogger('test_workflow'), "sleep_node.sleep", service_info)
+
+
+def test_expired_task_keeps_timeout_after_late_completion(engine_home):
+    from api.workflow.control.execute.task_state import TaskState
+    from api.workflow.error_pool.error import ExceededTimeout
+    task = gen_task("inner_functions:sleep")
+    task.set_params({"seconds": 0.3})
+    task.set_state(TaskState.RUNNING)
+    task_thread = threading.Thread(target=task.execute)
+    task_thread.start()
+    time.sleep(0.1)
+
+    assert task.expire()
+    assert task.get_state() == TaskState.TIMEOUT
+    task_thread.join()
+    assert task.get_state() == TaskState.TIMEOUT
+    assert isinstance(task.get_error(), ExceededTimeout)
+    assert task.get_result() is None
+    assert not task.expire()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from api.workflow.control.meta.workflow_compiler import WorkflowCompiler
+from api.workflow.error_pool.error import CyclicWorkflowGraph
+import logging
+import pytest
+
+logger = logging.getLogger('test_workflow_compiler')
+
+# a.run -> {b.run, c.run} -> d.run
+FORWARD_GRAPH = {"a.run": ["b.run", "c.run"], "b.run": ["d.run"], "c.run": ["d.run"]}
+BACKWARD_GRAPH = {"b.run": ["a.run"], "c.run": ["a.run"], "d.run": ["b.run", "c.run"]}
+EDGES_PARAM_MAP = {
+    "None-a.run": [{"key": "text", "refer_type": "direct", "value": None}],
+    "a.run-b.run": [{"key": "text", "refer_type": "indirect", "value": "a.run.text"}],
+    "a.run-c.run": [{"key": "text", "refer_type": "indirect", "value": "a.run.text"}],
+    "b.run-d.run": [{"key": "left", "refer_type": "indirect", "value": "b.run.text"},
+                    {"key": "mode", "refer_type": "direct", "value": "concat"}],
+    "c.run-d.run": [{"key": "right", "refer_type": "indirect", "value": "c.run.text"}]
+}
+
+
+def test_diamond_is_compiled_to_csr_and_topological_order(engine_home):
+    compiled_workflow = WorkflowCompiler(logger).compile(FORWARD_GRAPH, BACKWARD_GRAPH, EDGES_PARAM_MAP)
+    node_id = compiled_workflow.get_node_id
+
+    assert compiled_workflow.get_node_count() == 4
+    assert compiled_workflow.to_service_ids(compiled_workflow.get_topo_order()) == ["a.run", "b.run", "c.run", "d.run"]
+    assert compiled_workflow.to_service_ids(compiled_workflow.get_next_node_ids(node_id("a.run"))) == ["b.run", "c.run"]
+    assert compiled_workflow.to_service_ids(compiled_workflow.get_prev_node_ids(node_id("d.run"))) == ["b.run", "c.run"]
+    assert compiled_workflow.get_next_node_ids(node_id("d.run")) == ()
+    assert compiled_workflow.find_ancestor_node_ids(node_id("b.run")) == compiled_workflow.to_node_ids(["a.run", "b.run"])
+    assert compiled_workflow.find_descendant_node_ids(node_id("c.run")) == compiled_workflow.to_node_ids(["c.run", "d.run"])
+
+
+def test_param_slots_resolve_values_and_fold_recipe_defaults(engine_home):
+    compiled_workflow = WorkflowCompiler(logger).compile(FORWARD_GRAPH, BACKWARD_GRAPH, EDGES_PARAM_MAP)
+    node_id = compiled_workflow.get_node_id
+
+    assert compiled_workflow.get_param_slots(node_id("a.run")) == (("text", "direct", "I.a.run.text"),)
+    assert compiled_workflow.get_param_slots(node_id("d.run")) == (
+        ("left", "indirect", "O.b.run.text"), ("mode", "constant", "concat"), ("right", "indirect", "O.c.run.text"))
+    value_refs = compiled_workflow.count_value_refs(range(compiled_workflow.get_node_count()))
+    assert value_refs == {"I.a.run.text": 1, "O.a.run.text": 2, "O.b.run.text": 1, "O.c.run.text": 1}
+
+
+def test_cycle_is_rejected(engine_home):
+    forward_graph = dict(FORWARD_GRAPH, **{"d.run": ["a.run"]})
+
+    with pytest.raises(CyclicWorkflowGraph):
+        WorkflowCompiler(logger).compile(forward_graph, BACKWARD_GRAPH, EDGES_PARAM_MAP)
+
+
+def test_versions_increase_per_compile(engine_home):
+    compiler = WorkflowCompiler(logger)
+    first_workflow = compiler.compile(FORWARD_GRAPH, BACKWARD_GRAPH, EDGES_PARAM_MAP)
+    second_workflow = compiler.compile(FORWARD_GRAPH, BACKWARD_GRAPH, EDGES_PARAM_MAP)
+
+    assert second_workflow.get_version() > first_workflow.get_version()